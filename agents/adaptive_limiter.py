@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive (AIMD) concurrency limits per backend host.
+
+Each host starts at a modest limit. Every healthy response (latency under target, recent error
+rate low) adds 1/limit, so the limit grows by about one per round of requests. A throttling
+signal (HTTP 429, a timeout, a "rate limit" WHOIS reply) multiplies it by the decrease factor,
+at most once per cooldown (by default one smoothed round-trip) so one burst of rejections does
+not collapse it to the floor.
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+OK = 'ok'
+THROTTLED = 'throttled'
+ERROR = 'error'
+
+
+class _Slot:
+    """Handle for one admitted request; the caller marks the outcome before the slot is released"""
+
+    def __init__(self):
+        self.outcome = OK
+
+    def throttled(self):
+        self.outcome = THROTTLED
+
+    def failed(self):
+        self.outcome = ERROR
+
+
+class AdaptiveLimiter:
+    """Concurrency limit for one host that adapts to its latency, errors and throttling"""
+
+    def __init__(self, name: str, initial: int = 4, minimum: int = 1, maximum: int = 64,
+                 decrease: float = 0.5, latency_target: float = 2.0, max_error_rate: float = 0.1,
+                 cooldown: Optional[float] = None, smoothing: float = 0.2):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.latency = None
+        self.error_rate = 0.0
+        self._last_decrease = 0.0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+        self.stats = {'admitted': 0, 'ok': 0, 'throttled': 0, 'errors': 0, 'increases': 0, 'decreases': 0}
+
+    def _has_room(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _admit(self):
+        self.in_flight += 1
+        self.stats['admitted'] += 1
+
+    async def acquire(self):
+        # Waiters are futures on the caller's loop, so one limiter serves successive asyncio.run calls
+        with self._lock:
+            if self._has_room() and not self._waiters:
+                self._admit()
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # The slot was handed over just before the cancellation landed
+                    self.in_flight -= 1
+                    self._wake()
+            raise
+
+    def _wake(self):
+        # Slots are handed to waiters in FIFO order; the waiter is admitted before it resumes
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._admit()
+            waiter.get_loop().call_soon_threadsafe(self._deliver, waiter)
+
+    def _deliver(self, waiter):
+        if waiter.done():
+            # Cancelled between hand-over and delivery; give the slot back
+            with self._lock:
+                self.in_flight -= 1
+                self._wake()
+        else:
+            waiter.set_result(None)
+
+    def release(self, latency: float, outcome: str = OK):
+        with self._lock:
+            self.in_flight -= 1
+            self._record(latency, outcome)
+            self._wake()
+
+    def _record(self, latency: float, outcome: str):
+        alpha = self.smoothing
+        failed = outcome != OK
+        self.error_rate = (1 - alpha) * self.error_rate + alpha * (1.0 if failed else 0.0)
+        if outcome == THROTTLED:
+            self.stats['throttled'] += 1
+            now = time.monotonic()
+            cooldown = self.cooldown if self.cooldown is not None else (self.latency or 1.0)
+            if now - self._last_decrease >= cooldown:
+                self._last_decrease = now
+                self.limit = max(float(self.minimum), self.limit * self.decrease)
+                self.stats['decreases'] += 1
+            return
+        if outcome == ERROR:
+            self.stats['errors'] += 1
+            return
+
+        self.stats['ok'] += 1
+        self.latency = latency if self.latency is None else (1 - alpha) * self.latency + alpha * latency
+        if self.latency <= self.latency_target and self.error_rate <= self.max_error_rate:
+            before = int(self.limit)
+            self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            if int(self.limit) > before:
+                self.stats['increases'] += 1
+
+    def slot(self) -> '_SlotContext':
+        """async with limiter.slot() as slot: ... slot.throttled() / slot.failed() on a bad outcome"""
+        return _SlotContext(self)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'waiting': len(self._waiters),
+                'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+                'error_rate': round(self.error_rate, 4),
+                **self.stats
+            }
+
+
+class _SlotContext:
+    def __init__(self, limiter: AdaptiveLimiter):
+        self.limiter = limiter
+        self.slot = _Slot()
+        self.started = 0.0
+
+    async def __aenter__(self) -> _Slot:
+        await self.limiter.acquire()
+        self.started = time.perf_counter()
+        return self.slot
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        outcome = self.slot.outcome
+        if exc_type is not None and outcome == OK:
+            outcome = THROTTLED if issubclass(exc_type, asyncio.TimeoutError) else ERROR
+        self.limiter.release(time.perf_counter() - self.started, outcome)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host: str, initial: Optional[int] = None) -> AdaptiveLimiter:
+    """Process-wide limiter for a host, created on first use (ADAPTIVE_LIMIT_* configure new ones)"""
+    limiter = _limiters.get(host)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                limiter = _limiters[host] = AdaptiveLimiter(
+                    host,
+                    initial=initial or int(os.getenv('ADAPTIVE_LIMIT_INITIAL', 4)),
+                    minimum=int(os.getenv('ADAPTIVE_LIMIT_MIN', 1)),
+                    maximum=int(os.getenv('ADAPTIVE_LIMIT_MAX', 64)),
+                    latency_target=float(os.getenv('ADAPTIVE_LIMIT_LATENCY_TARGET', 2.0))
+                )
+    return limiter
+
+
+def limiter_metrics() -> Dict[str, Dict[str, Any]]:
+    """Current limit and counters for every host seen so far"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.metrics() for limiter in limiters}
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio availability checker for domain candidates.
+
+Each candidate runs the same cascade the agent used to run serially: cache, RDAP, WHOIS, the
+whoisxmlapi availability endpoint and finally the Namecheap results page. Checks run
+concurrently up to a global limit, every backend has its own semaphore, and all HTTP backends
+share one keep-alive session. Results are yielded in completion order.
+
+Each backend host also gets an adaptive (AIMD) limit from agents.adaptive_limiter: it grows
+while the host answers quickly and shrinks on 429s, timeouts and WHOIS rate-limit replies.
+"""
+import os
+import time
+import asyncio
+import aiohttp
+from urllib.parse import urlsplit
+from typing import Dict, Any, AsyncIterator, Callable, Iterable, List, Optional, Tuple, Union
+from .adaptive_limiter import AdaptiveLimiter, get_limiter, limiter_metrics
+from .rdap_client import RDAPClient
+from .whois_client import AsyncWhoisClient, is_rate_limited
+from .whois_cache import get_whois_cache, python_whois_fetch
+
+BACKENDS = ('rdap', 'whois', 'whoisxml', 'namecheap')
+# Starting per-host limits; the adaptive limiter moves them from here
+DEFAULT_BACKEND_LIMITS = {'rdap': 8, 'whois': 2, 'whoisxml': 4, 'namecheap': 4}
+
+WHOISXML_URL = "https://domain-availability.whoisxmlapi.com/api/v1"
+NAMECHEAP_URL = "https://www.namecheap.com/domains/registration/results/"
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class CheckFailed:
+    """Yielded by stream() in place of a result when a domain's check raised
+
+    It is falsy, so it never reads as "available", but unlike None it does not mean "taken"
+    either: the domain was not checked and should be retried.
+    """
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return f"CheckFailed({self.error!r})"
+
+
+class AvailabilityChecker:
+    """Checks many domains concurrently and streams (domain, result) pairs as they finish"""
+
+    def __init__(self, build_result: Callable[[str, bool], Optional[Dict[str, Any]]], concurrency: int = 100,
+                 backend_limits: Optional[Dict[str, int]] = None, timeout: float = 10.0,
+                 whoisxml_api_key: str = 'at_demo', session: Optional[aiohttp.ClientSession] = None,
+                 on_stage: Optional[Callable[[str, str, bool], None]] = None):
+        # build_result prices and scores an available name, returning None when it is over budget
+        self.build_result = build_result
+        # on_stage(domain, backend, eliminated) is called after every backend answer, e.g. for a journal
+        self.on_stage = on_stage
+        self.concurrency = concurrency
+        self.backend_limits = {**DEFAULT_BACKEND_LIMITS, **(backend_limits or {})}
+        self.timeout = timeout
+        self.whoisxml_api_key = whoisxml_api_key
+        self.session = session
+        self._owns_session = session is None
+        self.stages = {}
+        # domain -> (available, deciding source, when the source answered) for every definite
+        # answer, e.g. for a verdict cache; cache hits keep the time of the original lookup
+        self.verdicts = {}
+
+    async def __aenter__(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300, keepalive_timeout=30)
+            self.session = aiohttp.ClientSession(connector=connector,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self._rdap = RDAPClient(session=self.session, timeout=self.timeout)
+        # Concurrency per WHOIS server is left to the adaptive limiter instead of fixed pacing
+        self._whois = AsyncWhoisClient(timeout=self.timeout, max_per_server=1000, min_interval=0)
+        self.stages = {backend: {'checked': 0, 'eliminated': 0, 'latencies': []} for backend in BACKENDS}
+        self.verdicts = {}
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session is not None and self._owns_session:
+            await self.session.close()
+            self.session = None
+
+    def _limiter(self, backend: str, host: str) -> AdaptiveLimiter:
+        return get_limiter(host, initial=self.backend_limits[backend])
+
+    def _tally(self, backend: str, domain: str, started: float, eliminated: bool):
+        if self.on_stage is not None:
+            self.on_stage(domain, backend, eliminated)
+        stage = self.stages[backend]
+        stage['checked'] += 1
+        stage['eliminated'] += int(eliminated)
+        stage['latencies'].append(time.perf_counter() - started)
+
+    async def _registry_record(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Definite registry answer from the cache, RDAP or WHOIS (in that order), or None"""
+        cache = get_whois_cache()
+        entry = cache.get(domain)
+        if entry is not None:
+            return entry
+
+        base = await self._rdap.base_url_for(domain)
+        # A TLD without an RDAP server goes straight to WHOIS rather than through a made-up host's limiter
+        if base:
+            async with self._limiter('rdap', urlsplit(base).netloc).slot() as slot:
+                started = time.perf_counter()
+                result = await self._rdap.check(domain)
+                error = result.get('error') or ''
+                if result['status'] == 429 or 'timeout' in error.lower():
+                    slot.throttled()
+                elif error or (result['status'] or 0) >= 500:
+                    slot.failed()
+            if result['available'] is not None:
+                # A 404 from the registry's RDAP server means the name is not registered
+                self._tally('rdap', domain, started, eliminated=not result['available'])
+                return cache.put(result['domain'], result['fields'], raw=result['raw'],
+                                 registered=not result['available'], source='rdap', no_match=result['available'])
+            self._tally('rdap', domain, started, eliminated=False)
+
+        started = time.perf_counter()
+        try:
+            server = await self._whois.server_for(domain)
+        except (OSError, asyncio.TimeoutError) as e:
+            # IANA or DNS failed us; python-whois has its own server table, so fall through to it
+            print(f"WHOIS server lookup failed for {domain}: {e}")
+            record = await self._python_whois(domain)
+        else:
+            async with self._limiter('whois', server).slot() as slot:
+                started = time.perf_counter()
+                try:
+                    record = await self._whois.lookup(domain)
+                except asyncio.TimeoutError:
+                    slot.throttled()
+                    record = None
+                except OSError:
+                    slot.failed()
+                    record = None
+                if record is not None and is_rate_limited(record['raw']):
+                    # A refusal is not an answer; caching it would pass a taken name off as free
+                    slot.throttled()
+                    self._tally('whois', domain, started, eliminated=False)
+                    return None
+                if record is None:
+                    record = await self._python_whois(domain)
+        if record is None:
+            self._tally('whois', domain, started, eliminated=False)
+            return None
+        entry = cache.put(domain, **record)
+        self._tally('whois', domain, started, eliminated=entry['registered'])
+        return entry
+
+    async def _python_whois(self, domain: str) -> Optional[Dict[str, Any]]:
+        """python-whois knows more registry quirks; it blocks, so it runs off the loop"""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, python_whois_fetch, domain)
+        except Exception as e:
+            print(f"WHOIS lookup failed for {domain}: {e}")
+            return None
+
+    async def _whoisxml_unavailable(self, domain: str) -> bool:
+        """True only when the availability API positively reports the name as taken"""
+        unavailable = False
+        async with self._limiter('whoisxml', urlsplit(WHOISXML_URL).netloc).slot() as slot:
+            started = time.perf_counter()
+            try:
+                params = {'apiKey': self.whoisxml_api_key, 'domainName': domain}
+                async with self.session.get(WHOISXML_URL, params=params) as response:
+                    self._grade(slot, response.status)
+                    if response.status == 200:
+                        data = await response.json(content_type=None)
+                        availability = (data.get('DomainInfo') or {}).get('domainAvailability')
+                        unavailable = availability is not None and availability != 'AVAILABLE'
+            except asyncio.TimeoutError as e:
+                slot.throttled()
+                print(f"API check failed for {domain}: {e}")
+            except (aiohttp.ClientError, ValueError) as e:
+                slot.failed()
+                print(f"API check failed for {domain}: {e}")
+        self._tally('whoisxml', domain, started, eliminated=unavailable)
+        return unavailable
+
+    async def _namecheap_status(self, domain: str) -> Optional[bool]:
+        """True if Namecheap offers the name, False if it says taken, None if unclear"""
+        status = None
+        async with self._limiter('namecheap', urlsplit(NAMECHEAP_URL).netloc).slot() as slot:
+            started = time.perf_counter()
+            try:
+                async with self.session.get(NAMECHEAP_URL, params={'domain': domain},
+                                            headers=BROWSER_HEADERS) as response:
+                    self._grade(slot, response.status)
+                    text = await response.text()
+                if "Domain is taken" in text:
+                    status = False
+                elif "Add to cart" in text:
+                    status = True
+            except asyncio.TimeoutError as e:
+                slot.throttled()
+                print(f"Web check failed for {domain}: {e}")
+            except aiohttp.ClientError as e:
+                slot.failed()
+                print(f"Web check failed for {domain}: {e}")
+        self._tally('namecheap', domain, started, eliminated=status is False)
+        return status
+
+    @staticmethod
+    def _grade(slot, status: int):
+        if status == 429:
+            slot.throttled()
+        elif status >= 500:
+            slot.failed()
+
+    async def check(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Result dict for an available (affordable) domain, or None"""
+        record = await self._registry_record(domain)
+        if record is not None:
+            if record['registered']:
+                self.verdicts[domain] = (False, record['source'], record['fetched_at'])
+                return None
+            # "No match" from the registry is a good sign that it is available
+            if record['no_match']:
+                self.verdicts[domain] = (True, record['source'], record['fetched_at'])
+                return self.build_result(domain, True)
+
+        if await self._whoisxml_unavailable(domain):
+            self.verdicts[domain] = (False, 'whoisxmlapi', time.time())
+            return None
+        status = await self._namecheap_status(domain)
+        if status is not None:
+            self.verdicts[domain] = (status, 'namecheap', time.time())
+        if status is False:
+            return None
+        # Without a registrar confirmation the name is kept but flagged as unverified
+        return self.build_result(domain, bool(status))
+
+    async def stream(self, domains: Iterable[str]) -> AsyncIterator[Tuple[str, Union[Dict[str, Any], None, CheckFailed]]]:
+        """Yield (domain, result, None if not available, or CheckFailed) in completion order"""
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(domain):
+            async with limit:
+                try:
+                    return domain, await self.check(domain)
+                except Exception as e:
+                    print(f"Error checking {domain}: {e}")
+                    return domain, CheckFailed(e)
+
+        for finished in asyncio.as_completed([bounded(domain) for domain in domains]):
+            yield await finished
+
+    def limits(self) -> Dict[str, Dict[str, Any]]:
+        """Current adaptive limit and counters per backend host"""
+        return limiter_metrics()
+
+    def stage_report(self) -> List[Tuple[str, int, int, List[float]]]:
+        """(backend, checked, eliminated, latencies) for every backend that saw traffic"""
+        return [(backend, stage['checked'], stage['eliminated'], stage['latencies'])
+                for backend, stage in self.stages.items() if stage['checked']]
+
+
+def get_availability_checker(build_result: Callable[[str, bool], Optional[Dict[str, Any]]],
+                             on_stage: Optional[Callable[[str, str, bool], None]] = None) -> AvailabilityChecker:
+    """Checker configured from the environment (AVAILABILITY_LIMIT_<BACKEND> sets a backend limit)"""
+    limits = {backend: int(os.getenv(f'AVAILABILITY_LIMIT_{backend.upper()}', DEFAULT_BACKEND_LIMITS[backend]))
+              for backend in BACKENDS}
+    return AvailabilityChecker(
+        build_result,
+        concurrency=int(os.getenv('AVAILABILITY_CONCURRENCY', 100)),
+        backend_limits=limits,
+        timeout=float(os.getenv('AVAILABILITY_TIMEOUT', 10)),
+        whoisxml_api_key=os.getenv('WHOISXML_API_KEY', 'at_demo'),
+        on_stage=on_stage
+    )
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Compact Bloom filter with an on-disk form that can be memory-mapped read-only
+"""
+import os
+import math
+import mmap
+import struct
+import hashlib
+from typing import Iterable, Union
+
+MAGIC = b'DBLM'
+HEADER = struct.Struct('<4sQI')
+
+Key = Union[str, bytes, int]
+
+
+def _key_bytes(key: Key) -> bytes:
+    if isinstance(key, bytes):
+        return key
+    if isinstance(key, int):
+        return key.to_bytes(8, 'little', signed=False)
+    return key.encode('utf-8')
+
+
+class BloomFilter:
+    """Set membership with no false negatives and a tunable false-positive rate"""
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001, num_bits: int = 0,
+                 num_hashes: int = 0, data=None):
+        capacity = max(capacity, 1)
+        self.num_bits = num_bits or max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = num_hashes or max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = data if data is not None else bytearray((self.num_bits + 7) // 8)
+        self._map = None
+        self._file = None
+
+    def _positions(self, key: Key):
+        digest = hashlib.blake2b(_key_bytes(key), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        num_bits = self.num_bits
+        # Double hashing: k positions from two independent 64-bit hashes
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: Key):
+        bits = self.bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def update(self, keys: Iterable[Key]):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: Key) -> bool:
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def save(self, path: str):
+        """Write the filter atomically so readers never map a half-written file"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.num_bits, self.num_hashes))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, mapped: bool = True) -> 'BloomFilter':
+        """Open a saved filter; mapped filters are read-only and share pages across processes"""
+        file = open(path, 'rb')
+        try:
+            magic, num_bits, num_hashes = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            if not mapped:
+                return cls(num_bits=num_bits, num_hashes=num_hashes, data=bytearray(file.read()))
+            file_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            file.close()
+            raise
+        finally:
+            if not mapped:
+                file.close()
+        bloom = cls(num_bits=num_bits, num_hashes=num_hashes,
+                    data=memoryview(file_map)[HEADER.size:HEADER.size + (num_bits + 7) // 8])
+        bloom._map, bloom._file = file_map, file
+        return bloom
+
+    def close(self):
+        if self._map is not None:
+            self.bits.release()
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+DNS pre-filter for domain availability checks.
+
+Almost every registered domain is delegated, so one NS query tells it apart from a free name much
+faster than WHOIS or RDAP can. Only names the DNS reports as NXDOMAIN (or could not answer for)
+go on to the slower stages; NXDOMAIN alone is not proof of availability, since registered names
+on hold are not delegated either.
+
+    python -m agents.dns_prefilter example.com some-unlikely-name-4821.com
+"""
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+from collections import OrderedDict
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence
+from .whois_cache import registrable_domain
+
+REGISTERED = 'registered'
+NXDOMAIN = 'nxdomain'
+UNKNOWN = 'unknown'
+
+
+class DNSResult(NamedTuple):
+    """Outcome of the DNS stage for one domain"""
+    domain: str
+    status: str
+    record_type: Optional[str]
+    seconds: float
+
+
+class DNSPrefilter:
+    """Concurrent NS (then SOA) lookups through dnspython's async resolver"""
+
+    def __init__(self, nameservers: Optional[Sequence[str]] = None, timeout: float = 2.0, concurrency: int = 100):
+        self.nameservers = list(nameservers) if nameservers else None
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self._resolver = None
+
+    def _get_resolver(self):
+        if self._resolver is None:
+            import dns.asyncresolver
+            resolver = dns.asyncresolver.Resolver()
+            if self.nameservers:
+                resolver.nameservers = self.nameservers
+            resolver.lifetime = self.timeout
+            self._resolver = resolver
+        return self._resolver
+
+    async def check(self, domain: str) -> DNSResult:
+        """Classify one domain as registered, nxdomain or unknown"""
+        import dns.exception
+        import dns.resolver
+
+        domain = registrable_domain(domain)
+        resolver = self._get_resolver()
+        started = time.perf_counter()
+        status, record_type = UNKNOWN, None
+        # SOA is the fallback for zones whose NS answer fails (e.g. lame or misconfigured delegations)
+        for record_type in ('NS', 'SOA'):
+            try:
+                await resolver.resolve(domain, record_type)
+                status = REGISTERED
+                break
+            except dns.resolver.NXDOMAIN:
+                status = NXDOMAIN
+                break
+            except dns.resolver.NoAnswer:
+                # The name exists in the zone, it just has no record of this type
+                status = REGISTERED
+                break
+            except (dns.resolver.NoNameservers, dns.exception.Timeout, dns.resolver.YXDOMAIN):
+                continue
+            except dns.exception.DNSException as e:
+                print(f"DNS lookup for {domain} failed: {str(e)}")
+                break
+        return DNSResult(domain, status, record_type, time.perf_counter() - started)
+
+    async def check_many(self, domains: List[str]) -> List[DNSResult]:
+        """Check a batch of domains concurrently"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(domain):
+            async with semaphore:
+                return await self.check(domain)
+
+        return await asyncio.gather(*(bounded(domain) for domain in domains))
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class StageStats:
+    """Per-stage elimination counts and latencies for one availability check run"""
+
+    def __init__(self):
+        self.stages = OrderedDict()
+
+    def record(self, stage: str, checked: int, eliminated: int, seconds: float,
+               latencies: Optional[List[float]] = None):
+        entry = {'checked': checked, 'eliminated': eliminated, 'passed': checked - eliminated,
+                 'seconds': round(seconds, 3)}
+        if latencies:
+            entry['p50_ms'] = round(_percentile(latencies, 0.5) * 1000, 1)
+            entry['p95_ms'] = round(_percentile(latencies, 0.95) * 1000, 1)
+        self.stages[stage] = entry
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self.stages)
+
+    def summary(self) -> str:
+        lines = []
+        for stage, entry in self.stages.items():
+            line = (f"  {stage:<10} checked {entry['checked']:>5}  eliminated {entry['eliminated']:>5}  "
+                    f"passed {entry['passed']:>5}  {entry['seconds']:.2f}s")
+            if 'p50_ms' in entry:
+                line += f"  (p50 {entry['p50_ms']}ms, p95 {entry['p95_ms']}ms)"
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+def get_dns_prefilter() -> DNSPrefilter:
+    """Pre-filter configured from the environment (DNS_PREFILTER_NAMESERVERS is comma-separated)"""
+    nameservers = [ns.strip() for ns in os.getenv('DNS_PREFILTER_NAMESERVERS', '').split(',') if ns.strip()]
+    return DNSPrefilter(
+        nameservers=nameservers or None,
+        timeout=float(os.getenv('DNS_PREFILTER_TIMEOUT', 2.0)),
+        concurrency=int(os.getenv('DNS_PREFILTER_CONCURRENCY', 100))
+    )
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Classify domains by DNS before WHOIS/RDAP checks")
+    parser.add_argument('domains', nargs='+')
+    parser.add_argument('--nameserver', action='append', help='Resolver to query (repeatable)')
+    parser.add_argument('--timeout', type=float, default=2.0)
+    args = parser.parse_args()
+
+    prefilter = DNSPrefilter(nameservers=args.nameserver, timeout=args.timeout)
+    started = time.perf_counter()
+    results = asyncio.run(prefilter.check_many(args.domains))
+    for result in results:
+        print(json.dumps({**result._asdict(), 'seconds': round(result.seconds, 4)}))
+    print(f"{len(results)} domains in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
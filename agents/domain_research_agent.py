@@ -4,12 +4,17 @@ import json
 import os
 import random
 from datetime import datetime
+from .whois_cache import get_whois_cache
+from .verdict_cache import get_verdict_cache
 
 class DomainResearchAgent:
     """Agent that finds valuable domain names under a certain price threshold using real data."""
     
     def __init__(self):
         self.api_key = os.environ.get('DOMAIN_API_KEY', 'demo_key')  # Replace with your actual API key
+        self.whois_cache = get_whois_cache()
+        # Verdicts shared with the top-level research agent, so neither re-verifies the same names
+        self.verdict_cache = get_verdict_cache()
         
         # Categories for domain industry classification
         self.categories = [
@@ -116,6 +121,22 @@ class DomainResearchAgent:
     
     def _check_domain_availability(self, domain):
         """Check if a domain is available and get its price using a real domain API."""
+        verdict = self.verdict_cache.get(domain)
+        if verdict is not None:
+            if not verdict.available:
+                return {"available": False, "price": 0}
+            tld = domain.split('.')[-1]
+            return {"available": True, "price": self._calculate_domain_price(domain, tld)}
+        
+        # Reuse a fresh registry answer from the shared WHOIS/RDAP cache
+        cached = self.whois_cache.get(domain)
+        if cached is not None:
+            if cached['registered']:
+                return {"available": False, "price": 0}
+            if cached['no_match'] or cached['source'] != 'whois':
+                tld = domain.split('.')[-1]
+                return {"available": True, "price": self._calculate_domain_price(domain, tld)}
+        
         try:
             # Try to use real domain API
             url = f"https://domain-availability.whoisxmlapi.com/api/v1"
@@ -136,7 +157,11 @@ class DomainResearchAgent:
                     if available:
                         tld = domain.split('.')[-1]
                         price = self._calculate_domain_price(domain, tld)
+                        # The API's "available" is not a registry confirmation
+                        self.verdict_cache.put(domain, True, 'whoisxmlapi', verified=False)
                         return {"available": True, "price": price}
+                    self.verdict_cache.put(domain, False, 'whoisxmlapi', verified=True)
+                    return {"available": False, "price": 0}
             
             # Fallback to our algorithm
             return self._fallback_availability_check(domain)
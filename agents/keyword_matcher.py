@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Aho-Corasick keyword matching for domain scoring: one pass over a label finds every
+trending and industry keyword it contains
+"""
+from collections import deque
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Set, Tuple
+
+
+class AhoCorasick:
+    """Multi-pattern substring automaton over a fixed keyword set"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(keywords))
+        # The empty string is a substring of everything, exactly like `'' in label`
+        self.always = [keyword for keyword in self.keywords if not keyword]
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for keyword in self.keywords:
+            if keyword:
+                self._insert(keyword)
+        self._link()
+
+    def _insert(self, keyword: str):
+        node = 0
+        for char in keyword:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][char] = child
+            node = child
+        self._out[node].append(keyword)
+
+    def _link(self):
+        # Breadth-first so every fail target is finished before the nodes that point at it
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+
+    def find(self, text: str) -> Set[str]:
+        """Every keyword that occurs in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(self.always)
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class KeywordMatch(NamedTuple):
+    """What the scoring methods need to know about one domain label"""
+    trending_keyword: Optional[str]
+    industry_matches: Tuple[Tuple[str, int], ...]
+
+    @property
+    def industries(self) -> Tuple[str, ...]:
+        return tuple(industry for industry, _ in self.industry_matches)
+
+
+class DomainKeywordMatcher:
+    """Compiled trending and industry keywords for DomainResearchAgent scoring"""
+
+    def __init__(self, trending_keywords: Sequence[str], industry_trends: Dict[str, Dict]):
+        self._trending = list(trending_keywords)
+        # First position of each trending keyword, so "first in list order" survives a set lookup
+        self._trending_rank = {}
+        for position, keyword in enumerate(self._trending):
+            self._trending_rank.setdefault(keyword, position)
+        # keyword -> [(industry position, list entries)]; the old checks counted list entries
+        self._industries = list(industry_trends)
+        self._industry_of = {}
+        for position, data in enumerate(industry_trends.values()):
+            for keyword in data["keywords"]:
+                entries = self._industry_of.setdefault(keyword, [])
+                if entries and entries[-1][0] == position:
+                    entries[-1] = (position, entries[-1][1] + 1)
+                else:
+                    entries.append((position, 1))
+        self.automaton = AhoCorasick(list(self._trending_rank) + list(self._industry_of))
+
+    def match(self, domain_name: str) -> KeywordMatch:
+        found = self.automaton.find(domain_name)
+        first = min((self._trending_rank[k] for k in found if k in self._trending_rank), default=None)
+        counts = [0] * len(self._industries)
+        for keyword in found:
+            for position, entries in self._industry_of.get(keyword, ()):
+                counts[position] += entries
+        return KeywordMatch(
+            self._trending[first] if first is not None else None,
+            tuple((industry, count) for industry, count in zip(self._industries, counts) if count)
+        )
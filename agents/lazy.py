@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Thread-safe lazy values for clients and data that are expensive to build at import time
+"""
+import threading
+from typing import Any, Callable
+
+
+class Lazy:
+    """Builds a value with factory() on first get() and shares it across threads"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value = None
+        self._ready = False
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> Any:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._value = self._factory()
+                    self._ready = True
+        return self._value
+
+    def reset(self):
+        """Drop the built value so the next get() rebuilds it"""
+        with self._lock:
+            self._value = None
+            self._ready = False
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Async NumLookup API client on a pooled aiohttp session, with retries and a result cache
+"""
+import os
+import time
+import random
+import asyncio
+import aiohttp
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+NUMLOOKUP_BASE_URL = 'https://api.numlookupapi.com/v1'
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class NumLookupError(Exception):
+    """The API rejected the request (bad key, quota, or an error payload)"""
+
+
+class AsyncNumLookupClient:
+    """Validates numbers against NumLookup without blocking the event loop"""
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, timeout: float = 5.0,
+                 retries: int = 2, backoff: float = 0.5, cache_ttl: int = 24 * 3600,
+                 cache_size: int = 10000, limit_per_host: int = 8,
+                 session: Optional[aiohttp.ClientSession] = None):
+        self.api_key = api_key
+        # Point NUMLOOKUP_BASE_URL at a local stub server to exercise the client offline
+        self.base_url = (base_url or os.getenv('NUMLOOKUP_BASE_URL', NUMLOOKUP_BASE_URL)).rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.limit_per_host = limit_per_host
+        # A shared app-scoped session is used as-is and left open on close()
+        self._external_session = session
+        self.session = None
+        self._session_loop = None
+        self._cache = OrderedDict()
+        self._in_flight = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # A session is bound to the loop that created it; callers that run one loop per request get a fresh pool
+        if self._external_session is not None and not self._external_session.closed:
+            return self._external_session
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host, keepalive_timeout=30)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._session_loop = loop
+        return self.session
+
+    def use_session(self, session: Optional[aiohttp.ClientSession]):
+        """Send requests over a caller-owned session (e.g. the scanner's) instead of a private pool"""
+        self._external_session = session
+
+    async def close(self):
+        """Close the client's own session; a caller-owned session is left open"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        self._session_loop = None
+
+    def _get_cached(self, number: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(number)
+        if entry is None:
+            return None
+        stored_at, data = entry
+        if time.time() - stored_at > self.cache_ttl:
+            del self._cache[number]
+            return None
+        self._cache.move_to_end(number)
+        return data
+
+    def _store(self, number: str, data: Dict[str, Any]):
+        self._cache[number] = (time.time(), data)
+        self._cache.move_to_end(number)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _retry_delay(self, attempt: int) -> float:
+        # Full jitter keeps retries from many scans from landing on the API in lockstep
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def _request(self, number: str, country_code: Optional[str]) -> Dict[str, Any]:
+        session = self._get_session()
+        params = {'country_code': country_code} if country_code else None
+        url = f"{self.base_url}/validate/{number}"
+        headers = {'apikey': self.api_key, 'Accept': 'application/json'}
+        last_error = None
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.get(url, params=params, headers=headers,
+                                       timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                    if response.status in (401, 403):
+                        raise NumLookupError(f"NumLookup rejected the API key (HTTP {response.status})")
+                    if response.status in RETRY_STATUSES:
+                        last_error = NumLookupError(f"NumLookup returned HTTP {response.status}")
+                    else:
+                        data = await response.json(content_type=None)
+                        if isinstance(data, dict) and 'errors' in data:
+                            raise NumLookupError(f"NumLookup returned errors: {data['errors']}")
+                        return data
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+            if attempt < self.retries:
+                await asyncio.sleep(self._retry_delay(attempt))
+        raise last_error
+
+    async def validate(self, phone_number: str, country_code: Optional[str] = None) -> Dict[str, Any]:
+        """Return NumLookup's validation payload for a number (digits, no '+')"""
+        number = phone_number.lstrip('+')
+        key = f"{number}:{country_code or ''}"
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
+        # Concurrent scans of the same number share one request
+        pending = self._in_flight.get(key)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(pending)
+
+        task = asyncio.ensure_future(self._request(number, country_code))
+        self._in_flight[key] = task
+        try:
+            data = await asyncio.shield(task)
+        finally:
+            if self._in_flight.get(key) is task:
+                del self._in_flight[key]
+        self._store(key, data)
+        return data
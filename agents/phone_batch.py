@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Batch phone scanning: stream numbers from CSV/JSONL, parse them across a process pool,
+dedupe by E.164 and stream enriched records out.
+
+Usage:
+    python -m agents.phone_batch numbers.csv -o enriched.jsonl --workers 8
+"""
+import os
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+NUMBER_COLUMNS = ('phone', 'phone_number', 'number', 'msisdn', 'e164')
+NON_DIALABLE = re.compile(r'[^\d+]')
+
+
+def read_numbers(path: str, column: Optional[str] = None) -> Iterator[str]:
+    """Yield raw numbers from a CSV (header optional) or JSONL file without loading it into memory"""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    key = column or next((name for name in NUMBER_COLUMNS if name in record), None)
+                    value = record.get(key) if key else None
+                else:
+                    value = record
+                if value:
+                    yield str(value)
+            return
+
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return
+        header = [cell.strip().lower() for cell in first]
+        wanted = column.lower() if column else next((name for name in NUMBER_COLUMNS if name in header), None)
+        if wanted and wanted in header:
+            index = header.index(wanted)
+        else:
+            # No recognizable header: the first row is data and numbers are in the first column
+            index = 0
+            if first and first[0].strip():
+                yield first[0].strip()
+        for row in reader:
+            if len(row) > index and row[index].strip():
+                yield row[index].strip()
+
+
+@lru_cache(maxsize=65536)
+def _to_e164(cleaned: str, default_region: str) -> str:
+    """Parse a cleaned number to E.164; repeated inputs inside a worker skip libphonenumber"""
+    import phonenumbers
+
+    parsed = phonenumbers.parse(cleaned, None if cleaned.startswith('+') else default_region)
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+
+def normalize_chunk(raw_numbers: List[str], default_region: str = 'US') -> List[Dict[str, Any]]:
+    """Parse and enrich one chunk of numbers; runs inside a worker process"""
+    import phonenumbers
+    from .phone_metadata import lookup_number_metadata
+    from .phone_prefix_index import lookup_prefixes
+
+    parsed = []
+    for raw in raw_numbers:
+        cleaned = NON_DIALABLE.sub('', raw)
+        try:
+            parsed.append((raw, lookup_number_metadata(_to_e164(cleaned, default_region))))
+        except phonenumbers.NumberParseException as e:
+            parsed.append((raw, e))
+    # The whole chunk is matched against the mapped prefix index in one vectorized pass
+    prefixes = iter(lookup_prefixes([meta.e164 for _, meta in parsed if not isinstance(meta, Exception)]))
+
+    records = []
+    for raw, meta in parsed:
+        if isinstance(meta, Exception):
+            records.append({'input': raw, 'e164': None, 'valid': False, 'error': str(meta)})
+            continue
+        prefix_info = next(prefixes)
+        records.append({
+            'input': raw,
+            'e164': meta.e164,
+            'valid': meta.valid,
+            'international': meta.international,
+            'national': meta.national,
+            'country_code': meta.region_code,
+            'country': meta.country_name or (prefix_info.country if prefix_info else ""),
+            'region': meta.location or (prefix_info.region if prefix_info else ""),
+            'carrier': meta.carrier or (prefix_info and prefix_info.carrier) or "Unknown",
+            'line_type': meta.line_type,
+            'toll_free': prefix_info.toll_free if prefix_info else False,
+            'voip': meta.line_type == "VoIP" or bool(prefix_info and prefix_info.voip),
+            'timezones': list(meta.timezones)
+        })
+    return records
+
+
+def _chunks(numbers: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for number in numbers:
+        chunk.append(number)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class BatchStats:
+    """Running counters and throughput for a batch scan"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.read = 0
+        self.emitted = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'read': self.read,
+            'emitted': self.emitted,
+            'duplicates': self.duplicates,
+            'invalid': self.invalid,
+            'elapsed_seconds': round(time.monotonic() - self.started, 2),
+            'numbers_per_second': round(self.rate, 1)
+        }
+
+    def __str__(self):
+        return (f"read={self.read} emitted={self.emitted} duplicates={self.duplicates} "
+                f"invalid={self.invalid} rate={self.rate:,.0f}/s")
+
+
+def scan_batch(numbers: Iterable[str], workers: Optional[int] = None, chunk_size: int = 5000,
+               default_region: str = 'US', dedupe: bool = True, stats: Optional[BatchStats] = None,
+               progress_every: float = 5.0, progress_stream=sys.stderr) -> Iterator[Dict[str, Any]]:
+    """Stream enriched records for numbers, parsing chunks in parallel and keeping input order"""
+    stats = stats or BatchStats()
+    workers = workers or os.cpu_count() or 1
+    # E.164 numbers are kept as ints: far smaller than strings when deduping millions of numbers
+    seen = set()
+    last_report = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        chunks = _chunks(numbers, chunk_size)
+        exhausted = False
+        while True:
+            # Keep a bounded number of chunks queued so memory stays flat on huge inputs
+            while not exhausted and len(in_flight) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                in_flight.append(executor.submit(normalize_chunk, chunk, default_region))
+            if not in_flight:
+                break
+
+            for record in in_flight.popleft().result():
+                stats.read += 1
+                if record['e164'] is None or not record['valid']:
+                    stats.invalid += 1
+                if dedupe and record['e164'] is not None:
+                    key = int(record['e164'][1:])
+                    if key in seen:
+                        stats.duplicates += 1
+                        continue
+                    seen.add(key)
+                stats.emitted += 1
+                yield record
+
+            if progress_stream and time.monotonic() - last_report >= progress_every:
+                print(f"[phone_batch] {stats}", file=progress_stream)
+                last_report = time.monotonic()
+
+    if progress_stream:
+        print(f"[phone_batch] done: {stats}", file=progress_stream)
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Batch-enrich phone numbers from CSV or JSONL")
+    parser.add_argument('input', help='CSV or JSONL file of phone numbers')
+    parser.add_argument('-o', '--output', help='JSONL output file (default: stdout)')
+    parser.add_argument('--column', help='CSV column or JSON field holding the number')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='Numbers per worker task')
+    parser.add_argument('--region', default='US', help='Region for numbers without a + prefix')
+    parser.add_argument('--no-dedupe', action='store_true', help='Emit duplicate numbers too')
+    args = parser.parse_args()
+
+    stats = BatchStats()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for record in scan_batch(read_numbers(args.input, args.column), workers=args.workers,
+                                 chunk_size=args.chunk_size, default_region=args.region,
+                                 dedupe=not args.no_dedupe, stats=stats):
+            out.write(json.dumps(record) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(stats.as_dict()), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
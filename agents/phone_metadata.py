@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Per-number phone metadata computed once and shared by PhoneScanner and PhoneInfogaWrapper
+"""
+import os
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+import phonenumbers
+from phonenumbers import geocoder, carrier, timezone
+
+LINE_TYPE_NAMES = {
+    phonenumbers.PhoneNumberType.MOBILE: "Mobile",
+    phonenumbers.PhoneNumberType.FIXED_LINE: "Landline",
+    phonenumbers.PhoneNumberType.VOIP: "VoIP"
+}
+
+METADATA_CACHE_SIZE = int(os.getenv('PHONE_METADATA_CACHE_SIZE', 65536))
+# Raw spellings seen recently, so a repeat scan of the same input skips libphonenumber entirely
+INPUT_CACHE_SIZE = int(os.getenv('PHONE_METADATA_INPUT_CACHE_SIZE', 4096))
+
+
+class PhoneMetadata(NamedTuple):
+    """Everything the scanners read from libphonenumber for one number"""
+    e164: str
+    valid: bool
+    possible: bool
+    international: str
+    national: str
+    region_code: str
+    country_code: int
+    country_name: str
+    location: str
+    carrier: str
+    line_type: str
+    timezones: Tuple[str, ...]
+
+
+def line_type_for(parsed_number: phonenumbers.PhoneNumber) -> str:
+    """Map libphonenumber's number type onto the labels the templates show"""
+    try:
+        return LINE_TYPE_NAMES.get(phonenumbers.number_type(parsed_number), "Unknown")
+    except Exception:
+        return "Unknown"
+
+
+@lru_cache(maxsize=INPUT_CACHE_SIZE)
+def lookup_number_metadata(number: str) -> PhoneMetadata:
+    """Metadata for a +E.164 number in any spelling; equivalent spellings share one cache entry
+
+    A repeated input is one dict lookup; a new spelling of a known number costs a parse.
+    """
+    parsed = phonenumbers.parse(number)
+    return _metadata_for_e164(phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164))
+
+
+@lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _metadata_for_e164(e164: str) -> PhoneMetadata:
+    parsed = phonenumbers.parse(e164)
+    return PhoneMetadata(
+        e164=e164,
+        valid=phonenumbers.is_valid_number(parsed),
+        possible=phonenumbers.is_possible_number(parsed),
+        international=phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL),
+        national=phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.NATIONAL),
+        region_code=phonenumbers.region_code_for_number(parsed) or "",
+        country_code=parsed.country_code,
+        country_name=geocoder.country_name_for_number(parsed, "en"),
+        location=geocoder.description_for_number(parsed, "en"),
+        carrier=carrier.name_for_number(parsed, "en"),
+        line_type=line_type_for(parsed),
+        timezones=tuple(timezone.time_zones_for_number(parsed))
+    )
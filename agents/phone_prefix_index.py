@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+"""
+Offline E.164 prefix index: country, region, carrier, line type and toll-free/VoIP flags
+answered by a longest-prefix match over a memory-mapped table.
+
+Build the index once (from libphonenumber's bundled data plus an optional CSV), then every
+process maps the same file read-only:
+    python -m agents.phone_prefix_index build -o .cache/phone_prefixes.idx --csv extra.csv
+
+File layout (little endian):
+    header   magic b'DPFX', version, prefix count, record blob length (4 x uint32)
+    prefixes key count x uint64: every key as an integer, ascending
+    records  key count x uint32: record index + 1 of the key's best match (0 = none)
+    blob     JSON list of [region_code, country, region, carrier, line_type, flags]
+
+Keys are the indexed prefixes plus markers: shorter prefixes of them, placed at the lengths a
+binary search over prefix lengths passes through, that point to their own longest indexed
+prefix. Records already carry the fields inherited from shorter prefixes, and E.164 prefixes
+never start with 0, so a lookup binary-searches the prefix lengths with one dict probe each on
+the number as an integer: about four probes for the nine lengths libphonenumber's data uses.
+Bulk enrichment should call lookup_many(), which searches the mapped key table with NumPy for
+a whole batch at once instead of paying CPython's per-call cost for every number.
+"""
+import os
+import re
+import csv
+import sys
+import json
+import mmap
+import time
+import array
+import bisect
+import struct
+import argparse
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+MAGIC = b'DPFX'
+VERSION = 2
+HEADER = struct.Struct('<4sIII')
+
+FLAG_TOLL_FREE = 1
+FLAG_VOIP = 2
+
+RECORD_FIELDS = ('region_code', 'country', 'region', 'carrier', 'line_type', 'flags')
+
+# Toll-free and VoIP ranges, as E.164 prefixes, that libphonenumber only describes as regexes
+TOLL_FREE_PREFIXES = (
+    '1800', '1833', '1844', '1855', '1866', '1877', '1888',
+    '44800', '44808', '611800', '33800', '49800', '3980', '34800', '34900', '31800'
+)
+VOIP_PREFIXES = ('4456', '3187', '3491', '49032')
+
+DEFAULT_INDEX_PATH = os.getenv('PHONE_PREFIX_INDEX_PATH', os.path.join('.cache', 'phone_prefixes.idx'))
+
+
+class PrefixInfo(NamedTuple):
+    """What the index knows about the longest matching prefix of a number"""
+    region_code: str
+    country: str
+    region: str
+    carrier: str
+    line_type: str
+    toll_free: bool
+    voip: bool
+
+
+def _country_name(region_code: str, lang: str = 'en') -> str:
+    from phonenumbers.geodata.locale import LOCALE_DATA
+
+    names = LOCALE_DATA.get(region_code, {})
+    name = names.get(lang, '')
+    # Locale entries may point at another language's spelling, e.g. '*aa'
+    while name.startswith('*'):
+        name = names.get(name[1:], '')
+    return name
+
+
+def _nanp_area_regions() -> Iterator[Tuple[str, str]]:
+    """Map each +1 area code to its region; NANP members share the country code"""
+    import phonenumbers
+
+    for area_code in range(200, 1000):
+        for subscriber in ('2345678', '5550100', '4567890'):
+            region = phonenumbers.region_code_for_number(phonenumbers.parse(f'+1{area_code}{subscriber}'))
+            if region:
+                yield f'1{area_code}', region
+                break
+
+
+def phonenumbers_entries(lang: str = 'en') -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (prefix, fields) pairs from the data bundled with the phonenumbers package"""
+    import phonenumbers
+    from phonenumbers.carrierdata import CARRIER_DATA
+    from phonenumbers.geodata import GEOCODE_DATA
+
+    for country_code, regions in phonenumbers.COUNTRY_CODE_TO_REGION_CODE.items():
+        main = regions[0]
+        yield str(country_code), {'region_code': main, 'country': _country_name(main, lang)}
+        for region in regions[1:]:
+            metadata = phonenumbers.PhoneMetadata.metadata_for_region(region)
+            if metadata is None or not metadata.leading_digits:
+                continue
+            for alternative in metadata.leading_digits.split('|'):
+                if alternative.isdigit():
+                    yield f'{country_code}{alternative}', {'region_code': region, 'country': _country_name(region, lang)}
+
+    for prefix, region in _nanp_area_regions():
+        yield prefix, {'region_code': region, 'country': _country_name(region, lang)}
+
+    for prefix, names in GEOCODE_DATA.items():
+        name = names.get(lang)
+        if name:
+            yield prefix, {'region': name}
+
+    # libphonenumber only maps carriers for mobile ranges
+    for prefix, names in CARRIER_DATA.items():
+        name = names.get(lang)
+        if name:
+            yield prefix, {'carrier': name, 'line_type': 'Mobile'}
+
+    for prefix in TOLL_FREE_PREFIXES:
+        yield prefix, {'line_type': 'Toll Free', 'flags': FLAG_TOLL_FREE}
+    for prefix in VOIP_PREFIXES:
+        yield prefix, {'line_type': 'VoIP', 'flags': FLAG_VOIP}
+
+
+def csv_entries(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (prefix, fields) from a CSV with a prefix column and any of the record columns.
+
+    Recognized columns: prefix, region_code, country, region, carrier, line_type, toll_free, voip.
+    Blank cells leave the value inherited from shorter prefixes untouched.
+    """
+    truthy = ('1', 'true', 'yes', 'y')
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            prefix = re.sub(r'\D', '', row.get('prefix') or '')
+            if not prefix:
+                continue
+            fields = {name: row[name].strip() for name in RECORD_FIELDS[:5] if (row.get(name) or '').strip()}
+            flags = 0
+            if (row.get('toll_free') or '').strip().lower() in truthy:
+                flags |= FLAG_TOLL_FREE
+            if (row.get('voip') or '').strip().lower() in truthy:
+                flags |= FLAG_VOIP
+            if flags:
+                fields['flags'] = flags
+            yield prefix, fields
+
+
+def build_prefix_index(entries: Iterable[Tuple[str, Dict[str, Any]]], path: str) -> Dict[str, int]:
+    """Write the binary index for (prefix, fields) pairs; later entries override earlier ones"""
+    own = {}
+    for prefix, fields in entries:
+        # A leading 0 is no E.164 prefix and would collide with the shorter prefix as an integer
+        if prefix and not prefix.startswith('0'):
+            own.setdefault(prefix, {}).update(fields)
+
+    # Push inherited fields down so a lookup only needs the longest matching prefix
+    records = []
+    record_ids = {}
+    merged_by_prefix = {}
+    empty = (None, None, None, None, None, 0)
+    for prefix in sorted(own, key=len):
+        inherited = next((merged_by_prefix[prefix[:length]] for length in range(len(prefix) - 1, 0, -1)
+                          if prefix[:length] in merged_by_prefix), empty)
+        merged = list(inherited)
+        fields = own[prefix]
+        for position, name in enumerate(RECORD_FIELDS):
+            if name == 'flags':
+                merged[position] |= fields.get('flags', 0)
+            elif fields.get(name):
+                merged[position] = fields[name]
+        merged_by_prefix[prefix] = tuple(merged)
+
+    # Markers send the length search towards longer prefixes; each remembers its own best match
+    lengths = sorted({len(prefix) for prefix in merged_by_prefix})
+    best = dict(merged_by_prefix)
+    for prefix in merged_by_prefix:
+        low, high = 0, len(lengths) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            if lengths[middle] == len(prefix):
+                break
+            if lengths[middle] > len(prefix):
+                high = middle - 1
+                continue
+            marker = prefix[:lengths[middle]]
+            if marker not in best:
+                best[marker] = next((merged_by_prefix[marker[:length]] for length in reversed(lengths)
+                                     if length <= len(marker) and marker[:length] in merged_by_prefix), None)
+            low = middle + 1
+
+    prefixes = array.array('Q')
+    ids = array.array('I')
+    for key in sorted(best, key=int):
+        record = best[key]
+        if record is not None and record not in record_ids:
+            record_ids[record] = len(records)
+            records.append(record)
+        prefixes.append(int(key))
+        ids.append(record_ids[record] + 1 if record is not None else 0)
+
+    if sys.byteorder != 'little':
+        prefixes.byteswap()
+        ids.byteswap()
+    blob = json.dumps(records, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(prefixes), len(blob)))
+        prefixes.tofile(f)
+        ids.tofile(f)
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return {'prefixes': len(merged_by_prefix), 'markers': len(best) - len(merged_by_prefix), 'records': len(records),
+            'bytes': HEADER.size + len(prefixes) * 12 + len(blob)}
+
+
+# 10 ** n for every digit count an E.164 number can have
+POWERS_OF_TEN = tuple(10 ** n for n in range(20))
+NON_DIGITS = re.compile(r'\D')
+_MISSING = object()
+
+
+class PrefixIndex:
+    """Read-only, memory-mapped view of an index written by build_prefix_index
+
+    lookup() answers one number from a dict built on first use (about 400k numbers/s in
+    CPython, where parsing the number alone costs half of that). lookup_many() answers a whole
+    batch with NumPy straight from the mapped key table, at over a million numbers/s per core.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._table = None
+        self._arrays = None
+        magic, version, count, blob_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} phone prefix index")
+        if sys.byteorder != 'little':
+            self.close()
+            raise ValueError("Phone prefix index files are little endian")
+        self.key_count = count
+        self._ids_start = HEADER.size + count * 8
+        blob_start = self._ids_start + count * 4
+        # Record 0 is the "no match" of markers without an indexed prefix of their own
+        self._records = [None] + [
+            PrefixInfo(code or '', country or '', region or '', carrier or '', line_type or 'Unknown',
+                       bool(flags & FLAG_TOLL_FREE), bool(flags & FLAG_VOIP))
+            for code, country, region, carrier, line_type, flags
+            in json.loads(bytes(self._map[blob_start:blob_start + blob_length]).decode('utf-8'))
+        ]
+        with self._views() as (keys, _):
+            # Keys are ascending, so the keys of each digit count form one run
+            self._lengths = tuple(length for length in range(1, len(POWERS_OF_TEN))
+                                  if bisect.bisect_left(keys, POWERS_OF_TEN[length - 1]) <
+                                  bisect.bisect_left(keys, POWERS_OF_TEN[length]))
+
+    @contextmanager
+    def _views(self):
+        view = memoryview(self._map)
+        keys = view[HEADER.size:self._ids_start].cast('Q')
+        ids = view[self._ids_start:self._ids_start + self.key_count * 4].cast('I')
+        try:
+            yield keys, ids
+        finally:
+            keys.release()
+            ids.release()
+            view.release()
+
+    def _probe_table(self) -> Dict[int, Optional[PrefixInfo]]:
+        if self._table is None:
+            with self._views() as (keys, ids):
+                # Built in C from the mapped arrays; each probe is then a single dict lookup
+                self._table = dict(zip(keys, map(self._records.__getitem__, ids)))
+        return self._table
+
+    def lookup(self, number: str) -> Optional[PrefixInfo]:
+        """Return the record of the longest indexed prefix of an E.164 number, if any"""
+        digits = number[1:] if number[:1] == '+' else number
+        if not digits.isdigit():
+            # Separators carry no prefix information
+            digits = NON_DIGITS.sub('', digits)
+            if not digits:
+                return None
+        size = len(digits)
+        if digits[0] == '0' or size >= len(POWERS_OF_TEN):
+            return None
+        value = int(digits)
+        table = self._table if self._table is not None else self._probe_table()
+        lengths = self._lengths
+        found = None
+        low, high = 0, len(lengths) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            length = lengths[middle]
+            if length > size:
+                high = middle - 1
+                continue
+            entry = table.get(value // POWERS_OF_TEN[size - length], _MISSING)
+            if entry is _MISSING:
+                high = middle - 1
+            else:
+                # A prefix or marker: remember its best match and look for a longer one
+                found = entry
+                low = middle + 1
+        return found
+
+    def lookup_many(self, numbers: Iterable[str]) -> List[Optional[PrefixInfo]]:
+        """lookup() for a batch of numbers, vectorized over the mapped key table"""
+        import numpy as np
+
+        numbers = list(numbers)
+        if not numbers:
+            return []
+        try:
+            text = np.array(numbers, dtype='S')
+        except UnicodeEncodeError:
+            # Digits are ASCII; a batch with other characters takes the per-number path
+            lookup = self.lookup
+            return [lookup(number) for number in numbers]
+        if self._arrays is None:
+            self._arrays = (np.frombuffer(self._map, dtype='<u8', count=self.key_count, offset=HEADER.size),
+                            np.frombuffer(self._map, dtype='<u4', count=self.key_count, offset=self._ids_start))
+        keys, ids = self._arrays
+        powers = np.array(POWERS_OF_TEN, dtype=np.uint64)
+
+        # Digit values laid out (character position, number) so each position is contiguous;
+        # '+' and separators are skipped like in lookup()
+        digits = np.ascontiguousarray(text.view(np.uint8).reshape(len(numbers), text.dtype.itemsize).T) - np.uint8(48)
+        is_digit = digits < 10
+        values = np.zeros(len(numbers), dtype=np.uint64)
+        for position in range(len(digits)):
+            values = np.where(is_digit[position], values * np.uint64(10) + digits[position], values)
+        sizes = is_digit.sum(axis=0)
+        leading = digits[is_digit.argmax(axis=0), np.arange(len(numbers))]
+        pending = (sizes > 0) & (sizes < len(POWERS_OF_TEN)) & (leading != 0)
+
+        # Longest prefix first; a marker hit already carries the best shorter match
+        found = np.zeros(len(numbers), dtype=np.int64)
+        for length in reversed(self._lengths):
+            rows = np.flatnonzero(pending & (sizes >= length))
+            if not len(rows):
+                continue
+            candidates = values[rows] // powers[sizes[rows] - length]
+            slots = np.minimum(np.searchsorted(keys, candidates), self.key_count - 1)
+            hits = keys[slots] == candidates
+            found[rows[hits]] = ids[slots[hits]]
+            pending[rows[hits]] = False
+        return list(map(self._records.__getitem__, found.tolist()))
+
+    def close(self):
+        # The NumPy views must go before the map they point into can be closed
+        self._table = None
+        self._arrays = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+_default_index = None
+_default_index_loaded = False
+_default_index_lock = threading.Lock()
+
+
+def get_prefix_index() -> Optional[PrefixIndex]:
+    """Return the shared index from PHONE_PREFIX_INDEX_PATH, or None if it has not been built"""
+    global _default_index, _default_index_loaded
+    if not _default_index_loaded:
+        with _default_index_lock:
+            if not _default_index_loaded:
+                if os.path.exists(DEFAULT_INDEX_PATH):
+                    try:
+                        _default_index = PrefixIndex(DEFAULT_INDEX_PATH)
+                    except (OSError, ValueError) as e:
+                        print(f"Error opening phone prefix index: {str(e)}")
+                _default_index_loaded = True
+    return _default_index
+
+
+def lookup_prefix(number: str) -> Optional[PrefixInfo]:
+    """Look a number up in the shared index; None when there is no index or no match"""
+    index = get_prefix_index()
+    return index.lookup(number) if index else None
+
+
+def lookup_prefixes(numbers: List[str]) -> List[Optional[PrefixInfo]]:
+    """lookup_prefix for a batch of numbers in one vectorized pass"""
+    index = get_prefix_index()
+    return index.lookup_many(numbers) if index else [None] * len(numbers)
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Build or query the offline phone prefix index")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Build the index from phonenumbers data and optional CSVs')
+    build.add_argument('-o', '--output', default=DEFAULT_INDEX_PATH, help='Index file to write')
+    build.add_argument('--csv', action='append', default=[], help='Extra prefix CSV (may repeat)')
+    build.add_argument('--no-phonenumbers', action='store_true', help='Only index the CSV files')
+    query = commands.add_parser('lookup', help='Look numbers up in an index')
+    query.add_argument('numbers', nargs='+')
+    query.add_argument('-i', '--index', default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        def entries():
+            if not args.no_phonenumbers:
+                yield from phonenumbers_entries()
+            for path in args.csv:
+                yield from csv_entries(path)
+
+        started = time.monotonic()
+        summary = build_prefix_index(entries(), args.output)
+        summary['seconds'] = round(time.monotonic() - started, 2)
+        print(json.dumps(summary))
+        return
+
+    index = PrefixIndex(args.index)
+    try:
+        for number in args.numbers:
+            info = index.lookup(number)
+            print(json.dumps({'number': number, **(info._asdict() if info else {})}, ensure_ascii=False))
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,47 +3,128 @@ import re
 import json
 import asyncio
 import aiohttp
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator
 import phonenumbers
-from phonenumbers import geocoder, carrier, timezone
 from bs4 import BeautifulSoup
 import requests
-from urllib.parse import quote_plus
+from urllib.parse import quote_plus, urlparse
 import os
 from dotenv import load_dotenv
 from .phoneinfoga_wrapper import PhoneInfogaWrapper
+from .phone_metadata import lookup_number_metadata, line_type_for
+from .phone_batch import scan_batch
+from .scan_cache import get_scan_cache
+from .reputation_store import get_reputation_store
 import random
 
 load_dotenv()
 
+# Class-name patterns people search sites use for owner details, compiled once per process
+NAME_CLASS = re.compile(r'name|person|owner|subscriber')
+ADDRESS_CLASS = re.compile(r'address|location|residence')
+EMAIL_CLASS = re.compile(r'email|contact')
+
+# Display names used by PhoneInfogaWrapper's social_media section for the probed platforms
+PLATFORM_NAMES = {'facebook': 'Facebook', 'linkedin': 'LinkedIn', 'twitter': 'Twitter',
+                  'instagram': 'Instagram', 'tiktok': 'TikTok', 'telegram': 'Telegram'}
+
+
+def _classify(classes: List[str], found: Dict[str, List[str]], text: str):
+    text = text.strip()
+    if not text:
+        return
+    if any(NAME_CLASS.search(c) for c in classes) and len(text) > 5:
+        found['names'].append(text)
+    if any(ADDRESS_CLASS.search(c) for c in classes) and len(text) > 10:
+        found['addresses'].append(text)
+    if any(EMAIL_CLASS.search(c) for c in classes) and '@' in text:
+        found['emails'].append(text)
+
+
+def extract_owner_fields(html: str) -> Dict[str, List[str]]:
+    """Pull names, addresses and emails out of elements whose class matches the owner patterns"""
+    found = {'names': [], 'addresses': [], 'emails': []}
+    try:
+        import lxml.html
+    except ImportError:
+        # BeautifulSoup's pure-Python parser is the slow fallback when lxml is not installed
+        soup = BeautifulSoup(html, 'html.parser')
+        for element in soup.find_all(class_=True):
+            _classify(element.get('class', []), found, element.get_text())
+        return found
+
+    for element in lxml.html.fromstring(html).xpath('//*[@class]'):
+        _classify(element.get('class', '').split(), found, element.text_content())
+    return found
+
+
 class PhoneScanner:
-    def __init__(self):
-        self.session = None
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        # An app-scoped session (see scanner_service) is shared across scans and never closed here
+        self.session = session
+        self._owns_session = session is None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.phoneinfoga = PhoneInfogaWrapper()
+        self.phoneinfoga = PhoneInfogaWrapper(session=session)
+        # People search sites queried for owner info; {number} is the national number
+        self.search_engines = [
+            'https://www.whitepages.com/phone/1-{number}',
+            'https://www.truepeoplesearch.com/resultphone?phoneno={number}',
+            'https://www.spokeo.com/{number}'
+        ]
+        self.probe_deadline = float(os.getenv('PHONE_PROBE_DEADLINE', 8))
+        self.per_host_limit = int(os.getenv('PHONE_PROBE_PER_HOST', 2))
+        self._host_semaphores = {}
+        self.scan_cache = get_scan_cache()
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(headers=self.headers,
+                                                 timeout=aiohttp.ClientTimeout(total=self.probe_deadline))
+            self._owns_session = True
+            # Semaphores belong to the event loop the session runs on
+            self._host_semaphores = {}
+        # API clients share the scanner's pool instead of opening their own
+        self.phoneinfoga.use_session(self.session)
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        await self.phoneinfoga.close()
+        if self.session and self._owns_session:
             await self.session.close()
+            self.session = None
     
-    async def scan_number(self, phone_number: str) -> Dict[str, Any]:
+    async def scan_number(self, phone_number: str, use_cache: bool = True) -> Dict[str, Any]:
         """Scan phone number primarily using PhoneInfoga"""
+        # Clean phone number format
+        if not phone_number.startswith('+'):
+            if phone_number.startswith('1'):
+                phone_number = '+' + phone_number
+            else:
+                phone_number = '+1' + phone_number
+        if not use_cache:
+            return await self._scan_number_uncached(phone_number)
+
+        # Equivalent spellings of a number share one cache entry
         try:
-            # Clean phone number format
-            if not phone_number.startswith('+'):
-                if phone_number.startswith('1'):
-                    phone_number = '+' + phone_number
-                else:
-                    phone_number = '+1' + phone_number
-            
-            # Get results from PhoneInfoga
-            phoneinfoga_result = await self.phoneinfoga.scan_number(phone_number)
+            key = lookup_number_metadata(phone_number).e164
+        except Exception:
+            key = self._clean_number(phone_number)
+        return await self.scan_cache.get_or_fetch(
+            key,
+            lambda: self._scan_number_uncached(key),
+            cacheable=lambda result: bool(result.get("success"))
+        )
+
+    async def _scan_number_uncached(self, phone_number: str) -> Dict[str, Any]:
+        """Run every provider for a normalized number"""
+        try:
+            # PhoneInfoga and the owner-info/social web probes run at the same time
+            phoneinfoga_result, web_presence = await asyncio.gather(
+                self.phoneinfoga.scan_number(phone_number),
+                self.scan_web_presence(phone_number)
+            )
             
             if not phoneinfoga_result or "error" in phoneinfoga_result:
                 return {
@@ -60,7 +141,8 @@ class PhoneScanner:
                 }
             
             # If successful, the phoneinfoga_result should contain all necessary data
-            # Pass it directly to the template
+            # Pass it directly to the template, with the web probe findings merged in
+            self._merge_web_presence(phoneinfoga_result.get("scan_results", phoneinfoga_result), web_presence)
             return {
                 "success": True,
                 "scan_results": phoneinfoga_result
@@ -72,6 +154,10 @@ class PhoneScanner:
                 "error": f"Error scanning phone number: {str(e)}"
             }
 
+    def scan_batch(self, numbers: Iterable[str], **kwargs) -> Iterator[Dict[str, Any]]:
+        """Offline batch mode: stream enriched, deduplicated records for many numbers"""
+        return scan_batch(numbers, **kwargs)
+
     def _clean_number(self, number: str) -> str:
         """Clean and format phone number"""
         cleaned = re.sub(r'[^\d+]', '', number)
@@ -81,17 +167,7 @@ class PhoneScanner:
 
     def _get_line_type(self, parsed_number: phonenumbers.PhoneNumber) -> str:
         """Determine the type of phone line"""
-        try:
-            if phonenumbers.number_type(parsed_number) == phonenumbers.PhoneNumberType.MOBILE:
-                return "Mobile"
-            elif phonenumbers.number_type(parsed_number) == phonenumbers.PhoneNumberType.FIXED_LINE:
-                return "Landline"
-            elif phonenumbers.number_type(parsed_number) == phonenumbers.PhoneNumberType.VOIP:
-                return "VoIP"
-            else:
-                return "Unknown"
-        except:
-            return "Unknown"
+        return line_type_for(parsed_number)
 
     async def _scan_numverify(self, session: aiohttp.ClientSession, number: str) -> Dict[str, Any]:
         """Scan using NumVerify API"""
@@ -100,12 +176,13 @@ class PhoneScanner:
             clean_number = number.replace('+', '')
             
             # This would typically use the NumVerify API
-            # For demo, returning placeholder data
+            # For demo, returning placeholder data from the shared per-number metadata
+            meta = lookup_number_metadata(number)
             return {
                 'valid': True,
-                'line_type': self._get_line_type(phonenumbers.parse(number)),
-                'carrier': carrier.name_for_number(phonenumbers.parse(number), "en") or "Unknown",
-                'location': geocoder.description_for_number(phonenumbers.parse(number), "en") or "Unknown"
+                'line_type': meta.line_type,
+                'carrier': meta.carrier or "Unknown",
+                'location': meta.location or "Unknown"
             }
         except Exception:
             return {
@@ -113,7 +190,73 @@ class PhoneScanner:
                 'error': 'Unable to verify number'
             }
 
-    async def _scan_owner_info(self, session: aiohttp.ClientSession, number: str) -> Dict[str, Any]:
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """One semaphore per host so concurrent probes never hammer a single site"""
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return semaphore
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: str, read_body: bool = True):
+        """GET a URL under its host's limit; returns (status, body or None)"""
+        async with self._host_semaphore(url):
+            async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}) as response:
+                body = await response.text(errors='replace') if read_body and response.status == 200 else None
+                return response.status, body
+
+    async def _run_probes(self, probes: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+        """Run probe coroutines concurrently; whatever has not finished by the deadline is dropped"""
+        tasks = {asyncio.ensure_future(coro): key for key, coro in probes.items()}
+        if not tasks:
+            return {}
+        done, pending = await asyncio.wait(tasks, timeout=max(deadline, 0))
+        for task in pending:
+            task.cancel()
+        results = {}
+        for task in done:
+            if not task.cancelled() and task.exception() is None:
+                results[tasks[task]] = task.result()
+        return results
+
+    async def scan_web_presence(self, number: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Owner-info and social probes for a number, all in flight at once under one deadline"""
+        deadline = self.probe_deadline if deadline is None else deadline
+        session = self.session
+        if session is None or session.closed:
+            # Used outside "async with" and without an app-scoped session: nothing to probe with
+            return {'owner_info': None, 'social_media': None}
+        owner_info, social = await asyncio.gather(
+            self._scan_owner_info(session, number, deadline),
+            self._scan_social_media(session, number, deadline)
+        )
+        return {'owner_info': owner_info, 'social_media': social}
+
+    @staticmethod
+    def _merge_web_presence(scan_results: Dict[str, Any], web_presence: Dict[str, Any]):
+        """Add owner details and profiles found by the web probes to PhoneInfoga's scan results"""
+        if web_presence.get('owner_info'):
+            scan_results['owner_info'] = web_presence['owner_info']
+        profiles = (web_presence.get('social_media') or {}).get('profiles', [])
+        if not profiles:
+            return
+        social_media = scan_results.setdefault('social_media', {})
+        platforms_found = social_media.setdefault('platforms_found', [])
+        platform_data = social_media.setdefault('platform_data', {})
+        for profile in profiles:
+            platform = PLATFORM_NAMES.get(profile['platform'], profile['platform'])
+            if platform not in platforms_found:
+                platforms_found.append(platform)
+            platform_data.setdefault(platform, {
+                "associated": True,
+                "profile_name": "Profile found via search",
+                "public": True,
+                "url": profile['url']
+            })
+        social_media['profiles'] = profiles
+
+    async def _scan_owner_info(self, session: aiohttp.ClientSession, number: str,
+                               deadline: Optional[float] = None) -> Dict[str, Any]:
         """Scan for owner information"""
         clean_number = number.replace('+1', '').replace('-', '')
         owner_info = {
@@ -124,45 +267,34 @@ class PhoneScanner:
             'associated_numbers': []
         }
 
-        # Search various people search engines
-        for search_url in self.search_engines:
+        # Query every people search engine at once
+        probes = {
+            index: self._fetch(session, search_url.format(number=clean_number))
+            for index, search_url in enumerate(self.search_engines)
+        }
+        pages = await self._run_probes(probes, self.probe_deadline if deadline is None else deadline)
+
+        for index in sorted(pages):
+            status, text = pages[index]
+            if status != 200 or not text:
+                continue
             try:
-                formatted_url = search_url.format(number=clean_number)
-                async with session.get(formatted_url, headers={'User-Agent': 'Mozilla/5.0'}) as response:
-                    if response.status == 200:
-                        text = await response.text()
-                        # Extract information from the response
-                        # This is a simplified example - in reality, you'd need to parse the HTML properly
-                        soup = BeautifulSoup(text, 'html.parser')
-                        
-                        # Look for common patterns in people search sites
-                        names = soup.find_all(class_=re.compile(r'name|person|owner|subscriber'))
-                        addresses = soup.find_all(class_=re.compile(r'address|location|residence'))
-                        emails = soup.find_all(class_=re.compile(r'email|contact'))
-                        
-                        for name in names:
-                            if name.text.strip() and len(name.text.strip()) > 5:
-                                owner_info['possible_names'].append(name.text.strip())
-                        
-                        for addr in addresses:
-                            if addr.text.strip() and len(addr.text.strip()) > 10:
-                                owner_info['possible_addresses'].append(addr.text.strip())
-                        
-                        for email in emails:
-                            if email.text.strip() and '@' in email.text:
-                                owner_info['email_addresses'].append(email.text.strip())
-                                
+                found = extract_owner_fields(text)
             except Exception:
                 continue
+            owner_info['possible_names'].extend(found['names'])
+            owner_info['possible_addresses'].extend(found['addresses'])
+            owner_info['email_addresses'].extend(found['emails'])
 
         # Remove duplicates
-        owner_info['possible_names'] = list(set(owner_info['possible_names']))
-        owner_info['possible_addresses'] = list(set(owner_info['possible_addresses']))
-        owner_info['email_addresses'] = list(set(owner_info['email_addresses']))
+        owner_info['possible_names'] = list(dict.fromkeys(owner_info['possible_names']))
+        owner_info['possible_addresses'] = list(dict.fromkeys(owner_info['possible_addresses']))
+        owner_info['email_addresses'] = list(dict.fromkeys(owner_info['email_addresses']))
 
         return owner_info
 
-    async def _scan_social_media(self, session: aiohttp.ClientSession, number: str) -> Dict[str, List[str]]:
+    async def _scan_social_media(self, session: aiohttp.ClientSession, number: str,
+                                 deadline: Optional[float] = None) -> Dict[str, List[str]]:
         """Search for social media profiles"""
         clean_number = number.replace('+1', '').replace('-', '')
         platforms = {
@@ -173,19 +305,19 @@ class PhoneScanner:
             'tiktok': f'https://www.tiktok.com/search?q={clean_number}',
             'telegram': f'https://t.me/{clean_number}'
         }
-        
+
+        # Only the status matters here, so bodies are never downloaded
+        probes = {platform: self._fetch(session, url, read_body=False) for platform, url in platforms.items()}
+        statuses = await self._run_probes(probes, self.probe_deadline if deadline is None else deadline)
+
         profiles = []
         for platform, url in platforms.items():
-            try:
-                async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}) as response:
-                    if response.status == 200:
-                        profiles.append({
-                            'platform': platform,
-                            'url': url,
-                            'found': True
-                        })
-            except Exception:
-                continue
+            if platform in statuses and statuses[platform][0] == 200:
+                profiles.append({
+                    'platform': platform,
+                    'url': url,
+                    'found': True
+                })
 
         return {'profiles': profiles}
 
@@ -202,6 +334,20 @@ class PhoneScanner:
 
     async def _check_reputation(self, phone_number: str) -> Dict[str, Any]:
         """Check reputation databases for the phone number"""
+        store = get_reputation_store()
+        if store:
+            hit = store.lookup(phone_number)
+            return {
+                "spam_risk": hit.risk if hit else "Low",
+                "fraud_reports": hit.fraud_reports if hit else 0,
+                "spam_reports": hit.spam_reports if hit else 0,
+                "reported_as_spam": bool(hit and hit.spam),
+                "reported_as_fraud": bool(hit and hit.fraud),
+                "spam_categories": list(hit.categories) if hit else [],
+                "last_reported": hit.last_reported if hit else None,
+                "confidence": "High"
+            }
+
         # In a real implementation, this would query reputation databases
         # For the demo, we'll generate some plausible data
         risk_level = random.choice(["Low", "Medium", "High"])
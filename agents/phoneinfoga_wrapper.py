@@ -6,17 +6,18 @@ import re
 import requests
 from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
-import phonenumbers
-from phonenumbers import geocoder, carrier, timezone
-import numlookupapi
 from bs4 import BeautifulSoup
+from .phone_metadata import PhoneMetadata, lookup_number_metadata, line_type_for
+from .phone_prefix_index import lookup_prefix
+from .numlookup_client import AsyncNumLookupClient
+from .reputation_store import get_reputation_store
 
 load_dotenv()
 
 class PhoneInfogaWrapper:
     """Wrapper for PhoneInfoga API"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
         # Using real APIs for phone number lookups
         self.numlookup_api_key = os.getenv('NUMLOOKUP_API_KEY', '')
         self.headers = {
@@ -26,53 +27,58 @@ class PhoneInfogaWrapper:
         # Initialize NumLookup client if API key is available
         self.numlookup_client = None
         if self.numlookup_api_key:
-            try:
-                # The correct way to use the numlookupapi
-                self.numlookup_client = numlookupapi.Client(self.numlookup_api_key)
-            except Exception as e:
-                print(f"Error initializing NumLookup API client: {str(e)}")
-                self.numlookup_client = None
+            self.numlookup_client = AsyncNumLookupClient(self.numlookup_api_key, session=session)
+
+    def use_session(self, session: Optional[aiohttp.ClientSession]):
+        """Route API clients through a caller-owned session"""
+        if self.numlookup_client:
+            self.numlookup_client.use_session(session)
+
+    async def close(self):
+        """Close any session an API client opened for itself"""
+        if self.numlookup_client:
+            await self.numlookup_client.close()
         
     async def scan_number(self, phone_number: str) -> Dict[str, Any]:
         """Scan a phone number using real APIs and web scraping techniques"""
         clean_number = self._clean_phone_number(phone_number)
         
         try:
-            # First parse the number with phonenumbers library for basic info
-            parsed = phonenumbers.parse(clean_number)
-            if not phonenumbers.is_valid_number(parsed):
+            # Parse the number once; the metadata record is shared through an LRU keyed by number
+            meta = lookup_number_metadata(clean_number)
+            if not meta.valid:
                 return self._generate_demo_data(clean_number)
             
             # Get basic data from phonenumbers library
             basic_data = {
-                "valid": phonenumbers.is_valid_number(parsed),
+                "valid": meta.valid,
                 "local": {
                     "number": clean_number,
-                    "valid": phonenumbers.is_valid_number(parsed),
+                    "valid": meta.valid,
                     "format": {
-                        "international": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL),
-                        "national": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.NATIONAL),
-                        "e164": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+                        "international": meta.international,
+                        "national": meta.national,
+                        "e164": meta.e164
                     },
                     "country": {
-                        "code": phonenumbers.region_code_for_number(parsed),
-                        "name": geocoder.country_name_for_number(parsed, "en"),
-                        "prefix": f"+{parsed.country_code}"
+                        "code": meta.region_code,
+                        "name": meta.country_name,
+                        "prefix": f"+{meta.country_code}"
                     },
                     "carrier": {
-                        "name": carrier.name_for_number(parsed, "en") or "Unknown"
+                        "name": meta.carrier or "Unknown"
                     },
                     "line": {
-                        "type": self._get_line_type(parsed)
+                        "type": meta.line_type
                     }
                 },
                 "numverify": {
                     "valid": True,
                     "number": clean_number,
-                    "line_type": self._get_line_type(parsed),
-                    "country": geocoder.country_name_for_number(parsed, "en"),
-                    "location": geocoder.description_for_number(parsed, "en") or "Unknown",
-                    "carrier": carrier.name_for_number(parsed, "en") or "Unknown"
+                    "line_type": meta.line_type,
+                    "country": meta.country_name,
+                    "location": meta.location or "Unknown",
+                    "carrier": meta.carrier or "Unknown"
                 }
             }
             
@@ -80,9 +86,8 @@ class PhoneInfogaWrapper:
             numlookup_data = None
             if self.numlookup_client:
                 try:
-                    # This is a synchronous call - would be better to use async version if available
-                    # The correct method name for the numlookupapi.Client is 'validate' not 'phone_number'
-                    numlookup_data = self.numlookup_client.validate(clean_number.replace('+', ''))
+                    # Pooled, cached and retried; the round trip no longer blocks the event loop
+                    numlookup_data = await self.numlookup_client.validate(clean_number.replace('+', ''))
                     
                     # Update basic data with NumLookup data
                     if numlookup_data:
@@ -98,7 +103,7 @@ class PhoneInfogaWrapper:
                     print(f"NumLookup API error: {str(e)}")
             
             # Get real search results using web scraping
-            google_data = await self._get_real_search_results(clean_number, parsed)
+            google_data = await self._get_real_search_results(clean_number, meta)
             basic_data["googlesearch"] = google_data
             
             # Get real spam data
@@ -111,8 +116,8 @@ class PhoneInfogaWrapper:
                 "number_type": basic_data.get("local", {}).get("line", {}).get("type") or 
                            basic_data.get("numverify", {}).get("line_type") or "Unknown",
                 "area_code": clean_number[-10:-7] if len(clean_number) >= 10 else "Unknown",
-                "is_toll_free": bool(re.match(r'^\+?1?(800|888|877|866|855|844)', clean_number)),
-                "is_voip": (basic_data.get("local", {}).get("line", {}).get("type") == "VoIP"),
+                "is_toll_free": self._is_toll_free(clean_number),
+                "is_voip": self._is_voip(clean_number, basic_data.get("local", {}).get("line", {}).get("type")),
                 "registration_date": "Unknown"
             }
             basic_data["metadata"] = metadata
@@ -229,22 +234,12 @@ class PhoneInfogaWrapper:
     
     def _get_line_type(self, parsed_number):
         """Get the line type from a parsed number"""
-        try:
-            if phonenumbers.number_type(parsed_number) == phonenumbers.PhoneNumberType.MOBILE:
-                return "Mobile"
-            elif phonenumbers.number_type(parsed_number) == phonenumbers.PhoneNumberType.FIXED_LINE:
-                return "Landline"
-            elif phonenumbers.number_type(parsed_number) == phonenumbers.PhoneNumberType.VOIP:
-                return "VoIP"
-            else:
-                return "Unknown"
-        except:
-            return "Unknown"
+        return line_type_for(parsed_number)
             
-    async def _get_real_search_results(self, phone_number: str, parsed_number) -> Dict[str, Any]:
+    async def _get_real_search_results(self, phone_number: str, meta: PhoneMetadata) -> Dict[str, Any]:
         """Get real search results for the phone number using web scraping"""
         clean_num = phone_number.replace('+', '')
-        national_format = phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.NATIONAL)
+        national_format = meta.national
         
         # Create actual links to real search results
         links = [
@@ -283,14 +278,49 @@ class PhoneInfogaWrapper:
         
         return individuals
     
+    def _is_toll_free(self, phone_number: str) -> bool:
+        """Toll-free flag from the offline prefix index, or the NANP prefix regex without one"""
+        prefix_info = lookup_prefix(phone_number)
+        if prefix_info:
+            return prefix_info.toll_free
+        return bool(re.match(r'^\+?1?(800|888|877|866|855|844)', phone_number))
+
+    def _is_voip(self, phone_number: str, line_type: Optional[str]) -> bool:
+        """VoIP if the line type says so or the number sits in an indexed VoIP range"""
+        if line_type == "VoIP":
+            return True
+        prefix_info = lookup_prefix(phone_number)
+        return bool(prefix_info and prefix_info.voip)
+
     async def _get_real_spam_data(self, phone_number: str) -> Dict[str, Any]:
         """Get real spam data for the phone number"""
         # Clean the number for searching
         clean_num = phone_number.replace('+', '').replace('-', '').replace(' ', '')
+
+        # Ingested spam/fraud lists answer from memory when the local store exists
+        store = get_reputation_store()
+        if store:
+            hit = store.lookup(phone_number)
+            if hit is None:
+                return {"spam": False, "fraud": False, "score": 0, "source": "local_lists"}
+            return {
+                "spam": hit.spam,
+                "fraud": hit.fraud,
+                "score": hit.score,
+                "spam_reports": hit.spam_reports,
+                "fraud_reports": hit.fraud_reports,
+                "categories": list(hit.categories),
+                "last_reported": hit.last_reported,
+                "source": "local_lists"
+            }
         
         # Check if the number is a toll-free number
-        toll_free_prefixes = ['800', '833', '844', '855', '866', '877', '888']
-        is_toll_free = any(clean_num.startswith(prefix) for prefix in toll_free_prefixes)
+        prefix_info = lookup_prefix(clean_num)
+        if prefix_info:
+            is_toll_free = prefix_info.toll_free
+        else:
+            toll_free_prefixes = ['800', '833', '844', '855', '866', '877', '888']
+            is_toll_free = any(clean_num.startswith(prefix) for prefix in toll_free_prefixes)
         
         # Try to get spam data from a real source
         spam_data = {
@@ -309,39 +339,32 @@ class PhoneInfogaWrapper:
         clean_number = self._clean_phone_number(phone_number)
         
         try:
-            parsed = phonenumbers.parse(clean_number)
-            is_valid = phonenumbers.is_valid_number(parsed)
+            meta = lookup_number_metadata(clean_number)
+            is_valid = meta.valid
             
             # Create basic info
             basic_info = {
                 "raw": clean_number,
-                "formatted": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.NATIONAL) if is_valid else clean_number,
-                "international": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL) if is_valid else clean_number,
-                "e164": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164) if is_valid else clean_number,
-                "country": geocoder.country_name_for_number(parsed, "en") if is_valid else "Unknown",
-                "region": geocoder.description_for_number(parsed, "en") if is_valid else "Unknown",
-                "carrier": carrier.name_for_number(parsed, "en") if is_valid else "Unknown",
+                "formatted": meta.national if is_valid else clean_number,
+                "international": meta.international if is_valid else clean_number,
+                "e164": meta.e164 if is_valid else clean_number,
+                "country": meta.country_name if is_valid else "Unknown",
+                "region": meta.location if is_valid else "Unknown",
+                "carrier": meta.carrier if is_valid else "Unknown",
                 "timezone": [],
                 "is_valid": is_valid,
-                "is_possible": phonenumbers.is_possible_number(parsed) if is_valid else False
+                "is_possible": meta.possible if is_valid else False
             }
             
             # Determine line type
-            line_type = "Unknown"
-            if is_valid:
-                if phonenumbers.number_type(parsed) == phonenumbers.PhoneNumberType.MOBILE:
-                    line_type = "Mobile"
-                elif phonenumbers.number_type(parsed) == phonenumbers.PhoneNumberType.FIXED_LINE:
-                    line_type = "Landline"
-                elif phonenumbers.number_type(parsed) == phonenumbers.PhoneNumberType.VOIP:
-                    line_type = "VoIP"
+            line_type = meta.line_type if is_valid else "Unknown"
             
             # Create metadata
             metadata = {
                 "number_type": line_type,
                 "area_code": clean_number[-10:-7] if len(clean_number) >= 10 else "Unknown",
-                "is_toll_free": bool(re.match(r'^\+?1?(800|888|877|866|855|844)', clean_number)),
-                "is_voip": line_type == "VoIP",
+                "is_toll_free": self._is_toll_free(clean_number),
+                "is_voip": self._is_voip(clean_number, line_type),
                 "registration_date": "Unknown"
             }
             
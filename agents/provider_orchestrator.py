@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent fan-out over OSINT providers with per-source deadlines and hedged requests
+"""
+import time
+import asyncio
+from collections import deque
+from typing import Dict, Any, Callable, Awaitable, Optional, List
+
+
+class ProviderOrchestrator:
+    """Runs every enabled provider at once and returns whatever finished by the overall deadline"""
+
+    def __init__(self, deadline: float = 8.0, hedge_percentile: float = 0.95, min_samples: int = 20,
+                 history_size: int = 200):
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.history_size = history_size
+        self.providers = {}
+        self.latencies = {}
+
+    def register(self, name: str, fetch: Callable[[str], Awaitable[Any]], timeout: float = 5.0,
+                 backup: Optional[Callable[[str], Awaitable[Any]]] = None):
+        """Add a provider; a backup is fired if the provider is slower than its usual latency"""
+        self.providers[name] = {'fetch': fetch, 'timeout': timeout, 'backup': backup}
+        self.latencies.setdefault(name, deque(maxlen=self.history_size))
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """Latency percentile after which a backup request is sent, once enough samples exist"""
+        samples = self.latencies.get(name)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile))
+        return ordered[index]
+
+    async def _call(self, name: str, query: str) -> Dict[str, Any]:
+        provider = self.providers[name]
+        started = time.monotonic()
+        status = {'status': 'ok', 'latency_ms': None, 'hedged': False, 'source': name}
+        primary = asyncio.ensure_future(asyncio.wait_for(provider['fetch'](query), provider['timeout']))
+        primary_finished = []
+        primary.add_done_callback(lambda task: primary_finished.append(time.monotonic()))
+        tasks = {primary}
+
+        data = None
+        found = False
+        error = None
+        try:
+            delay = self.hedge_delay(name) if provider['backup'] else None
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    status['hedged'] = True
+                    backup = asyncio.ensure_future(
+                        asyncio.wait_for(provider['backup'](query), max(provider['timeout'] - delay, 0.001)))
+                    tasks.add(backup)
+
+            while tasks and not found:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    data, found = task.result(), True
+                    if task is not primary:
+                        status['source'] = f"{name}:backup"
+                    break
+        finally:
+            # Losing or abandoned requests are cancelled, including when the overall deadline hits
+            for task in tasks:
+                task.cancel()
+            # Every primary is sampled, including ones that were hedged, failed or cut off (their
+            # elapsed time is a lower bound), so slow calls are not left out of the percentile
+            now = time.monotonic()
+            self.latencies[name].append((primary_finished[0] if primary_finished else now) - started)
+
+        status['latency_ms'] = round((time.monotonic() - started) * 1000, 1)
+
+        if not found:
+            status['status'] = 'timeout' if isinstance(error, asyncio.TimeoutError) else 'error'
+            status['error'] = str(error) or type(error).__name__
+        return {'status': status, 'data': data}
+
+    async def run(self, query: str, enabled: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Fan out to the enabled providers and collect partial results with per-source status
+
+        Results are keyed by provider name, or by "<name>:backup" when the hedge answered first.
+        """
+        names = [name for name in self.providers if enabled is None or name in enabled]
+        tasks = {asyncio.ensure_future(self._call(name, query)): name for name in names}
+        results, sources = {}, {}
+        if not tasks:
+            return {'results': results, 'sources': sources}
+
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+            sources[tasks[task]] = {'status': 'deadline', 'latency_ms': round(self.deadline * 1000, 1),
+                                    'hedged': False, 'source': tasks[task]}
+        for task in done:
+            name = tasks[task]
+            outcome = task.result()
+            sources[name] = outcome['status']
+            if outcome['status']['status'] == 'ok':
+                # A backup's answer has its own shape, so it is kept under its own key
+                results[outcome['status']['source']] = outcome['data']
+        return {'results': results, 'sources': sources}
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Async RDAP client backed by a cached copy of the IANA bootstrap registry
+"""
+import os
+import json
+import time
+import asyncio
+import aiohttp
+from typing import Dict, Any, List, Optional
+from .whois_cache import registrable_domain
+
+IANA_RDAP_BOOTSTRAP_URL = 'https://data.iana.org/rdap/dns.json'
+RDAP_HEADERS = {'Accept': 'application/rdap+json'}
+
+
+def parse_rdap_domain(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an RDAP domain object onto the WHOIS field names the agents read"""
+    events = {event.get('eventAction'): event.get('eventDate') for event in data.get('events', [])}
+    registrar = None
+    for entity in data.get('entities', []):
+        if 'registrar' in entity.get('roles', []):
+            # vcardArray is ["vcard", [[name, params, type, value], ...]]
+            for item in (entity.get('vcardArray') or [None, []])[1]:
+                if item and item[0] == 'fn':
+                    registrar = item[3]
+                    break
+            registrar = registrar or entity.get('handle')
+            break
+    return {
+        'registrar': registrar,
+        'creation_date': events.get('registration'),
+        'expiration_date': events.get('expiration'),
+        'updated_date': events.get('last changed'),
+        'status': data.get('status', []),
+        'name_servers': [ns.get('ldhName', '').lower() for ns in data.get('nameservers', []) if ns.get('ldhName')]
+    }
+
+
+class RDAPClient:
+    """Looks up domains over RDAP, reusing keep-alive connections per RDAP server"""
+
+    def __init__(self, bootstrap_url: str = IANA_RDAP_BOOTSTRAP_URL, bootstrap_path: Optional[str] = None,
+                 bootstrap_ttl: int = 86400, servers: Optional[Dict[str, str]] = None, timeout: float = 10.0,
+                 concurrency: int = 20, limit_per_host: int = 4, session: Optional[aiohttp.ClientSession] = None):
+        self.bootstrap_url = bootstrap_url
+        self.bootstrap_path = bootstrap_path or os.getenv('RDAP_BOOTSTRAP_PATH', os.path.join('.cache', 'rdap_dns.json'))
+        self.bootstrap_ttl = bootstrap_ttl
+        # Explicit TLD -> base URL entries win over the bootstrap file (used to point at a local stand-in)
+        self.overrides = dict(servers or {})
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.limit_per_host = limit_per_host
+        # A caller-supplied session is shared with other backends and left open on exit
+        self.session = session
+        self._owns_session = session is None
+        self._servers = None
+        self._bootstrap_lock = None
+
+    async def __aenter__(self):
+        if not self._owns_session:
+            return self
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.limit_per_host,
+                                         keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=RDAP_HEADERS
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+
+    def _read_cached_bootstrap(self) -> Optional[Dict[str, Any]]:
+        try:
+            if time.time() - os.path.getmtime(self.bootstrap_path) > self.bootstrap_ttl:
+                return None
+            with open(self.bootstrap_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cached_bootstrap(self, data: Dict[str, Any]):
+        directory = os.path.dirname(self.bootstrap_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.bootstrap_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.bootstrap_path)
+
+    async def load_bootstrap(self) -> Dict[str, str]:
+        """Return the TLD -> RDAP base URL map, downloading the IANA file only when the cached copy is old"""
+        if self._servers is not None:
+            return self._servers
+        if self._bootstrap_lock is None:
+            self._bootstrap_lock = asyncio.Lock()
+        async with self._bootstrap_lock:
+            if self._servers is not None:
+                return self._servers
+            data = self._read_cached_bootstrap()
+            if data is None:
+                try:
+                    async with self.session.get(self.bootstrap_url) as response:
+                        response.raise_for_status()
+                        data = await response.json(content_type=None)
+                    self._write_cached_bootstrap(data)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"Error fetching RDAP bootstrap file: {e}")
+                    data = {'services': []}
+            servers = {}
+            for tlds, urls in data.get('services', []):
+                # Prefer HTTPS endpoints when a registry lists several
+                urls = sorted(urls, key=lambda url: not url.startswith('https'))
+                for tld in tlds:
+                    servers[tld.lower()] = urls[0]
+            servers.update(self.overrides)
+            self._servers = servers
+            return servers
+
+    async def base_url_for(self, domain: str) -> Optional[str]:
+        servers = await self.load_bootstrap()
+        base = servers.get(domain.rsplit('.', 1)[-1].lower())
+        if base and not base.endswith('/'):
+            base += '/'
+        return base
+
+    async def check(self, domain: str) -> Dict[str, Any]:
+        """Check one domain; 404 means available, None means RDAP could not tell"""
+        domain = registrable_domain(domain)
+        result = {'domain': domain, 'available': None, 'status': None, 'fields': {}, 'raw': '', 'source': 'rdap'}
+        base = await self.base_url_for(domain)
+        if not base:
+            result['error'] = 'No RDAP server for TLD'
+            return result
+        try:
+            async with self.session.get(f"{base}domain/{domain}", headers=RDAP_HEADERS) as response:
+                result['status'] = response.status
+                result['raw'] = await response.text()
+                if response.status == 404:
+                    result['available'] = True
+                elif response.status == 200:
+                    result['available'] = False
+                    result['fields'] = parse_rdap_domain(json.loads(result['raw']))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            result['error'] = str(e) or type(e).__name__
+        return result
+
+    async def check_many(self, domains: List[str]) -> List[Dict[str, Any]]:
+        """Check a batch of domains concurrently over the shared session"""
+        await self.load_bootstrap()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(domain):
+            async with semaphore:
+                return await self.check(domain)
+
+        return await asyncio.gather(*(bounded(domain) for domain in domains))
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+Local spam/fraud reputation store for phone numbers.
+
+Spam and fraud lists (CSV) are merged into a sorted table of fixed-width records keyed by the
+E.164 number as an integer. Lookups check a Bloom filter first, so numbers on no list (the common
+case) never touch the table; hits are confirmed with a binary search over the memory-mapped table.
+Each list is also kept on its own under its name, so re-ingesting a refreshed list replaces its
+counts rather than adding to them.
+
+    python -m agents.reputation_store ingest spam_list.csv fraud_list.csv
+    python -m agents.reputation_store remove spam_list
+    python -m agents.reputation_store lookup +12015550123
+"""
+import os
+import re
+import csv
+import json
+import mmap
+import time
+import heapq
+import struct
+import argparse
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .bloom import BloomFilter
+from .phone_batch import NON_DIALABLE, NUMBER_COLUMNS, _to_e164
+
+MAGIC = b'DREP'
+VERSION = 1
+HEADER = struct.Struct('<4sII')
+# number, spam reports, fraud reports, category bitmask, last reported (days since 1970-01-01)
+RECORD = struct.Struct('<QIIHI')
+
+CATEGORIES = ("Telemarketing", "Scam", "Robocall", "Political", "Charity", "Debt Collector", "Fraud", "Other")
+
+DEFAULT_STORE_DIR = os.getenv('REPUTATION_STORE_DIR', os.path.join('.cache', 'reputation'))
+
+_EPOCH = date(1970, 1, 1)
+
+
+class Reputation(NamedTuple):
+    """Aggregated reports for one number across every ingested list"""
+    number: str
+    spam_reports: int
+    fraud_reports: int
+    categories: Tuple[str, ...]
+    last_reported: Optional[str]
+
+    @property
+    def spam(self) -> bool:
+        return self.spam_reports > 0
+
+    @property
+    def fraud(self) -> bool:
+        return self.fraud_reports > 0
+
+    @property
+    def score(self) -> int:
+        return min(100, 20 + self.spam_reports * 10 + self.fraud_reports * 20)
+
+    @property
+    def risk(self) -> str:
+        if self.fraud_reports or self.spam_reports >= 5:
+            return "High"
+        return "Medium" if self.spam_reports else "Low"
+
+
+def _category_mask(value: str) -> int:
+    mask = 0
+    for name in filter(None, (part.strip() for part in value.replace(';', ',').split(','))):
+        matches = [i for i, category in enumerate(CATEGORIES) if category.lower() == name.lower()]
+        mask |= 1 << (matches[0] if matches else CATEGORIES.index("Other"))
+    return mask
+
+
+def _day_number(value: str) -> int:
+    try:
+        return (datetime.strptime(value.strip()[:10], '%Y-%m-%d').date() - _EPOCH).days
+    except ValueError:
+        return 0
+
+
+def _count(value: Optional[str], default: int) -> int:
+    try:
+        return int(value) if value not in (None, '') else default
+    except ValueError:
+        return default
+
+
+def read_list(path: str, default_region: str = 'US') -> Iterator[Tuple[int, int, int, int, int]]:
+    """Yield (number, spam, fraud, categories, last_day) rows from a spam/fraud list CSV.
+
+    Recognized columns: a number column (phone, number, e164, ...), spam_reports, fraud_reports,
+    category/categories, last_reported (YYYY-MM-DD) and type ('spam' or 'fraud'). A row without
+    counts counts as one report of its type, so plain one-column number lists work too.
+    """
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fields = {name.strip().lower(): name for name in reader.fieldnames or []}
+        number_field = next((fields[name] for name in NUMBER_COLUMNS if name in fields), None)
+        if number_field is None:
+            raise ValueError(f"{path} has no phone number column ({', '.join(NUMBER_COLUMNS)})")
+        get = lambda row, name: row.get(fields[name]) if name in fields else None
+
+        for row in reader:
+            raw = NON_DIALABLE.sub('', row.get(number_field) or '')
+            if not raw:
+                continue
+            try:
+                number = int(_to_e164(raw, default_region)[1:])
+            except Exception:
+                continue
+            kind = (get(row, 'type') or 'spam').strip().lower()
+            spam = _count(get(row, 'spam_reports'), 0 if kind == 'fraud' else 1)
+            fraud = _count(get(row, 'fraud_reports'), 1 if kind == 'fraud' else 0)
+            categories = _category_mask(get(row, 'categories') or get(row, 'category') or '')
+            yield number, spam, fraud, categories, _day_number(get(row, 'last_reported') or '')
+
+
+def _merge_rows(rows: Iterable[Tuple[int, int, int, int, int]]) -> Iterator[Tuple[int, int, int, int, int]]:
+    """Combine rows for the same number; the input must be sorted by number"""
+    current = None
+    for row in rows:
+        if current is not None and current[0] == row[0]:
+            current = (row[0], current[1] + row[1], current[2] + row[2], current[3] | row[3], max(current[4], row[4]))
+            continue
+        if current is not None:
+            yield current
+        current = row
+    if current is not None:
+        yield current
+
+
+def list_name(path: str) -> str:
+    """Source name a list is stored under: its file name without extensions"""
+    name = os.path.basename(path).split('.', 1)[0]
+    return re.sub(r'[^\w-]', '_', name) or 'list'
+
+
+def _write_table(path: str, records: Iterable[Tuple[int, int, int, int, int]], bloom: Optional[BloomFilter] = None) -> int:
+    """Write sorted records as a table (atomically); returns the record count"""
+    tmp_path = f"{path}.tmp"
+    total = 0
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0))
+        for record in records:
+            f.write(RECORD.pack(*record))
+            if bloom is not None:
+                bloom.add(record[0])
+            total += 1
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, total))
+    os.replace(tmp_path, path)
+    return total
+
+
+def _read_table(path: str) -> Iterator[Tuple[int, int, int, int, int]]:
+    with open(path, 'rb') as f:
+        magic, version, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} reputation table")
+        for _ in range(count):
+            yield RECORD.unpack(f.read(RECORD.size))
+
+
+class ReputationStore:
+    """Bloom filter + sorted fixed-width table, memory-mapped from a store directory
+
+    Each ingested list keeps its own sorted table under lists/, keyed by list name, and the
+    lookup table is rebuilt from all of them. Ingesting a refreshed snapshot of a list replaces
+    that list's contribution instead of adding to it.
+    """
+
+    def __init__(self, directory: str = DEFAULT_STORE_DIR, recheck_interval: float = 5.0):
+        self.directory = directory
+        self.table_path = os.path.join(directory, 'numbers.bin')
+        self.bloom_path = os.path.join(directory, 'numbers.bloom')
+        self.lists_dir = os.path.join(directory, 'lists')
+        # How often refresh() looks for a table written by another process
+        self.recheck_interval = recheck_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._bloom = None
+        self._mapped_stat = None
+        self._checked_at = 0.0
+        self.count = 0
+        self.reload()
+
+    @property
+    def available(self) -> bool:
+        return self._map is not None
+
+    def _table_stat(self) -> Optional[Tuple[int, int, float]]:
+        try:
+            stat = os.stat(self.table_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime
+
+    def reload(self):
+        """(Re)map the table and filter, e.g. after another process ingested new lists"""
+        with self._lock:
+            self._close()
+            self._checked_at = time.monotonic()
+            self._mapped_stat = self._table_stat()
+            if not (os.path.exists(self.table_path) and os.path.exists(self.bloom_path)):
+                return
+            self._file = open(self.table_path, 'rb')
+            if os.path.getsize(self.table_path) <= HEADER.size:
+                self._file.close()
+                self._file = None
+                return
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                self._close()
+                raise ValueError(f"{self.table_path} is not a version {VERSION} reputation table")
+            self.count = count
+            self._bloom = BloomFilter.load(self.bloom_path)
+
+    def refresh(self):
+        """Reload if the table on disk was replaced since it was mapped (checked at most once per interval)"""
+        if time.monotonic() - self._checked_at < self.recheck_interval:
+            return
+        self._checked_at = time.monotonic()
+        if self._table_stat() != self._mapped_stat:
+            self.reload()
+
+    def _close(self):
+        if self._bloom is not None:
+            self._bloom.close()
+            self._bloom = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.count = 0
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _find(self, key: int) -> Optional[Tuple[int, int, int, int, int]]:
+        table = self._map
+        low, high = 0, self.count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            number = struct.unpack_from('<Q', table, offset)[0]
+            if number < key:
+                low = middle + 1
+            elif number > key:
+                high = middle - 1
+            else:
+                return RECORD.unpack_from(table, offset)
+        return None
+
+    def lookup(self, phone_number: str, default_region: str = 'US') -> Optional[Reputation]:
+        """Return the aggregated reports for a number, or None if it is on no list"""
+        try:
+            e164 = _to_e164(NON_DIALABLE.sub('', phone_number), default_region)
+        except Exception:
+            return None
+        key = int(e164[1:])
+        # reload() may close the map from another thread, so reads hold the lock
+        with self._lock:
+            if self._map is None or key not in self._bloom:
+                return None
+            record = self._find(key)
+        if record is None:
+            return None
+        _, spam, fraud, mask, last_day = record
+        return Reputation(
+            number=e164,
+            spam_reports=spam,
+            fraud_reports=fraud,
+            categories=tuple(name for bit, name in enumerate(CATEGORIES) if mask & (1 << bit)),
+            last_reported=date.fromordinal(_EPOCH.toordinal() + last_day).isoformat() if last_day else None
+        )
+
+    def lists(self) -> List[str]:
+        """Names of the lists currently contributing to the store"""
+        try:
+            return sorted(name[:-len('.bin')] for name in os.listdir(self.lists_dir) if name.endswith('.bin'))
+        except OSError:
+            return []
+
+    def ingest(self, paths: Iterable[str], replace: bool = False, default_region: str = 'US',
+               error_rate: float = 0.001) -> Dict[str, int]:
+        """Store each list CSV under its name (replacing an earlier snapshot of the same list) and
+        rebuild the lookup table from every stored list; replace drops all other lists first"""
+        os.makedirs(self.lists_dir, exist_ok=True)
+        ingested = {}
+        for path in paths:
+            name = list_name(path)
+            rows = sorted(read_list(path, default_region))
+            ingested[name] = _write_table(os.path.join(self.lists_dir, f"{name}.bin"), _merge_rows(rows))
+        if replace:
+            for name in self.lists():
+                if name not in ingested:
+                    os.remove(os.path.join(self.lists_dir, f"{name}.bin"))
+        return {'ingested': sum(ingested.values()), **self._rebuild(error_rate)}
+
+    def remove(self, names: Iterable[str], error_rate: float = 0.001) -> Dict[str, int]:
+        """Drop lists from the store and rebuild the lookup table without them"""
+        for name in names:
+            try:
+                os.remove(os.path.join(self.lists_dir, f"{list_name(name)}.bin"))
+            except FileNotFoundError:
+                pass
+        return self._rebuild(error_rate)
+
+    def _rebuild(self, error_rate: float) -> Dict[str, int]:
+        names = self.lists()
+        paths = [os.path.join(self.lists_dir, f"{name}.bin") for name in names]
+        capacity = 0
+        for path in paths:
+            with open(path, 'rb') as f:
+                capacity += HEADER.unpack(f.read(HEADER.size))[2]
+        bloom = BloomFilter(capacity=max(capacity, 1), error_rate=error_rate)
+        # Every list is sorted, so the combined table is one streaming k-way merge
+        tables = [_read_table(path) for path in paths]
+        total = _write_table(f"{self.table_path}.next", _merge_rows(heapq.merge(*tables)), bloom)
+        with self._lock:
+            self._close()
+            os.replace(f"{self.table_path}.next", self.table_path)
+            bloom.save(self.bloom_path)
+        self.reload()
+        return {'lists': len(names), 'total': total}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_reputation_store() -> Optional[ReputationStore]:
+    """Process-wide store, or None when no lists have been ingested yet"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                try:
+                    _default_store = ReputationStore()
+                except (OSError, ValueError) as e:
+                    print(f"Error opening reputation store: {str(e)}")
+                    return None
+    # Lists ingested by another process (or after start-up) are picked up here
+    _default_store.refresh()
+    return _default_store if _default_store.available else None
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Manage the local phone reputation store")
+    parser.add_argument('--dir', default=DEFAULT_STORE_DIR, help='Store directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='Merge spam/fraud list CSVs into the store')
+    ingest.add_argument('paths', nargs='+')
+    ingest.add_argument('--replace', action='store_true', help='Rebuild from these lists only')
+    remove = commands.add_parser('remove', help='Drop lists (by name) from the store')
+    remove.add_argument('names', nargs='+')
+    commands.add_parser('lists', help='Show the lists in the store')
+    ingest.add_argument('--region', default='US', help='Region for numbers without a + prefix')
+    lookup = commands.add_parser('lookup', help='Look numbers up')
+    lookup.add_argument('numbers', nargs='+')
+    args = parser.parse_args()
+
+    store = ReputationStore(args.dir)
+    try:
+        if args.command == 'ingest':
+            print(json.dumps(store.ingest(args.paths, replace=args.replace, default_region=args.region)))
+        elif args.command == 'remove':
+            print(json.dumps(store.remove(args.names)))
+        elif args.command == 'lists':
+            print(json.dumps(store.lists()))
+        else:
+            for number in args.numbers:
+                hit = store.lookup(number)
+                print(json.dumps({'number': number, 'listed': hit is not None,
+                                  **(hit._asdict() if hit else {})}))
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite run journal for domain availability sweeps.
+
+Every stage result is written as it happens (WAL mode, one commit per domain), so a crashed or
+killed sweep keeps what it already checked, a resumed sweep can skip it, and another process can
+read partial results while the sweep is still running.
+
+    python -m agents.run_journal runs
+    python -m agents.run_journal results --window 24
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_JOURNAL_PATH = os.getenv('RUN_JOURNAL_PATH', os.path.join('.cache', 'run_journal.sqlite3'))
+# Verdicts older than this are not trusted when resuming
+DEFAULT_WINDOW = float(os.getenv('RUN_JOURNAL_WINDOW', 24 * 3600))
+
+# Backend-level outcomes; only the final verdicts below settle a domain
+PASSED = 'passed'
+ELIMINATED = 'eliminated'
+REJECTED = 'rejected'
+AVAILABLE = 'available'
+# The check itself failed; the domain is unsettled and a resumed sweep checks it again
+ERROR = 'error'
+FINAL_VERDICTS = (REJECTED, AVAILABLE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS checks (
+    run_id TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    result TEXT,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (run_id, domain, stage)
+);
+CREATE INDEX IF NOT EXISTS checks_domain ON checks (domain, checked_at);
+CREATE INDEX IF NOT EXISTS checks_verdict ON checks (verdict, checked_at);
+"""
+
+
+class RunJournal:
+    """Append-mostly record of availability checks, safe to read while a sweep writes to it"""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, window: float = DEFAULT_WINDOW):
+        self.path = path
+        self.window = window
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # One connection shared by the loop thread and the caller, serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.run_id = None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def start_run(self, params: Optional[Dict[str, Any]] = None) -> str:
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        with self._lock, self._conn:
+            self._conn.execute('INSERT INTO runs (run_id, started_at, params) VALUES (?, ?, ?)',
+                               (self.run_id, time.time(), json.dumps(params or {})))
+        return self.run_id
+
+    def finish_run(self):
+        if self.run_id is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE runs SET finished_at = ? WHERE run_id = ?', (time.time(), self.run_id))
+
+    def record(self, domain: str, stage: str, verdict: str, result: Optional[Dict[str, Any]] = None):
+        """Record one stage outcome for a domain in the current run"""
+        if self.run_id is None:
+            self.start_run()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO checks (run_id, domain, stage, verdict, result, checked_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (self.run_id, domain, stage, verdict, json.dumps(result) if result is not None else None, time.time())
+            )
+
+    def record_many(self, domains: Iterable[str], stage: str, verdict: str):
+        """Record the same outcome for many domains in one transaction (e.g. a filter stage)"""
+        if self.run_id is None:
+            self.start_run()
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO checks (run_id, domain, stage, verdict, result, checked_at) '
+                'VALUES (?, ?, ?, ?, NULL, ?)',
+                [(self.run_id, domain, stage, verdict, now) for domain in domains]
+            )
+
+    def _since(self, window: Optional[float]) -> float:
+        return time.time() - (self.window if window is None else window)
+
+    def _latest_final(self, domains: List[str], window: Optional[float]) -> Dict[str, Tuple]:
+        """domain -> (stage, verdict, result, checked_at) of its latest final verdict inside the window"""
+        latest = {}
+        with self._lock:
+            for start in range(0, len(domains), 500):
+                chunk = domains[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT domain, stage, verdict, result, checked_at FROM checks WHERE verdict IN (?, ?) "
+                    f"AND checked_at >= ? AND domain IN ({','.join('?' * len(chunk))}) ORDER BY checked_at",
+                    (*FINAL_VERDICTS, self._since(window), *chunk)
+                ).fetchall()
+                # Later verdicts win
+                for domain, *row in rows:
+                    latest[domain] = tuple(row)
+        return latest
+
+    @staticmethod
+    def _settled_result(verdict: str, result: Optional[str]) -> Optional[Dict[str, Any]]:
+        return json.loads(result) if verdict == AVAILABLE and result else None
+
+    def settled(self, domains: Iterable[str], window: Optional[float] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Domains with a final verdict inside the window: result dict if available, None if rejected"""
+        latest = self._latest_final(list(dict.fromkeys(domains)), window)
+        return {domain: self._settled_result(verdict, result) for domain, (_, verdict, result, _) in latest.items()}
+
+    def adopt(self, domains: Iterable[str], window: Optional[float] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Like settled(), but also copy those verdicts into the current run (keeping their time)
+
+        A resumed run then holds every verdict it served, so results(run_id) and a later resume
+        of this run see them too.
+        """
+        latest = self._latest_final(list(dict.fromkeys(domains)), window)
+        if latest:
+            if self.run_id is None:
+                self.start_run()
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO checks (run_id, domain, stage, verdict, result, checked_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [(self.run_id, domain, *row) for domain, row in latest.items()]
+                )
+        return {domain: self._settled_result(verdict, result) for domain, (_, verdict, result, _) in latest.items()}
+
+    def checked_domains(self, window: Optional[float] = None) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute('SELECT DISTINCT domain FROM checks WHERE verdict IN (?, ?) AND checked_at >= ?',
+                                      (*FINAL_VERDICTS, self._since(window))).fetchall()
+        return {domain for domain, in rows}
+
+    def results(self, run_id: Optional[str] = None, window: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Available results so far, best score first (for one run, or everything in the window)"""
+        query = 'SELECT domain, verdict, result FROM checks WHERE verdict IN (?, ?)'
+        args = list(FINAL_VERDICTS)
+        if run_id:
+            query += ' AND run_id = ?'
+            args.append(run_id)
+        else:
+            query += ' AND checked_at >= ?'
+            args.append(self._since(window))
+        with self._lock:
+            rows = self._conn.execute(query + ' ORDER BY checked_at', args).fetchall()
+        # Later verdicts win, so a name rejected after it was found available is dropped
+        latest = {}
+        for domain, verdict, result in rows:
+            latest[domain] = self._settled_result(verdict, result)
+        return sorted((result for result in latest.values() if result),
+                      key=lambda result: result.get('score', 0), reverse=True)
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT r.run_id, r.started_at, r.finished_at, r.params, '
+                '(SELECT COUNT(DISTINCT domain) FROM checks c WHERE c.run_id = r.run_id AND c.verdict IN (?, ?)), '
+                '(SELECT COUNT(*) FROM checks c WHERE c.run_id = r.run_id AND c.verdict = ?) '
+                'FROM runs r ORDER BY r.started_at DESC LIMIT ?',
+                (*FINAL_VERDICTS, AVAILABLE, limit)
+            ).fetchall()
+        return [{'run_id': run_id, 'started_at': started, 'finished_at': finished, 'params': json.loads(params or '{}'),
+                 'checked': checked, 'available': available}
+                for run_id, started, finished, params, checked, available in rows]
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Inspect the domain check run journal")
+    parser.add_argument('--path', default=DEFAULT_JOURNAL_PATH, help='Journal database')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('runs', help='List recent runs')
+    results = commands.add_parser('results', help='Available domains found so far')
+    results.add_argument('--run', help='Only this run')
+    results.add_argument('--window', type=float, default=24, help='Hours to look back without --run')
+    args = parser.parse_args()
+
+    journal = RunJournal(args.path)
+    try:
+        if args.command == 'runs':
+            for run in journal.runs():
+                print(json.dumps(run))
+        else:
+            for result in journal.results(run_id=args.run, window=args.window * 3600):
+                print(json.dumps(result))
+    finally:
+        journal.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Stale-while-revalidate result cache for full phone scans, keyed by E.164
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable
+
+
+class ScanResultCache:
+    """Bounded LRU of scan results; fresh entries are served as-is, stale ones while a refresh runs"""
+
+    def __init__(self, ttl: float = 3600, stale_ttl: float = 86400, max_entries: int = 5000):
+        self.ttl = ttl
+        # How long past the TTL an entry may still be served while it is refreshed in the background
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+        self._in_flight = {}
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0,
+                      'refresh_failures': 0, 'evictions': 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _lookup(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            stored_at, result = entry
+            age = time.time() - stored_at
+            if age > self.ttl + self.stale_ttl:
+                del self._entries[key]
+                return None, None
+            self._entries.move_to_end(key)
+            return result, age
+
+    def store(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                     cacheable: Callable[[Dict[str, Any]], bool]) -> Dict[str, Any]:
+        result = await fetch()
+        if cacheable(result):
+            self.store(key, result)
+        return result
+
+    async def _refresh(self, key: str, fetch, cacheable):
+        try:
+            result = await self._fetch(key, fetch, cacheable)
+            if not cacheable(result):
+                self._count('refresh_failures')
+        except Exception as e:
+            self._count('refresh_failures')
+            print(f"Background refresh of {key} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                           cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True
+                           ) -> Dict[str, Any]:
+        """Return the cached result for key, fetching (or revalidating in the background) as needed"""
+        result, age = self._lookup(key)
+        if result is not None:
+            if age <= self.ttl:
+                self._count('hits')
+                return {**result, 'cache': {'status': 'hit', 'age_seconds': round(age, 1)}}
+
+            self._count('stale_hits')
+            with self._lock:
+                start_refresh = key not in self._refreshing
+                if start_refresh:
+                    self._refreshing.add(key)
+                    self.stats['refreshes'] += 1
+            if start_refresh:
+                task = asyncio.ensure_future(self._refresh(key, fetch, cacheable))
+                # Keep a reference so the refresh is not garbage-collected mid-flight
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return {**result, 'cache': {'status': 'stale', 'age_seconds': round(age, 1)}}
+
+        self._count('misses')
+        # Concurrent misses for the same number on the same loop share one scan
+        pending = self._in_flight.get(key)
+        if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+            pending = asyncio.ensure_future(self._fetch(key, fetch, cacheable))
+            self._in_flight[key] = pending
+            pending.add_done_callback(lambda task: self._in_flight.pop(key, None)
+                                      if self._in_flight.get(key) is task else None)
+        result = await asyncio.shield(pending)
+        return {**result, 'cache': {'status': 'miss', 'age_seconds': 0}}
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters plus size and hit rate (fresh and stale hits over all lookups)"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['stale_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_scan_cache() -> ScanResultCache:
+    """Process-wide scan cache configured from the environment"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ScanResultCache(
+                    ttl=float(os.getenv('PHONE_SCAN_CACHE_TTL', 3600)),
+                    stale_ttl=float(os.getenv('PHONE_SCAN_CACHE_STALE', 86400)),
+                    max_entries=int(os.getenv('PHONE_SCAN_CACHE_SIZE', 5000))
+                )
+    return _default_cache
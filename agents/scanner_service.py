@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+App-scoped phone scanning: one background event loop and one pooled aiohttp session shared
+by every scan, so back-to-back scans reuse warm keep-alive connections and cached DNS.
+
+Flask:
+    service = get_phone_scanner_service()
+    service.init_app(app)
+    result = service.scan_number('+12015550123')
+
+ASGI (FastAPI/Starlette):
+    service.init_app(app)
+    result = await service.scan_number_async('+12015550123')
+"""
+import os
+import atexit
+import asyncio
+import threading
+import aiohttp
+from typing import Dict, Any, Optional, Coroutine
+from .phone_scanner import PhoneScanner
+
+
+class PhoneScannerService:
+    """Owns the connector, session and loop behind a long-lived PhoneScanner"""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 8, keepalive_timeout: float = 30.0,
+                 dns_cache_ttl: int = 300, request_timeout: float = 30.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.request_timeout = request_timeout
+        self.loop = None
+        self.session = None
+        self.scanner = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.loop is not None and self._thread is not None and self._thread.is_alive()
+
+    async def _open(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+        )
+        self.scanner = PhoneScanner(session=self.session)
+        self.session.headers.update(self.scanner.headers)
+
+    async def _close(self):
+        if self.scanner:
+            await self.scanner.phoneinfoga.close()
+        if self.session and not self.session.closed:
+            await self.session.close()
+            # Give the connector a moment to close TLS transports cleanly
+            await asyncio.sleep(0.25)
+        self.session = None
+        self.scanner = None
+
+    def start(self) -> 'PhoneScannerService':
+        """Start the loop thread and open the shared session; safe to call repeatedly"""
+        with self._lock:
+            if self.running:
+                return self
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='phone-scanner-loop', daemon=True)
+            thread.start()
+            self.loop, self._thread = loop, thread
+            asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+        return self
+
+    def shutdown(self, timeout: float = 10.0):
+        """Close the session and stop the loop; registered with atexit and app shutdown hooks"""
+        with self._lock:
+            if not self.running:
+                return
+            loop, thread = self.loop, self._thread
+            try:
+                asyncio.run_coroutine_threadsafe(self._close(), loop).result(timeout)
+            except Exception as e:
+                print(f"Error closing phone scanner session: {str(e)}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            loop.close()
+            self.loop, self._thread = None, None
+
+    def submit(self, coro: Coroutine) -> 'asyncio.Future':
+        """Schedule a coroutine on the service loop and return a concurrent.futures.Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def scan_number(self, phone_number: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking scan for sync callers such as Flask views"""
+        self.start()
+        return self.submit(self.scanner.scan_number(phone_number)).result(timeout)
+
+    async def scan_number_async(self, phone_number: str) -> Dict[str, Any]:
+        """Awaitable scan for ASGI handlers running on their own event loop"""
+        self.start()
+        if asyncio.get_running_loop() is self.loop:
+            return await self.scanner.scan_number(phone_number)
+        return await asyncio.wrap_future(self.submit(self.scanner.scan_number(phone_number)))
+
+    def init_app(self, app):
+        """Attach to a Flask or ASGI app and close the pool when the app or process shuts down"""
+        if hasattr(app, 'add_event_handler'):
+            # FastAPI/Starlette lifecycle events
+            app.add_event_handler('startup', self.start)
+            app.add_event_handler('shutdown', self.shutdown)
+        else:
+            app.extensions['phone_scanner'] = self
+            self.start()
+        atexit.register(self.shutdown)
+        return self
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_phone_scanner_service() -> PhoneScannerService:
+    """Process-wide scanner service configured from the environment"""
+    global _default_service
+    if _default_service is None:
+        with _default_service_lock:
+            if _default_service is None:
+                _default_service = PhoneScannerService(
+                    limit=int(os.getenv('PHONE_SCANNER_POOL_SIZE', 100)),
+                    limit_per_host=int(os.getenv('PHONE_SCANNER_PER_HOST', 8)),
+                    keepalive_timeout=float(os.getenv('PHONE_SCANNER_KEEPALIVE', 30)),
+                    dns_cache_ttl=int(os.getenv('PHONE_SCANNER_DNS_TTL', 300))
+                )
+    return _default_service
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Cached, batched Shodan host lookups for domain security checks
+"""
+import time
+import ipaddress
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List
+
+SECURITY_FIELDS = ('ports', 'vulns', 'hostnames')
+
+
+def _security_slice(host: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Keep only the parts of a Shodan host record the OSINT search reports"""
+    vulns = host.get('vulns', [])
+    if isinstance(vulns, dict):
+        vulns = list(vulns.keys())
+    return {
+        'ports': list(host.get('ports', [])),
+        'vulns': list(vulns),
+        'hostnames': list(host.get('hostnames', []))
+    }
+
+
+class ShodanLookup:
+    """Resolves a domain to IPs and serves Shodan host data per IP from a TTL cache"""
+
+    def __init__(self, api, ttl: int = 6 * 3600, max_entries: int = 10000, batch_size: int = 10):
+        self.api = api
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, target: str) -> List[str]:
+        """Return the unique IPv4 addresses for a domain, or the target itself if it is an IP"""
+        import dns.resolver
+
+        try:
+            ipaddress.ip_address(target)
+            return [target]
+        except ValueError:
+            pass
+        try:
+            answers = dns.resolver.resolve(target, 'A')
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            return []
+        return list(dict.fromkeys(str(rdata) for rdata in answers))
+
+    def _get_cached(self, ip: str):
+        with self._lock:
+            entry = self._cache.get(ip)
+            if entry is None:
+                return None
+            stored_at, data = entry
+            if time.time() - stored_at > self.ttl:
+                del self._cache[ip]
+                return None
+            self._cache.move_to_end(ip)
+            return data
+
+    def _store(self, ip: str, data: Dict[str, List[Any]]):
+        with self._lock:
+            self._cache[ip] = (time.time(), data)
+            self._cache.move_to_end(ip)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _fetch(self, ips: List[str]):
+        """Query Shodan for a batch of IPs in one request and cache every answer"""
+        import shodan
+
+        try:
+            hosts = self.api.host(ips if len(ips) > 1 else ips[0])
+        except shodan.APIError as e:
+            if 'No information available' not in str(e):
+                raise
+            if len(ips) > 1:
+                # One unknown IP fails the whole batch, so ask for each IP on its own instead
+                for ip in ips:
+                    self._fetch([ip])
+                return
+            hosts = []
+        if isinstance(hosts, dict):
+            hosts = [hosts]
+        found = {host.get('ip_str'): host for host in hosts}
+        for ip in ips:
+            # IPs Shodan knows nothing about are cached as empty so repeats cost no credits
+            self._store(ip, _security_slice(found.get(ip, {})))
+
+    def lookup(self, target: str) -> Dict[str, List[Any]]:
+        """Return merged ports/vulns/hostnames for every IP the target resolves to"""
+        ips = self.resolve(target)
+        missing = [ip for ip in ips if self._get_cached(ip) is None]
+        for start in range(0, len(missing), self.batch_size):
+            self._fetch(missing[start:start + self.batch_size])
+
+        merged = {field: [] for field in SECURITY_FIELDS}
+        for ip in ips:
+            data = self._get_cached(ip) or {}
+            for field in SECURITY_FIELDS:
+                for value in data.get(field, []):
+                    if value not in merged[field]:
+                        merged[field].append(value)
+        merged['ports'].sort()
+        return merged
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Technology fingerprinting for HTTP responses using precompiled signature matchers
+"""
+import os
+import re
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+# Each signature may match on headers, cookies, <meta> tags, <script src> URLs or the HTML body.
+# An empty pattern means "present"; the first capture group, if any, is the version.
+DEFAULT_SIGNATURES = [
+    {'name': 'Nginx', 'categories': ['Web servers'], 'headers': {'server': r'nginx(?:/([\d.]+))?'}},
+    {'name': 'Apache', 'categories': ['Web servers'], 'headers': {'server': r'Apache(?:/([\d.]+))?'}},
+    {'name': 'Microsoft IIS', 'categories': ['Web servers'], 'headers': {'server': r'Microsoft-IIS(?:/([\d.]+))?'}},
+    {'name': 'LiteSpeed', 'categories': ['Web servers'], 'headers': {'server': r'LiteSpeed'}},
+    {'name': 'Caddy', 'categories': ['Web servers'], 'headers': {'server': r'Caddy'}},
+    {'name': 'Werkzeug', 'categories': ['Web servers'], 'headers': {'server': r'Werkzeug(?:/([\d.]+))?'}},
+    {'name': 'Cloudflare', 'categories': ['CDN'], 'headers': {'server': r'cloudflare', 'cf-ray': ''}},
+    {'name': 'Amazon CloudFront', 'categories': ['CDN'], 'headers': {'x-amz-cf-id': ''}},
+    {'name': 'Fastly', 'categories': ['CDN'], 'headers': {'x-fastly-request-id': ''}},
+    {'name': 'Varnish', 'categories': ['Caching'], 'headers': {'via': r'varnish', 'x-varnish': ''}},
+    {'name': 'PHP', 'categories': ['Programming languages'],
+     'headers': {'x-powered-by': r'PHP(?:/([\d.]+))?'}, 'cookies': {'PHPSESSID': ''}},
+    {'name': 'ASP.NET', 'categories': ['Web frameworks'],
+     'headers': {'x-powered-by': r'ASP\.NET', 'x-aspnet-version': r'([\d.]+)'},
+     'cookies': {'ASP.NET_SessionId': ''}},
+    {'name': 'Express', 'categories': ['Web frameworks'], 'headers': {'x-powered-by': r'Express'}},
+    {'name': 'Next.js', 'categories': ['Web frameworks'],
+     'headers': {'x-powered-by': r'Next\.js(?: ([\d.]+))?'},
+     'scripts': [r'/_next/static/'], 'html': [r'<script[^>]+id="__NEXT_DATA__"']},
+    {'name': 'Nuxt.js', 'categories': ['Web frameworks'], 'scripts': [r'/_nuxt/'], 'html': [r'window\.__NUXT__']},
+    {'name': 'Django', 'categories': ['Web frameworks'], 'cookies': {'csrftoken': '', 'django_language': ''}},
+    {'name': 'Laravel', 'categories': ['Web frameworks'], 'cookies': {'laravel_session': ''}},
+    {'name': 'Ruby on Rails', 'categories': ['Web frameworks'],
+     'cookies': {'_rails_session': ''}, 'meta': {'csrf-param': r'^authenticity_token$'}},
+    {'name': 'WordPress', 'categories': ['CMS'],
+     'meta': {'generator': r'WordPress(?: ([\d.]+))?'},
+     'scripts': [r'/wp-(?:content|includes)/'], 'html': [r'<link[^>]+/wp-content/']},
+    {'name': 'Drupal', 'categories': ['CMS'],
+     'headers': {'x-generator': r'Drupal(?: (\d+))?', 'x-drupal-cache': ''},
+     'meta': {'generator': r'Drupal(?: (\d+))?'}},
+    {'name': 'Joomla', 'categories': ['CMS'], 'meta': {'generator': r'Joomla!?(?: - Open Source Content Management| ([\d.]+))?'}},
+    {'name': 'Ghost', 'categories': ['CMS'], 'meta': {'generator': r'Ghost(?: ([\d.]+))?'}},
+    {'name': 'Shopify', 'categories': ['Ecommerce'],
+     'headers': {'x-shopid': ''}, 'scripts': [r'cdn\.shopify\.com'], 'html': [r'Shopify\.theme']},
+    {'name': 'WooCommerce', 'categories': ['Ecommerce'],
+     'meta': {'generator': r'WooCommerce(?: ([\d.]+))?'}, 'scripts': [r'/woocommerce/']},
+    {'name': 'Magento', 'categories': ['Ecommerce'], 'cookies': {'frontend': ''}, 'scripts': [r'/static/version\d+/frontend/']},
+    {'name': 'Wix', 'categories': ['Website builders'],
+     'headers': {'x-wix-request-id': ''}, 'meta': {'generator': r'Wix\.com'}},
+    {'name': 'Squarespace', 'categories': ['Website builders'], 'html': [r'static1\.squarespace\.com']},
+    {'name': 'Webflow', 'categories': ['Website builders'], 'meta': {'generator': r'Webflow'}, 'html': [r'data-wf-page=']},
+    {'name': 'jQuery', 'categories': ['JavaScript libraries'], 'scripts': [r'jquery[.-]?([\d.]+)?(?:\.min)?\.js']},
+    {'name': 'React', 'categories': ['JavaScript frameworks'],
+     'scripts': [r'react(?:-dom)?(?:\.production)?(?:\.min)?\.js'], 'html': [r'data-reactroot']},
+    {'name': 'Vue.js', 'categories': ['JavaScript frameworks'],
+     'scripts': [r'vue(?:@([\d.]+))?(?:/dist/vue)?(?:\.min)?\.js'], 'html': [r'data-v-[0-9a-f]{8}']},
+    {'name': 'Angular', 'categories': ['JavaScript frameworks'], 'html': [r'ng-version="([\d.]+)"']},
+    {'name': 'Bootstrap', 'categories': ['UI frameworks'],
+     'scripts': [r'bootstrap(?:@([\d.]+))?(?:/dist/js/bootstrap)?(?:\.bundle)?(?:\.min)?\.js'],
+     'html': [r'bootstrap(?:\.min)?\.css']},
+    {'name': 'Tailwind CSS', 'categories': ['UI frameworks'], 'html': [r'tailwindcss(?:@([\d.]+))?']},
+    {'name': 'Google Analytics', 'categories': ['Analytics'],
+     'scripts': [r'google-analytics\.com/(?:ga|analytics)\.js', r'googletagmanager\.com/gtag/js']},
+    {'name': 'Google Tag Manager', 'categories': ['Tag managers'], 'html': [r'googletagmanager\.com/gtm\.js']},
+    {'name': 'Stripe', 'categories': ['Payment processors'], 'scripts': [r'js\.stripe\.com']},
+    {'name': 'reCAPTCHA', 'categories': ['Security'], 'scripts': [r'google\.com/recaptcha/']}
+]
+
+# Tokens pulled out of the body in their own scan, separate from the HTML signatures
+SCRIPT_SRC_PATTERN = r'<script\b[^>]*?\bsrc\s*=\s*["\']?(?P<src>[^"\'\s>]+)'
+META_TAG_PATTERN = r'<meta\b[^>]*>'
+META_NAME = re.compile(r'\b(?:name|property|http-equiv)\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+META_CONTENT = re.compile(r'\bcontent\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE)
+
+
+def _top_level_alternation(pattern: str) -> bool:
+    """Check for a '|' outside any group or character class"""
+    depth = 0
+    in_class = escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+    return False
+
+
+# A quantifier that allows zero repetitions makes the character before it optional
+OPTIONAL_QUANTIFIER = re.compile(r'[?*]|\{0*[,}]')
+
+
+def _first_char(pattern: str) -> Optional[str]:
+    """Literal first character every match of a pattern starts with, or None when there is none"""
+    if not pattern or _top_level_alternation(pattern):
+        return None
+    if pattern[0] == '\\' and len(pattern) > 1 and not pattern[1].isalnum():
+        char, rest = pattern[1], pattern[2:]
+    elif pattern[0].isalnum() or pattern[0] in '<_/-="@':
+        char, rest = pattern[0], pattern[1:]
+    else:
+        return None
+    if OPTIONAL_QUANTIFIER.match(rest):
+        return None
+    return char
+
+
+class _CombinedMatcher:
+    """All patterns of one kind joined into a single alternation with one named group per signature"""
+
+    def __init__(self, entries: List[Tuple[int, str]], extra: Optional[List[Tuple[str, str]]] = None):
+        self.patterns = {}
+        alternatives = []
+        for number, (sig_index, pattern) in enumerate(entries):
+            group = f"m{number}"
+            self.patterns[group] = (sig_index, re.compile(pattern, re.IGNORECASE))
+            alternatives.append((group, pattern))
+        alternatives.extend(extra or [])
+        self.regex = None
+        if alternatives:
+            combined = '|'.join(f"(?P<{group}>{pattern})" for group, pattern in alternatives)
+            # A lookahead on the possible first characters lets the scan skip most offsets cheaply
+            first_chars = {_first_char(pattern) for _, pattern in alternatives}
+            if None not in first_chars:
+                gate = ''.join(re.escape(c) for c in sorted(first_chars))
+                combined = f"(?=[{gate}])(?:{combined})"
+            self.regex = re.compile(combined, re.IGNORECASE)
+
+    def iter_matches(self, text: str, overlapping: bool = False):
+        """Yield (signature index, version) for every signature found in one pass over text
+
+        Matches of extra named groups added to the regex are yielded as (group name, match).
+        With overlapping, the scan resumes one character after each match instead of after its
+        end, so a signature whose text lies inside another signature's match is still found.
+        """
+        if self.regex is None:
+            return
+        pos = 0
+        while True:
+            match = self.regex.search(text, pos)
+            if match is None:
+                return
+            pos = match.start() + 1 if overlapping else max(match.end(), match.start() + 1)
+            group = match.lastgroup
+            if group not in self.patterns:
+                yield group, match
+                continue
+            sig_index, pattern = self.patterns[group]
+            # Re-run the lone pattern on the short matched span to read its own version group
+            single = pattern.search(match.group())
+            version = single.group(1) if single and single.re.groups and single.group(1) else None
+            yield sig_index, version
+
+
+class FingerprintEngine:
+    """Matches response headers, cookies, meta tags, script URLs and HTML against all signatures at once"""
+
+    def __init__(self, signatures: Optional[List[Dict[str, Any]]] = None, max_body_bytes: Optional[int] = None):
+        self.signatures = signatures if signatures is not None else DEFAULT_SIGNATURES
+        self.max_body_bytes = max_body_bytes or int(os.getenv('FINGERPRINT_MAX_BODY_BYTES', 256 * 1024))
+        self._compile()
+
+    def _compile(self):
+        header_entries, meta_entries = {}, {}
+        self.header_presence, self.meta_presence, self.cookies = {}, {}, {}
+        script_entries, html_entries = [], []
+
+        for index, signature in enumerate(self.signatures):
+            for name, pattern in signature.get('headers', {}).items():
+                if pattern:
+                    header_entries.setdefault(name.lower(), []).append((index, pattern))
+                else:
+                    self.header_presence.setdefault(name.lower(), []).append(index)
+            for name, pattern in signature.get('meta', {}).items():
+                if pattern:
+                    meta_entries.setdefault(name.lower(), []).append((index, pattern))
+                else:
+                    self.meta_presence.setdefault(name.lower(), []).append(index)
+            for name, pattern in signature.get('cookies', {}).items():
+                compiled = re.compile(pattern, re.IGNORECASE) if pattern else None
+                self.cookies.setdefault(name.lower(), []).append((index, compiled))
+            script_entries.extend((index, pattern) for pattern in signature.get('scripts', []))
+            html_entries.extend((index, pattern) for pattern in signature.get('html', []))
+
+        self.header_matchers = {name: _CombinedMatcher(entries) for name, entries in header_entries.items()}
+        self.meta_matchers = {name: _CombinedMatcher(entries) for name, entries in meta_entries.items()}
+        self.script_matcher = _CombinedMatcher(script_entries)
+        # HTML signatures and <script>/<meta> tokens are scanned separately, since a token match
+        # would otherwise consume any HTML signature inside it
+        self.html_matcher = _CombinedMatcher(html_entries)
+        self.token_matcher = _CombinedMatcher([], extra=[('script', SCRIPT_SRC_PATTERN), ('meta', META_TAG_PATTERN)])
+
+    def analyze(self, headers: Any = None, body: Any = '', cookies: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """Return the detected technologies as [{'name', 'version', 'categories'}]"""
+        found = {}
+
+        def hit(sig_index, version=None):
+            if version or sig_index not in found:
+                found[sig_index] = version or found.get(sig_index)
+
+        header_items = headers.items() if hasattr(headers, 'items') else (headers or [])
+        for name, value in header_items:
+            name = name.lower()
+            for sig_index in self.header_presence.get(name, []):
+                hit(sig_index)
+            matcher = self.header_matchers.get(name)
+            if matcher:
+                for sig_index, version in matcher.iter_matches(str(value)):
+                    hit(sig_index, version)
+
+        for name, value in (cookies or {}).items():
+            for sig_index, pattern in self.cookies.get(name.lower(), []):
+                if pattern is None:
+                    hit(sig_index)
+                else:
+                    match = pattern.search(value or '')
+                    if match:
+                        hit(sig_index, match.group(1) if pattern.groups else None)
+
+        if isinstance(body, bytes):
+            body = body[:self.max_body_bytes].decode('utf-8', errors='replace')
+        else:
+            body = (body or '')[:self.max_body_bytes]
+
+        for sig_index, version in self.html_matcher.iter_matches(body, overlapping=True):
+            hit(sig_index, version)
+        for kind, match in self.token_matcher.iter_matches(body):
+            if kind == 'script':
+                for script_sig, script_version in self.script_matcher.iter_matches(match.group('src')):
+                    hit(script_sig, script_version)
+            else:
+                self._match_meta(match.group(), hit)
+
+        return sorted(
+            ({'name': self.signatures[i]['name'], 'version': v, 'categories': self.signatures[i].get('categories', [])}
+             for i, v in found.items()),
+            key=lambda tech: tech['name']
+        )
+
+    def _match_meta(self, tag: str, hit):
+        name_match = META_NAME.search(tag)
+        if not name_match:
+            return
+        name = name_match.group(1).lower()
+        for sig_index in self.meta_presence.get(name, []):
+            hit(sig_index)
+        matcher = self.meta_matchers.get(name)
+        content_match = META_CONTENT.search(tag)
+        if matcher and content_match:
+            content = next(group for group in content_match.groups() if group is not None)
+            for sig_index, version in matcher.iter_matches(content):
+                hit(sig_index, version)
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_fingerprint_engine() -> FingerprintEngine:
+    """Signatures are compiled once per process and shared by every request"""
+    global _default_engine
+    if _default_engine is None:
+        with _default_engine_lock:
+            if _default_engine is None:
+                _default_engine = FingerprintEngine()
+    return _default_engine
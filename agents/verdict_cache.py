@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Shared availability verdicts keyed by domain, used by both domain research agents.
+
+"Taken" verdicts live long (registrations rarely lapse) and "available" ones briefly (names get
+bought). Each source carries a confidence; the TTL is scaled by it and verdicts below the
+minimum confidence are never served, so a weak answer cannot shadow a strong one for long.
+Verdicts carry no price: the agents price names differently, so each prices a hit itself.
+
+    python -m agents.verdict_cache get getai.com
+    python -m agents.verdict_cache stats
+"""
+import os
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from typing import Dict, Any, Iterable, NamedTuple, Optional, Tuple
+
+DEFAULT_VERDICT_PATH = os.getenv('VERDICT_CACHE_PATH', os.path.join('.cache', 'verdicts.sqlite3'))
+
+# How far each source's answer is trusted (and how much of the TTL it earns)
+SOURCE_CONFIDENCE = {
+    'zone': 1.0,
+    'rdap': 0.95,
+    'whois': 0.9,
+    'whoisxmlapi': 0.8,
+    'dns': 0.8,
+    'namecheap': 0.7
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    domain TEXT PRIMARY KEY,
+    available INTEGER NOT NULL,
+    verified INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    checked_at REAL NOT NULL
+);
+"""
+
+
+class Verdict(NamedTuple):
+    """Cached availability answer for one domain"""
+    domain: str
+    available: bool
+    # Confirmed by a registry or registrar rather than only reported by an availability API
+    verified: bool
+    source: str
+    confidence: float
+    checked_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.checked_at
+
+
+class VerdictCache:
+    """SQLite-backed verdict store that several processes can share"""
+
+    def __init__(self, path: str = DEFAULT_VERDICT_PATH, taken_ttl: Optional[float] = None,
+                 available_ttl: Optional[float] = None, min_confidence: Optional[float] = None):
+        self.path = path
+        self.taken_ttl = taken_ttl if taken_ttl is not None else float(os.getenv('VERDICT_TTL_TAKEN', 30 * 86400))
+        self.available_ttl = available_ttl if available_ttl is not None else float(os.getenv('VERDICT_TTL_AVAILABLE', 6 * 3600))
+        self.min_confidence = (min_confidence if min_confidence is not None
+                               else float(os.getenv('VERDICT_MIN_CONFIDENCE', 0.5)))
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def confidence(self, source: str) -> float:
+        return SOURCE_CONFIDENCE.get(source, 0.0)
+
+    def is_fresh(self, verdict: Verdict, now: Optional[float] = None) -> bool:
+        """Fresh while younger than its TTL scaled by the source's confidence"""
+        if verdict.confidence < self.min_confidence:
+            return False
+        ttl = self.available_ttl if verdict.available else self.taken_ttl
+        return (now if now is not None else time.time()) - verdict.checked_at <= ttl * verdict.confidence
+
+    def get(self, domain: str) -> Optional[Verdict]:
+        return self.get_many([domain]).get(domain.lower())
+
+    def get_many(self, domains: Iterable[str]) -> Dict[str, Verdict]:
+        """Fresh, confident verdicts for whichever of the domains have one"""
+        domains = list(dict.fromkeys(domain.lower() for domain in domains))
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(domains), 500):
+                chunk = domains[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT domain, available, verified, source, confidence, checked_at FROM verdicts "
+                    f"WHERE domain IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for row in rows:
+                    verdict = Verdict(row[0], bool(row[1]), bool(row[2]), *row[3:])
+                    if self.is_fresh(verdict, now):
+                        found[verdict.domain] = verdict
+            self.stats['hits'] += len(found)
+            self.stats['misses'] += len(domains) - len(found)
+        return found
+
+    def put(self, domain: str, available: bool, source: str, verified: bool = False,
+            checked_at: Optional[float] = None):
+        self.put_many([(domain, available, verified, checked_at)], source)
+
+    def put_many(self, verdicts: Iterable[Tuple], source: str):
+        """Store (domain, available, verified[, checked_at]) answers from one source; unknown sources are not stored
+
+        checked_at is when the source produced the answer (e.g. a WHOIS cache entry's fetched_at),
+        defaulting to now, so a re-stored old answer does not get a fresh TTL. A stored verdict is
+        never replaced by an older one.
+        """
+        confidence = self.confidence(source)
+        if confidence <= 0:
+            return
+        now = time.time()
+        rows = []
+        for domain, available, verified, *rest in verdicts:
+            checked_at = rest[0] if rest and rest[0] is not None else now
+            rows.append((domain.lower(), int(bool(available)), int(bool(verified)), source, confidence,
+                         min(checked_at, now)))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO verdicts (domain, available, verified, source, confidence, checked_at) '
+                'VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (domain) DO UPDATE SET available = excluded.available, verified = excluded.verified, '
+                'source = excluded.source, confidence = excluded.confidence, checked_at = excluded.checked_at '
+                'WHERE excluded.checked_at >= verdicts.checked_at', rows
+            )
+            self.stats['stores'] += len(rows)
+
+    def invalidate(self, domain: str):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM verdicts WHERE domain = ?', (domain.lower(),))
+
+    def summary(self) -> Dict[str, Any]:
+        """Stored verdicts per source and availability, plus this process's hit counters"""
+        with self._lock:
+            rows = self._conn.execute('SELECT source, available, COUNT(*) FROM verdicts GROUP BY source, available').fetchall()
+            stats = dict(self.stats)
+        stats['stored'] = {f"{source}:{'available' if available else 'taken'}": count
+                           for source, available, count in rows}
+        return stats
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_verdict_cache() -> VerdictCache:
+    """Process-wide verdict cache configured from the environment"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = VerdictCache()
+    return _default_cache
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Inspect the shared domain verdict cache")
+    parser.add_argument('--path', default=DEFAULT_VERDICT_PATH, help='Verdict database')
+    commands = parser.add_subparsers(dest='command', required=True)
+    get = commands.add_parser('get', help='Show cached verdicts')
+    get.add_argument('domains', nargs='+')
+    commands.add_parser('stats', help='Count stored verdicts')
+    args = parser.parse_args()
+
+    cache = VerdictCache(args.path)
+    try:
+        if args.command == 'get':
+            verdicts = cache.get_many(args.domains)
+            for domain in args.domains:
+                verdict = verdicts.get(domain.lower())
+                print(json.dumps(verdict._asdict() if verdict else {'domain': domain, 'cached': False}))
+        else:
+            print(json.dumps(cache.summary()))
+    finally:
+        cache.close()
+
+
+if __name__ == '__main__':
+    main()
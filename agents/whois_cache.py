@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk WHOIS/RDAP result cache shared by the domain research agents and the OSINT search
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date
+from typing import Dict, Any, Optional, Callable
+
+# Second-level labels under which registrations happen one level deeper (e.g. example.co.uk)
+MULTI_PART_SUFFIXES = {
+    'co.uk', 'org.uk', 'me.uk', 'ltd.uk', 'plc.uk', 'ac.uk', 'gov.uk',
+    'com.au', 'net.au', 'org.au', 'edu.au',
+    'co.nz', 'org.nz', 'net.nz',
+    'co.jp', 'ne.jp', 'or.jp',
+    'com.br', 'net.br', 'org.br',
+    'com.cn', 'net.cn', 'org.cn',
+    'co.in', 'net.in', 'org.in',
+    'co.za', 'com.mx', 'com.tr', 'com.sg', 'com.hk', 'co.kr'
+}
+
+WHOIS_FIELDS = ('registrar', 'creation_date', 'expiration_date', 'updated_date', 'status', 'name_servers')
+
+NO_MATCH_MARKERS = ('No match for', 'NOT FOUND', 'No Data Found', 'Domain not found', 'No entries found')
+
+# Sources whose entries carry the registry's own record rather than just an availability answer
+RECORD_SOURCES = ('whois', 'rdap')
+
+
+def registrable_domain(domain: str) -> str:
+    """Reduce a host name to the domain a registrar would actually sell"""
+    host = domain.strip().lower().rstrip('.')
+    if '://' in host:
+        host = host.split('://', 1)[1]
+    host = host.split('/', 1)[0].split(':', 1)[0]
+    labels = [label for label in host.split('.') if label]
+    if len(labels) <= 2:
+        return '.'.join(labels)
+    if '.'.join(labels[-2:]) in MULTI_PART_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def _serialize(value):
+    """Convert WHOIS values (datetimes, lists of datetimes) into JSON-friendly values"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)):
+        return [_serialize(v) for v in value]
+    return value
+
+
+def _latest_timestamp(value) -> Optional[float]:
+    """Return the latest timestamp found in a serialized date field"""
+    values = value if isinstance(value, list) else [value]
+    latest = None
+    for item in values:
+        if not item:
+            continue
+        try:
+            ts = datetime.fromisoformat(str(item)).timestamp()
+        except ValueError:
+            continue
+        latest = ts if latest is None else max(latest, ts)
+    return latest
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS whois (
+    domain TEXT PRIMARY KEY,
+    fields TEXT NOT NULL,
+    raw TEXT NOT NULL,
+    registered INTEGER NOT NULL,
+    no_match INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+# Buffered puts inside batch() are written once this many are pending
+BATCH_FLUSH_SIZE = 500
+
+
+class WhoisCache:
+    """SQLite-backed cache of parsed WHOIS fields and raw text keyed by registrable domain
+
+    Every put is one row upsert, so the agents, the CLI and several web workers can share the
+    file without overwriting each other's entries.
+    """
+
+    def __init__(self, path: Optional[str] = None, registered_ttl: Optional[int] = None,
+                 available_ttl: Optional[int] = None):
+        self.path = path or os.getenv('WHOIS_CACHE_PATH', os.path.join('.cache', 'whois_cache.sqlite3'))
+        # Registrations change rarely; "available" answers go stale quickly because names get bought
+        self.registered_ttl = registered_ttl if registered_ttl is not None else int(os.getenv('WHOIS_CACHE_REGISTERED_TTL', 7 * 86400))
+        self.available_ttl = available_ttl if available_ttl is not None else int(os.getenv('WHOIS_CACHE_AVAILABLE_TTL', 6 * 3600))
+        self._lock = threading.RLock()
+        self._conn = None
+        self._batch_depth = 0
+        self._pending = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use so importing the cache never touches the disk
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        if key in self._pending:
+            return self._pending[key]
+        row = self._connection().execute(
+            'SELECT domain, fields, raw, registered, no_match, source, fetched_at FROM whois WHERE domain = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        domain, fields, raw, registered, no_match, source, fetched_at = row
+        return {'domain': domain, 'fields': json.loads(fields), 'raw': raw, 'registered': bool(registered),
+                'no_match': bool(no_match), 'source': source, 'fetched_at': fetched_at}
+
+    def _flush(self):
+        if not self._pending:
+            return
+        rows = [(entry['domain'], json.dumps(entry['fields']), entry['raw'], int(entry['registered']),
+                 int(entry['no_match']), entry['source'], entry['fetched_at'])
+                for entry in self._pending.values()]
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO whois (domain, fields, raw, registered, no_match, source, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', rows
+            )
+        self._pending.clear()
+
+    def is_stale(self, entry: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Check an entry against its TTL and its own expiration date"""
+        now = now if now is not None else time.time()
+        ttl = self.registered_ttl if entry.get('registered') else self.available_ttl
+        if now - entry.get('fetched_at', 0) > ttl:
+            return True
+        # A registration that has passed its expiration date may have dropped or been renewed
+        if entry.get('registered'):
+            expires = _latest_timestamp(entry.get('fields', {}).get('expiration_date'))
+            if expires is not None and expires < now:
+                return True
+        return False
+
+    def get(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cache entry for the domain or None"""
+        key = registrable_domain(domain)
+        with self._lock:
+            entry = self._read(key)
+            if entry is None or self.is_stale(entry):
+                return None
+            return entry
+
+    def put(self, domain: str, fields: Dict[str, Any], raw: str = '', registered: Optional[bool] = None,
+            source: str = 'whois', no_match: bool = False) -> Dict[str, Any]:
+        """Store a lookup result and return the cache entry"""
+        key = registrable_domain(domain)
+        fields = {name: _serialize(value) for name, value in (fields or {}).items()}
+        if registered is None:
+            registered = bool(fields.get('creation_date') or fields.get('expiration_date') or
+                              fields.get('registrar') or fields.get('status'))
+        entry = {
+            'domain': key,
+            'fields': fields,
+            'raw': raw or '',
+            'registered': registered,
+            'no_match': no_match,
+            'source': source,
+            'fetched_at': time.time()
+        }
+        with self._lock:
+            self._pending[key] = entry
+            if not self._batch_depth or len(self._pending) >= BATCH_FLUSH_SIZE:
+                self._flush()
+        return entry
+
+    @contextmanager
+    def batch(self):
+        """Write puts in a few large transactions instead of one per put (for bulk checks)"""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._flush()
+
+    def invalidate(self, domain: str):
+        """Drop the cached entry for a domain"""
+        key = registrable_domain(domain)
+        with self._lock:
+            self._pending.pop(key, None)
+            conn = self._connection()
+            with conn:
+                conn.execute('DELETE FROM whois WHERE domain = ?', (key,))
+
+    def lookup(self, domain: str, fetch: Optional[Callable[[str], Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Return a cached WHOIS record, running a query when the cache is cold, stale or holds no fields"""
+        entry = self.get(domain)
+        if entry is not None and entry['source'] in RECORD_SOURCES and entry['fields']:
+            return entry
+        result = (fetch or python_whois_fetch)(registrable_domain(domain))
+        return self.put(domain, **result)
+
+
+def python_whois_fetch(domain: str) -> Dict[str, Any]:
+    """Run a port-43 lookup through python-whois and shape it for WhoisCache.put"""
+    import whois
+
+    try:
+        w = whois.whois(domain)
+    except Exception as e:
+        if any(marker.lower() in str(e).lower() for marker in NO_MATCH_MARKERS):
+            return {'fields': {}, 'raw': str(e), 'registered': False, 'no_match': True}
+        raise
+    fields = {name: getattr(w, name, None) for name in WHOIS_FIELDS}
+    status = fields.get('status')
+    fields['status'] = status if isinstance(status, list) else ([status] if status else [])
+    return {'fields': fields, 'raw': getattr(w, 'text', '') or ''}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_whois_cache() -> WhoisCache:
+    """Process-wide cache instance"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = WhoisCache()
+    return _default_cache
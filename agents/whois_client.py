@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio port-43 WHOIS client with per-server concurrency limits and pacing
+"""
+import re
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from .whois_cache import registrable_domain, NO_MATCH_MARKERS
+
+WHOIS_PORT = 43
+IANA_WHOIS_SERVER = 'whois.iana.org'
+
+# Registry WHOIS servers for the TLDs the agents generate; anything else is asked of IANA
+TLD_WHOIS_SERVERS = {
+    'com': 'whois.verisign-grs.com',
+    'net': 'whois.verisign-grs.com',
+    'org': 'whois.pir.org',
+    'info': 'whois.nic.info',
+    'io': 'whois.nic.io',
+    'ai': 'whois.nic.ai',
+    'co': 'whois.nic.co',
+    'me': 'whois.nic.me',
+    'app': 'whois.nic.google',
+    'dev': 'whois.nic.google',
+    'xyz': 'whois.nic.xyz',
+    'site': 'whois.nic.site',
+    'online': 'whois.nic.online',
+    'tech': 'whois.nic.tech',
+    'uk': 'whois.nic.uk',
+    'de': 'whois.denic.de',
+    'us': 'whois.nic.us'
+}
+
+# Thin registries return a referral to the registrar's own WHOIS server; the value must be a
+# dotted host name on the same line, so an empty "whois:" line cannot pick up the next line
+REFERRAL_PATTERN = re.compile(
+    r'^[ \t]*(?:Registrar WHOIS Server|Whois Server|ReferralServer|refer|whois)[ \t]*:[ \t]*(?:r?whois://)?'
+    r'([\w-]+(?:\.[\w-]+)+(?::\d+)?)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Like the referral, a field's value must be on its own line: an empty "Registrar:" is no value
+FIELD_PATTERNS = {
+    'creation_date': re.compile(
+        r'^[ \t]*(?:Creation Date|Created On|Created|Registered on|Registration Time|Domain Registration Date)[ \t]*:[ \t]*(.+?)[ \t]*$',
+        re.IGNORECASE | re.MULTILINE),
+    'expiration_date': re.compile(
+        r'^[ \t]*(?:Registry Expiry Date|Registrar Registration Expiration Date|Expiration Date|Expiry Date|Expires On|Expires|paid-till)[ \t]*:[ \t]*(.+?)[ \t]*$',
+        re.IGNORECASE | re.MULTILINE),
+    'updated_date': re.compile(
+        r'^[ \t]*(?:Updated Date|Last Updated On|Last Modified|changed)[ \t]*:[ \t]*(.+?)[ \t]*$',
+        re.IGNORECASE | re.MULTILINE),
+    'registrar': re.compile(
+        r'^[ \t]*(?:Registrar|Sponsoring Registrar|Registrar Name)[ \t]*:[ \t]*(.+?)[ \t]*$',
+        re.IGNORECASE | re.MULTILINE),
+    'status': re.compile(
+        r'^[ \t]*(?:Domain Status|Status|state)[ \t]*:[ \t]*(\S+)',
+        re.IGNORECASE | re.MULTILINE),
+    'name_servers': re.compile(
+        r'^[ \t]*(?:Name Server|nserver|Nameservers?)[ \t]*:[ \t]*(\S+)',
+        re.IGNORECASE | re.MULTILINE)
+}
+
+DATE_FIELDS = ('creation_date', 'expiration_date', 'updated_date')
+LIST_FIELDS = ('status', 'name_servers')
+
+DATE_FORMATS = (
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%dT%H:%M:%S.%fZ',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%Y.%m.%d',
+    '%d-%b-%Y',
+    '%d.%m.%Y'
+)
+
+
+def parse_whois_date(value: str):
+    """Parse the common WHOIS date layouts, returning the original string if none match"""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+
+def parse_whois_text(text: str) -> Dict[str, Any]:
+    """Extract the fields the agents read from a raw WHOIS response"""
+    fields = {}
+    for name, pattern in FIELD_PATTERNS.items():
+        matches = [m.strip() for m in pattern.findall(text) if m.strip()]
+        if name in LIST_FIELDS:
+            seen = []
+            for match in matches:
+                value = match.lower() if name == 'name_servers' else match
+                if value not in seen:
+                    seen.append(value)
+            fields[name] = seen
+        elif not matches:
+            fields[name] = None
+        elif name in DATE_FIELDS:
+            fields[name] = parse_whois_date(matches[0])
+        else:
+            fields[name] = matches[0]
+    return fields
+
+
+# Registries answer over-eager clients with a short refusal instead of a record
+RATE_LIMIT_MARKERS = (
+    'rate limit', 'limit exceeded', 'too many requests', 'query limit', 'quota exceeded',
+    'exceeded the maximum', 'try again later', 'access denied'
+)
+
+
+def is_rate_limited(text: str) -> bool:
+    """Check whether a WHOIS response is a throttling refusal rather than an answer"""
+    lowered = text.lower()
+    return any(marker in lowered for marker in RATE_LIMIT_MARKERS)
+
+
+def is_no_match(text: str) -> bool:
+    """Check whether a WHOIS response says the domain is not registered"""
+    lowered = text.lower()
+    return any(marker.lower() in lowered for marker in NO_MATCH_MARKERS)
+
+
+class AsyncWhoisClient:
+    """Native asyncio WHOIS client that respects per-server rate limits"""
+
+    def __init__(self, servers: Optional[Dict[str, str]] = None, port: int = WHOIS_PORT,
+                 timeout: float = 10.0, max_per_server: int = 2, min_interval: float = 0.5,
+                 server_limits: Optional[Dict[str, Tuple[int, float]]] = None, max_referrals: int = 1,
+                 iana_server: str = IANA_WHOIS_SERVER):
+        # Server entries may be "host" or "host:port" so tests can point at a local stub
+        self.servers = dict(TLD_WHOIS_SERVERS)
+        self.servers.update(servers or {})
+        self.iana_server = iana_server
+        self.port = port
+        self.timeout = timeout
+        self.max_per_server = max_per_server
+        self.min_interval = min_interval
+        self.server_limits = server_limits or {}
+        self.max_referrals = max_referrals
+        self._semaphores = {}
+        self._pace_locks = {}
+        self._next_slot = {}
+
+    def _limits(self, server: str) -> Tuple[int, float]:
+        return self.server_limits.get(server, (self.max_per_server, self.min_interval))
+
+    def _address(self, server: str) -> Tuple[str, int]:
+        host, _, port = server.partition(':')
+        return host, int(port) if port else self.port
+
+    async def _pace(self, server: str):
+        """Space out queries to one server by its minimum interval"""
+        interval = self._limits(server)[1]
+        if interval <= 0:
+            return
+        lock = self._pace_locks.setdefault(server, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            wait = self._next_slot.get(server, 0) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_slot[server] = loop.time() + interval
+
+    def _format_query(self, server: str, domain: str) -> str:
+        # Verisign does partial matching on bare names; "domain" restricts it to the exact domain
+        if server.startswith('whois.verisign-grs.com'):
+            return f"domain {domain}"
+        return domain
+
+    async def query(self, server: str, query: str) -> str:
+        """Send one query to a WHOIS server and return the full response text"""
+        semaphore = self._semaphores.get(server)
+        if semaphore is None:
+            semaphore = self._semaphores[server] = asyncio.Semaphore(self._limits(server)[0])
+        async with semaphore:
+            await self._pace(server)
+            host, port = self._address(server)
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+            try:
+                writer.write(f"{query}\r\n".encode('utf-8'))
+                await writer.drain()
+                data = await asyncio.wait_for(reader.read(), self.timeout)
+            finally:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+        return data.decode('utf-8', errors='replace')
+
+    async def server_for(self, domain: str) -> str:
+        """Find the registry WHOIS server for a domain's TLD, asking IANA for unknown TLDs"""
+        tld = domain.rsplit('.', 1)[-1].lower()
+        if tld not in self.servers:
+            response = await self.query(self.iana_server, tld)
+            match = REFERRAL_PATTERN.search(response)
+            self.servers[tld] = match.group(1) if match else self.iana_server
+        return self.servers[tld]
+
+    async def lookup(self, domain: str) -> Dict[str, Any]:
+        """Look up a domain, following registrar referrals, in the shape WhoisCache.put expects"""
+        domain = registrable_domain(domain)
+        server = await self.server_for(domain)
+        raw = await self.query(server, self._format_query(server, domain))
+        responses = [raw]
+
+        if is_no_match(raw):
+            return {'fields': {}, 'raw': raw, 'registered': False, 'no_match': True, 'source': 'whois'}
+
+        fields = parse_whois_text(raw)
+        visited = {server}
+        for _ in range(self.max_referrals):
+            match = REFERRAL_PATTERN.search(responses[-1])
+            referral = match.group(1) if match else None
+            if not referral or referral in visited:
+                break
+            visited.add(referral)
+            try:
+                referred = await self.query(referral, domain)
+            except (OSError, asyncio.TimeoutError):
+                break
+            responses.append(referred)
+            # Registrar answers are more detailed; keep registry values for anything they omit
+            for name, value in parse_whois_text(referred).items():
+                if value:
+                    fields[name] = value
+
+        registered = bool(fields.get('creation_date') or fields.get('expiration_date') or
+                          fields.get('registrar') or fields.get('status'))
+        return {
+            'fields': fields,
+            'raw': '\n'.join(responses),
+            'registered': registered,
+            'no_match': False,
+            'source': 'whois'
+        }
+
+    async def lookup_many(self, domains: List[str]) -> List[Any]:
+        """Look up many domains concurrently; failed lookups come back as exceptions"""
+        return await asyncio.gather(*(self.lookup(domain) for domain in domains), return_exceptions=True)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Precomputed dictionary index for domain idea generation.
+
+The word list is built once into a memory-mapped file, bucketed by word length and first
+letter, so generators can pick random words by position without building Python sets.
+
+File layout (little endian):
+    header   magic b'DWIX', format version, min length, max length, word count, source digest
+    buckets  (max - min + 1) x 26 pairs of uint32: byte offset and word count
+    words    lowercase a-z words, fixed width within a bucket, sorted
+"""
+import os
+import sys
+import mmap
+import bisect
+import struct
+import random
+import hashlib
+import argparse
+from typing import Iterable, Iterator, List, Optional, Sequence
+from .lazy import Lazy
+
+MAGIC = b'DWIX'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHBBI20s')
+BUCKET = struct.Struct('<II')
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+DEFAULT_INDEX_PATH = os.getenv('WORD_INDEX_PATH', os.path.join('.cache', 'words.idx'))
+
+
+def nltk_words() -> List[str]:
+    """Load the NLTK words corpus, downloading it if not already downloaded"""
+    import nltk
+    try:
+        nltk.data.find('corpora/words')
+    except LookupError:
+        nltk.download('words')
+    from nltk.corpus import words
+    return words.words()
+
+
+def build_word_index(words: Iterable[str], path: str, min_length: int = 2, max_length: int = 15) -> int:
+    """Write the index for words (lowercased, a-z only, deduplicated); returns the word count"""
+    buckets = {}
+    for word in words:
+        word = word.strip().lower()
+        if min_length <= len(word) <= max_length and word.isascii() and word.isalpha():
+            buckets.setdefault((len(word), word[0]), set()).add(word)
+
+    digest = hashlib.sha1()
+    table = []
+    blobs = []
+    offset = HEADER.size + (max_length - min_length + 1) * len(LETTERS) * BUCKET.size
+    total = 0
+    for length in range(min_length, max_length + 1):
+        for letter in LETTERS:
+            bucket = sorted(buckets.get((length, letter), ()))
+            blob = ''.join(bucket).encode('ascii')
+            digest.update(blob)
+            table.append(BUCKET.pack(offset, len(bucket)))
+            blobs.append(blob)
+            offset += len(blob)
+            total += len(bucket)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, min_length, max_length, total, digest.digest()))
+        f.writelines(table)
+        f.writelines(blobs)
+    os.replace(tmp_path, path)
+    return total
+
+
+class WordIndex:
+    """Read-only view of a word index file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.min_length, self.max_length, self.word_count, digest = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} word index")
+        # The digest identifies the word list, e.g. to tell whether two hosts share one build
+        self.digest = digest.hex()
+        self._buckets = {}
+        position = HEADER.size
+        for length in range(self.min_length, self.max_length + 1):
+            for letter in LETTERS:
+                self._buckets[(length, letter)] = BUCKET.unpack_from(self._map, position)
+                position += BUCKET.size
+
+    def close(self):
+        self._map.close()
+
+    def count(self, length: int, first: Optional[str] = None) -> int:
+        letters = first or LETTERS
+        return sum(self._buckets.get((length, letter), (0, 0))[1] for letter in letters)
+
+    def word(self, length: int, first: str, position: int) -> str:
+        offset, count = self._buckets[(length, first)]
+        if not 0 <= position < count:
+            raise IndexError(position)
+        start = offset + position * length
+        return self._map[start:start + length].decode('ascii')
+
+    def words(self, length: int, first: Optional[str] = None) -> Iterator[str]:
+        for letter in first or LETTERS:
+            offset, count = self._buckets.get((length, letter), (0, 0))
+            for position in range(count):
+                start = offset + position * length
+                yield self._map[start:start + length].decode('ascii')
+
+    def sample(self, k: int, min_length: int, max_length: int, first_letters: Optional[Sequence[str]] = None,
+               rng: Optional[random.Random] = None) -> List[str]:
+        """Pick k distinct words uniformly from the selected buckets without materializing them"""
+        rng = rng or random
+        selected = [
+            (length, letter) for length in range(max(min_length, self.min_length), min(max_length, self.max_length) + 1)
+            for letter in (first_letters or LETTERS) if self._buckets.get((length, letter), (0, 0))[1]
+        ]
+        ends = []
+        total = 0
+        for key in selected:
+            total += self._buckets[key][1]
+            ends.append(total)
+        picks = []
+        # random.sample over a range picks distinct positions without building the range
+        for position in rng.sample(range(total), min(k, total)):
+            bucket = bisect.bisect_right(ends, position)
+            length, letter = selected[bucket]
+            picks.append(self.word(length, letter, position - (ends[bucket - 1] if bucket else 0)))
+        return picks
+
+
+def _open_default_index() -> WordIndex:
+    """Open the shared index, building it from the NLTK corpus the first time"""
+    try:
+        return WordIndex(DEFAULT_INDEX_PATH)
+    except (OSError, ValueError):
+        count = build_word_index(nltk_words(), DEFAULT_INDEX_PATH)
+        print(f"Built word index with {count} words at {DEFAULT_INDEX_PATH}")
+        return WordIndex(DEFAULT_INDEX_PATH)
+
+
+WORD_INDEX = Lazy(_open_default_index)
+
+
+def get_word_index() -> WordIndex:
+    """Process-wide word index, mapped (and built if needed) on first use"""
+    return WORD_INDEX.get()
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Build the dictionary index used for domain ideas")
+    parser.add_argument('-o', '--output', default=DEFAULT_INDEX_PATH, help='Index file to write')
+    parser.add_argument('--words-file', help='Newline-separated word list (default: NLTK words corpus)')
+    parser.add_argument('--min-length', type=int, default=2)
+    parser.add_argument('--max-length', type=int, default=15)
+    args = parser.parse_args()
+
+    if args.words_file:
+        with open(args.words_file, 'r', encoding='utf-8') as f:
+            count = build_word_index(f, args.output, args.min_length, args.max_length)
+    else:
+        count = build_word_index(nltk_words(), args.output, args.min_length, args.max_length)
+    print(f"Wrote {count} words to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
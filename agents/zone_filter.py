@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+Offline registered-name filter built from TLD zone files (e.g. CZDS downloads).
+
+Every delegated name in a zone is registered, so a local copy of the zone answers "taken" for
+most candidates without any network call. Each TLD is stored as a Bloom filter plus a sorted,
+memory-mapped label table; the filter answers the common "not in the zone" case and hits are
+confirmed with a binary search.
+
+Table layout (little endian):
+    header   magic b'DZON', format version, label count
+    offsets  (count + 1) uint64 byte offsets into the label blob
+    labels   sorted ASCII labels relative to the TLD, concatenated
+
+    python -m agents.zone_filter ingest com com.txt.gz
+    python -m agents.zone_filter delta com 2024-06-02.delta.gz
+    python -m agents.zone_filter check example.com some-unlikely-name-4821.com
+"""
+import os
+import io
+import gzip
+import json
+import mmap
+import heapq
+import shutil
+import struct
+import argparse
+import tempfile
+import threading
+from array import array
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from .bloom import BloomFilter
+from .whois_cache import registrable_domain
+
+MAGIC = b'DZON'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIQ')
+OFFSET = struct.Struct('<Q')
+
+DEFAULT_ZONE_DIR = os.getenv('ZONE_FILTER_DIR', os.path.join('.cache', 'zones'))
+# Labels sorted in memory per run before the external merge
+SORT_CHUNK = 2000000
+
+
+def _open_text(path: str):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='ascii', errors='replace')
+    return open(path, 'r', encoding='ascii', errors='replace')
+
+
+def zone_labels(path: str, tld: str) -> Iterator[str]:
+    """Yield the delegated labels (relative to the TLD) from a master-format zone file"""
+    suffix = '.' + tld.strip('.').lower() + '.'
+    origin = suffix
+    owner = None
+    with _open_text(path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith(';'):
+                continue
+            if line[0] == '$':
+                if fields[0].upper() == '$ORIGIN' and len(fields) > 1:
+                    origin = '.' + fields[1].lower().lstrip('.')
+                continue
+            if line[0] in ' \t':
+                # A record without an owner name belongs to the previous owner
+                rest = fields
+            else:
+                owner = fields[0].lower()
+                if owner == '@':
+                    owner = origin[1:]
+                elif not owner.endswith('.'):
+                    owner = owner + origin
+                rest = fields[1:]
+            # Only NS records mark delegations; glue A/AAAA and DNSSEC records are skipped
+            if owner is None or len(rest) < 2 or 'ns' not in (field.lower() for field in rest[:3]):
+                continue
+            if owner.endswith(suffix) and len(owner) > len(suffix):
+                yield owner[:-len(suffix)]
+
+
+def _delta_entries(path: str) -> Iterator[Tuple[str, str]]:
+    """Yield ('+' or '-', name) from a delta file of '+name' / '-name' lines"""
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip().lower()
+            if len(line) > 1 and line[0] in '+-':
+                yield line[0], line[1:].strip().rstrip('.')
+
+
+def _sorted_unique(labels: Iterable[str], workdir: str) -> Iterator[str]:
+    """External sort: sorted runs spilled to disk, then one streaming k-way merge"""
+    runs = []
+    chunk = []
+
+    def spill():
+        chunk.sort()
+        run = tempfile.NamedTemporaryFile('w', dir=workdir, suffix='.run', delete=False, encoding='ascii')
+        with run:
+            run.writelines(label + '\n' for label in chunk)
+        runs.append(run.name)
+        chunk.clear()
+
+    for label in labels:
+        chunk.append(label)
+        if len(chunk) >= SORT_CHUNK:
+            spill()
+    if not runs:
+        # Small zones never touch the disk
+        yield from dict.fromkeys(sorted(chunk))
+        return
+    if chunk:
+        spill()
+    files = [open(run, 'r', encoding='ascii') for run in runs]
+    try:
+        previous = None
+        for line in heapq.merge(*files):
+            label = line.rstrip('\n')
+            if label != previous:
+                yield label
+                previous = label
+    finally:
+        for file in files:
+            file.close()
+        for run in runs:
+            os.remove(run)
+
+
+class ZoneSet:
+    """Read-only label set for one TLD"""
+
+    def __init__(self, directory: str, tld: str):
+        self.tld = tld
+        self.table_path = os.path.join(directory, f"{tld}.labels")
+        self.bloom_path = os.path.join(directory, f"{tld}.bloom")
+        with open(self.table_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{self.table_path} is not a version {FORMAT_VERSION} zone table")
+        self._labels_start = HEADER.size + (self.count + 1) * OFFSET.size
+        self._bloom = BloomFilter.load(self.bloom_path)
+
+    def close(self):
+        self._bloom.close()
+        self._map.close()
+
+    def label(self, index: int) -> str:
+        start, end = struct.unpack_from('<QQ', self._map, HEADER.size + index * OFFSET.size)
+        return self._map[self._labels_start + start:self._labels_start + end].decode('ascii')
+
+    def labels(self) -> Iterator[str]:
+        for index in range(self.count):
+            yield self.label(index)
+
+    def __contains__(self, label: str) -> bool:
+        if label not in self._bloom:
+            return False
+        low, high = 0, self.count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            current = self.label(middle)
+            if current < label:
+                low = middle + 1
+            elif current > label:
+                high = middle - 1
+            else:
+                return True
+        return False
+
+
+def write_zone_set(labels: Iterable[str], directory: str, tld: str, error_rate: float = 0.001) -> int:
+    """Write sorted, unique labels as a TLD's table and Bloom filter; returns the label count"""
+    os.makedirs(directory, exist_ok=True)
+    table_path = os.path.join(directory, f"{tld}.labels")
+    tmp_path = f"{table_path}.tmp"
+    count = 0
+    # The label count is only known at the end, so offsets and labels are staged before the
+    # table is assembled; both go through temporary files so a .com-sized zone never sits in memory
+    with tempfile.TemporaryFile(dir=directory) as offsets, tempfile.TemporaryFile(dir=directory) as blob:
+        pending = array('Q', [0])
+        end = 0
+        for label in labels:
+            data = label.encode('ascii', errors='ignore')
+            blob.write(data)
+            end += len(data)
+            pending.append(end)
+            count += 1
+            if len(pending) >= 65536:
+                pending.tofile(offsets)
+                pending = array('Q')
+        pending.tofile(offsets)
+        offsets.seek(0)
+        blob.seek(0)
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, count))
+            shutil.copyfileobj(offsets, f)
+            shutil.copyfileobj(blob, f)
+
+    # The filter is sized from the final count and filled from the mapped table
+    bloom = BloomFilter(capacity=count, error_rate=error_rate)
+    labels_start = HEADER.size + (count + 1) * OFFSET.size
+    with open(tmp_path, 'rb') as f:
+        if count:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as table:
+                for index in range(count):
+                    start, end = struct.unpack_from('<QQ', table, HEADER.size + index * OFFSET.size)
+                    bloom.add(table[labels_start + start:labels_start + end])
+    os.replace(tmp_path, table_path)
+    bloom.save(os.path.join(directory, f"{tld}.bloom"))
+    return count
+
+
+class ZoneFilter:
+    """Registered-name checks against every TLD ingested into a zone directory"""
+
+    def __init__(self, directory: str = DEFAULT_ZONE_DIR, error_rate: float = 0.001):
+        self.directory = directory
+        self.error_rate = error_rate
+        self._sets = {}
+        self._lock = threading.Lock()
+
+    def tlds(self) -> List[str]:
+        try:
+            return sorted(name[:-len('.labels')] for name in os.listdir(self.directory)
+                          if name.endswith('.labels') and name.count('.') == 1)
+        except OSError:
+            return []
+
+    def _set(self, tld: str) -> Optional[ZoneSet]:
+        with self._lock:
+            if tld not in self._sets:
+                try:
+                    self._sets[tld] = ZoneSet(self.directory, tld)
+                except (OSError, ValueError):
+                    self._sets[tld] = None
+            return self._sets[tld]
+
+    def _reopen(self, tld: str):
+        with self._lock:
+            zone = self._sets.pop(tld, None)
+            if zone is not None:
+                zone.close()
+
+    def close(self):
+        with self._lock:
+            for zone in self._sets.values():
+                if zone is not None:
+                    zone.close()
+            self._sets.clear()
+
+    def is_registered(self, domain: str) -> Optional[bool]:
+        """True if the zone delegates the name, False if it does not, None without that TLD's zone"""
+        domain = registrable_domain(domain)
+        label, _, tld = domain.rpartition('.')
+        zone = self._set(tld)
+        if zone is None or not label:
+            return None
+        return label in zone
+
+    def ingest(self, tld: str, zone_path: str) -> Dict[str, Any]:
+        """Replace a TLD's set with the delegations in a (gzipped) zone file"""
+        tld = tld.strip('.').lower()
+        with self._staging() as staging:
+            count = self._install(tld, _sorted_unique(zone_labels(zone_path, tld), staging), staging)
+        return {'tld': tld, 'labels': count}
+
+    def apply_delta(self, tld: str, delta_path: str) -> Dict[str, Any]:
+        """Apply a daily delta of '+name' (newly delegated) / '-name' (dropped) lines"""
+        tld = tld.strip('.').lower()
+        suffix = '.' + tld
+        added, removed = [], set()
+        for op, name in _delta_entries(delta_path):
+            label = name[:-len(suffix)] if name.endswith(suffix) else name
+            if op == '+':
+                added.append(label)
+            else:
+                removed.add(label)
+        # A name dropped and re-delegated on the same day is still registered: removals go first
+        removed -= set(added)
+        zone = self._set(tld)
+        existing = zone.labels() if zone is not None else iter(())
+
+        def merged():
+            # Both sides are sorted, so the update is one streaming merge into the new table
+            previous = None
+            for label in heapq.merge(existing, sorted(set(added))):
+                if label != previous and label not in removed:
+                    yield label
+                previous = label
+
+        with self._staging() as staging:
+            count = self._install(tld, merged(), staging)
+        return {'tld': tld, 'added': len(added), 'removed': len(removed), 'labels': count}
+
+    def _staging(self):
+        # A subdirectory, so tlds() never sees a half-written set, even after a crash
+        return tempfile.TemporaryDirectory(dir=self._workdir(), prefix='.staging-')
+
+    def _install(self, tld: str, labels: Iterable[str], staging: str) -> int:
+        """Write a TLD's table and filter in the staging directory, then move both into place"""
+        count = write_zone_set(labels, staging, tld, self.error_rate)
+        self._reopen(tld)
+        # Filter first: a crash before the table follows only sends some names to the network
+        for extension in ('bloom', 'labels'):
+            os.replace(os.path.join(staging, f"{tld}.{extension}"),
+                       os.path.join(self.directory, f"{tld}.{extension}"))
+        return count
+
+    def _workdir(self) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        return self.directory
+
+
+_default_filter = None
+_default_filter_lock = threading.Lock()
+
+
+def get_zone_filter() -> Optional[ZoneFilter]:
+    """Process-wide filter, or None when no zone has been ingested yet"""
+    global _default_filter
+    if _default_filter is None:
+        with _default_filter_lock:
+            if _default_filter is None:
+                _default_filter = ZoneFilter()
+    return _default_filter if _default_filter.tlds() else None
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Manage the offline zone-file filter")
+    parser.add_argument('--dir', default=DEFAULT_ZONE_DIR, help='Zone directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='Rebuild a TLD from a (gzipped) zone file')
+    ingest.add_argument('tld')
+    ingest.add_argument('zone_file')
+    delta = commands.add_parser('delta', help="Apply a daily delta of '+name' / '-name' lines")
+    delta.add_argument('tld')
+    delta.add_argument('delta_file')
+    check = commands.add_parser('check', help='Check domains against the ingested zones')
+    check.add_argument('domains', nargs='+')
+    args = parser.parse_args()
+
+    zones = ZoneFilter(args.dir)
+    try:
+        if args.command == 'ingest':
+            print(json.dumps(zones.ingest(args.tld, args.zone_file)))
+        elif args.command == 'delta':
+            print(json.dumps(zones.apply_delta(args.tld, args.delta_file)))
+        else:
+            for domain in args.domains:
+                print(json.dumps({'domain': domain, 'registered': zones.is_registered(domain)}))
+    finally:
+        zones.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Import Time Check
+Fails when importing a module takes longer than its budget, so web workers keep booting fast.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+# Budgets in milliseconds for a cold import in a fresh interpreter
+IMPORT_BUDGETS_MS = {
+    'osint': 150,
+    'domain_research_agent': 300,
+    'agents.domain_research_agent': 250
+}
+
+MEASURE_SNIPPET = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+def measure_import(module, runs=3):
+    """Return the fastest cold import time of a module in milliseconds"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', MEASURE_SNIPPET.format(module=module)],
+            cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return min(timings)
+
+def main():
+    """Measure every budgeted module and exit non-zero if any is over budget"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('modules', nargs='*', help='Modules to check (default: all budgeted modules)')
+    parser.add_argument('--budget', type=float, help='Budget in ms applied to every module checked')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters per module; the fastest run counts')
+    args = parser.parse_args()
+
+    modules = args.modules or list(IMPORT_BUDGETS_MS)
+    failures = []
+    for module in modules:
+        budget = args.budget or IMPORT_BUDGETS_MS.get(module, 200)
+        elapsed = measure_import(module, args.runs)
+        status = "OK" if elapsed <= budget else "OVER BUDGET"
+        print(f"{module:<35} {elapsed:8.1f} ms  (budget {budget:.0f} ms)  {status}")
+        if elapsed > budget:
+            failures.append(module)
+
+    if failures:
+        print(f"\n{len(failures)} module(s) over their import budget: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,23 @@ Domain Research Agent
 A tool to find potentially valuable domain names under $10 for resale.
 """
 
-import os
 import re
 import json
 import time
+import heapq
+import argparse
 import random
-import whois
+import asyncio
 import requests
-import nltk
-from bs4 import BeautifulSoup
-from nltk.corpus import words
-from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
-
-# Download NLTK words corpus if not already downloaded
-try:
-    nltk.data.find('corpora/words')
-except LookupError:
-    nltk.download('words')
+from agents.lazy import Lazy
+from agents.word_index import get_word_index
+from agents.whois_cache import get_whois_cache
+from agents.keyword_matcher import DomainKeywordMatcher
+from agents.dns_prefilter import StageStats, REGISTERED, get_dns_prefilter
+from agents.zone_filter import get_zone_filter
+from agents.verdict_cache import get_verdict_cache
+from agents.run_journal import RunJournal, AVAILABLE, ELIMINATED, ERROR, PASSED, REJECTED, DEFAULT_JOURNAL_PATH
 
 class DomainResearchAgent:
     """Agent that finds potentially valuable domain names under $10"""
@@ -33,11 +32,40 @@ class DomainResearchAgent:
         }
         self.namecheap_api_url = "https://www.namecheap.com/domains/registration/results/"
         self.godaddy_api_url = "https://api.godaddy.com/v1/domains/available"
-        self.trending_keywords = []
         self.valuable_tlds = ['.com', '.ai', '.io', '.co', '.net', '.org', '.app']
         self.premium_tlds = ['.com', '.ai', '.io']
         self.industry_trends = self._load_industry_trends()
-        self.load_trending_keywords()
+        # Scraping news sites is slow, so keywords are loaded on first use
+        self._trending_keywords = Lazy(self.load_trending_keywords)
+        # All trending and industry keywords compiled into one automaton once the keywords are loaded
+        self._keyword_matcher = Lazy(lambda: DomainKeywordMatcher(self.trending_keywords, self.industry_trends))
+        self._dns_prefilter = Lazy(get_dns_prefilter)
+        # Per-stage counts and latencies of the most recent check_domain_availability call
+        self.last_stage_stats = {}
+        # Adaptive concurrency limit and counters per backend host after that call
+        self.last_backend_limits = {}
+        # Optional run journal (agents.run_journal); with resume, settled domains are not checked again
+        self.journal = None
+        self.resume = False
+    
+    def use_journal(self, journal, resume=False):
+        """Record every check in a run journal; with resume, reuse verdicts it already holds"""
+        self.journal = journal
+        self.resume = resume
+    
+    @property
+    def trending_keywords(self):
+        """Trending keywords, loaded the first time they are needed"""
+        return self._trending_keywords.get()
+    
+    def reload_trending_keywords(self):
+        """Discard the loaded keywords so the next access fetches them again"""
+        self._trending_keywords.reset()
+        self._keyword_matcher.reset()
+    
+    def _match_keywords(self, domain):
+        """Every trending and industry keyword in the domain label, found in a single pass"""
+        return self._keyword_matcher.get().match(domain.split('.')[0])
         
     def _load_industry_trends(self):
         """Load current industry trends for domain valuation"""
@@ -82,7 +110,10 @@ class DomainResearchAgent:
         
     def load_trending_keywords(self):
         """Load trending keywords from various sources"""
+        from bs4 import BeautifulSoup
+        
         print("Loading trending keywords...")
+        trending_keywords = []
         try:
             # Method 1: From technology news sites
             tech_sources = [
@@ -101,7 +132,7 @@ class DomainResearchAgent:
                         for headline in headlines:
                             if headline.text:
                                 words = self._extract_keywords(headline.text)
-                                self.trending_keywords.extend(words)
+                                trending_keywords.extend(words)
                 except Exception as e:
                     print(f"Error fetching from {source}: {e}")
                     
@@ -112,25 +143,27 @@ class DomainResearchAgent:
                 "biotech", "healthtech", "green", "eco", "carbon", "solar",
                 "smart", "digital", "virtual", "mobile", "app", "web3", "defi"
             ]
-            self.trending_keywords.extend(tech_trends)
+            trending_keywords.extend(tech_trends)
             
             # Add industry-specific keywords
             for industry, data in self.industry_trends.items():
-                self.trending_keywords.extend(data["keywords"])
+                trending_keywords.extend(data["keywords"])
             
             # Remove duplicates and sort by length (shorter is generally better for domains)
-            self.trending_keywords = list(set(self.trending_keywords))
-            self.trending_keywords.sort(key=len)
+            trending_keywords = list(set(trending_keywords))
+            trending_keywords.sort(key=len)
             
-            print(f"Loaded {len(self.trending_keywords)} trending keywords")
+            print(f"Loaded {len(trending_keywords)} trending keywords")
             
         except Exception as e:
             print(f"Error loading trending keywords: {e}")
             # Fallback to a basic set of keywords
-            self.trending_keywords = [
+            trending_keywords = [
                 "ai", "crypto", "tech", "meta", "web", "nft", "cloud", 
                 "data", "cyber", "green", "smart", "app", "saas", "learn"
             ]
+        
+        return trending_keywords
     
     def _extract_keywords(self, text):
         """Extract potential keywords from text"""
@@ -152,28 +185,28 @@ class DomainResearchAgent:
     
     def generate_domain_ideas(self, count=250):
         """Generate potential valuable domain ideas"""
-        domain_ideas = []
+        domain_ideas = list(self.iter_domain_ideas())
+            
+        # Deduplicate and limit to requested count
+        domain_ideas = list(set(domain_ideas))[:count]
         
+        print(f"Generated {len(domain_ideas)} domain ideas")
+        return domain_ideas
+    
+    def iter_domain_ideas(self, endless=False):
+        """Yield domain ideas strategy by strategy; endless keeps drawing random names afterwards"""
         # Strategy 1: Use trending keywords with valuable TLDs
         for keyword in self.trending_keywords[:40]:  # Use top 40 trending keywords
             for tld in self.valuable_tlds:
-                domain = f"{keyword}{tld}"
-                domain_ideas.append(domain)
+                yield f"{keyword}{tld}"
         
         # Strategy 2: Combine two trending keywords
         for i in range(min(25, len(self.trending_keywords))):
             for j in range(i+1, min(25, len(self.trending_keywords))):
-                combined = f"{self.trending_keywords[i]}{self.trending_keywords[j]}.com"
-                domain_ideas.append(combined)
+                yield f"{self.trending_keywords[i]}{self.trending_keywords[j]}.com"
         
         # Strategy 3: Short dictionary words (premium domains)
-        english_words = set(words.words())
-        short_words = [word.lower() for word in english_words if 3 <= len(word) <= 5]
-        random.shuffle(short_words)
-        
-        for word in short_words[:40]:  # Take 40 random short words
-            domain = f"{word}.com"
-            domain_ideas.append(domain)
+        yield from self._dictionary_domains()
             
         # Strategy 4: Industry-specific premium domains
         for industry, data in self.industry_trends.items():
@@ -183,195 +216,223 @@ class DomainResearchAgent:
             
             for kw in keywords:
                 for tld in self.premium_tlds:
-                    domain = f"{kw}{tld}"
-                    domain_ideas.append(domain)
+                    yield f"{kw}{tld}"
                     
                     # Also try adding common prefixes/suffixes for premium domains
                     for prefix in ["get", "my", "the", "go"]:
                         if 3 <= len(prefix + kw) <= 10:
-                            domain = f"{prefix}{kw}.com"
-                            domain_ideas.append(domain)
+                            yield f"{prefix}{kw}.com"
                     
                     for suffix in ["hub", "spot", "app", "hq", "now"]:
                         if 3 <= len(kw + suffix) <= 10:
-                            domain = f"{kw}{suffix}.com"
-                            domain_ideas.append(domain)
+                            yield f"{kw}{suffix}.com"
         
-        # Strategy 5: Generate unique combinations that are less likely to be taken
-        for _ in range(100):
-            # Choose random trending keyword
+        while True:
+            # Strategy 5: Generate unique combinations that are less likely to be taken
             if len(self.trending_keywords) > 0:
-                kw = random.choice(self.trending_keywords)
-                
-                # Add random suffix (2-4 chars)
-                chars = 'abcdefghijklmnopqrstuvwxyz'
-                suffix_len = random.randint(2, 4)
-                suffix = ''.join(random.choice(chars) for _ in range(suffix_len))
-                
-                domain = f"{kw}{suffix}.com"
-                domain_ideas.append(domain)
+                for _ in range(100):
+                    yield self._keyword_suffix_domain()
+            
+            # Strategy 6: Use random short pronounceable combinations (more likely to be available)
+            for _ in range(150):
+                yield self._pronounceable_domain()
+            
+            if not endless:
+                return
+            yield from self._dictionary_domains()
+    
+    def _dictionary_domains(self):
+        """Short dictionary words on .com"""
+        # Sampled by position from the mapped word index; no word set is built per call
+        short_words = get_word_index().sample(40, min_length=3, max_length=5)
         
-        # Strategy 6: Use random short pronounceable combinations (more likely to be available)
+        for word in short_words:  # Take 40 random short words
+            yield f"{word}.com"
+    
+    def _keyword_suffix_domain(self):
+        """Random trending keyword with a random 2-4 letter suffix"""
+        kw = random.choice(self.trending_keywords)
+        
+        chars = 'abcdefghijklmnopqrstuvwxyz'
+        suffix_len = random.randint(2, 4)
+        suffix = ''.join(random.choice(chars) for _ in range(suffix_len))
+        
+        return f"{kw}{suffix}.com"
+    
+    def _pronounceable_domain(self):
+        """Random 5-8 letter name alternating consonants and vowels"""
         vowels = 'aeiou'
         consonants = 'bcdfghjklmnpqrstvwxyz'
         
-        for _ in range(150):
-            domain_name = ""
-            length = random.randint(5, 8)
-            
-            start_with = random.choice(['vowel', 'consonant'])
-            
-            for i in range(length):
-                if (i % 2 == 0 and start_with == 'consonant') or (i % 2 == 1 and start_with == 'vowel'):
-                    domain_name += random.choice(consonants)
-                else:
-                    domain_name += random.choice(vowels)
-            
-            tld = random.choice(self.valuable_tlds)
-            domain = f"{domain_name}{tld}"
-            domain_ideas.append(domain)
-            
-        # Deduplicate and limit to requested count
-        domain_ideas = list(set(domain_ideas))[:count]
+        domain_name = ""
+        length = random.randint(5, 8)
         
-        print(f"Generated {len(domain_ideas)} domain ideas")
-        return domain_ideas
+        start_with = random.choice(['vowel', 'consonant'])
+        
+        for i in range(length):
+            if (i % 2 == 0 and start_with == 'consonant') or (i % 2 == 1 and start_with == 'vowel'):
+                domain_name += random.choice(consonants)
+            else:
+                domain_name += random.choice(vowels)
+        
+        tld = random.choice(self.valuable_tlds)
+        return f"{domain_name}{tld}"
     
     def check_domain_availability(self, domain_list):
         """Check if domains are available and their price"""
-        available_domains = []
-        
         print(f"Checking availability of {len(domain_list)} domains...")
+        stats = StageStats()
         
-        # Use ThreadPoolExecutor to check multiple domains concurrently
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            results = list(executor.map(self._check_single_domain, domain_list))
-            
-        for result in results:
-            if result:  # If not None
-                available_domains.append(result)
+        async def collect():
+            return [result async for result in self.stream_domain_availability(domain_list, stats)]
+        
+        available_domains = self._run_async(collect)
+        
+        self.last_stage_stats = stats.as_dict()
+        print("Availability check stages:\n" + stats.summary())
+        for host, metrics in self.last_backend_limits.items():
+            print(f"  {host}: limit {metrics['limit']}, {metrics['throttled']} throttled, "
+                  f"{metrics['errors']} errors, latency {metrics['latency_ms']}ms")
                 
         # Sort by score (higher is better)
         available_domains.sort(key=lambda x: x['score'], reverse=True)
         
         return available_domains
     
-    def _check_single_domain(self, domain):
-        """Check if a single domain is actually available online"""
+    async def stream_domain_availability(self, domain_list, stats=None):
+        """Yield results for available domains in the order their checks finish"""
+        # aiohttp is only needed once checks run, so it is imported here rather than at module load
+        from agents.availability_checker import CheckFailed, get_availability_checker
+        
+        stats = stats if stats is not None else StageStats()
+        journal = self.journal
+        
+        # Domains a resumed run already settled come straight from the journal (and join this run)
+        if journal is not None and self.resume:
+            started = time.perf_counter()
+            settled = journal.adopt(domain_list)
+            for result in settled.values():
+                if result:
+                    yield result
+            stats.record('journal', len(domain_list), len(settled), time.perf_counter() - started)
+            domain_list = [domain for domain in domain_list if domain not in settled]
+        
+        # Fresh verdicts shared by both agents skip every check below
+        verdicts = get_verdict_cache()
+        started = time.perf_counter()
+        cached = verdicts.get_many(domain_list)
+        for domain in domain_list:
+            verdict = cached.get(domain.lower())
+            if verdict is None:
+                continue
+            result = self._build_available_result(domain, verdict.verified) if verdict.available else None
+            if journal is not None:
+                journal.record(domain, 'verdict_cache', AVAILABLE if result else REJECTED, result)
+            if result:
+                yield result
+        stats.record('verdicts', len(domain_list), len(cached), time.perf_counter() - started)
+        domain_list = [domain for domain in domain_list if domain.lower() not in cached]
+        
+        # Stage 0: local zone files reject delegated names with no network call at all
+        candidates = self._filter_by_zone(domain_list, stats)
+        self._record_rejected(domain_list, candidates, 'zone')
+        
+        # Stage 1: one NS/SOA query eliminates every delegated (registered) name
+        remaining = candidates
+        candidates = await self._filter_by_dns(candidates, stats)
+        self._record_rejected(remaining, candidates, 'dns')
+        
+        # Stage 2: RDAP, WHOIS and the registrar checks run concurrently per domain on one shared session
+        on_stage = None
+        if journal is not None:
+            on_stage = lambda domain, backend, eliminated: journal.record(
+                domain, backend, ELIMINATED if eliminated else PASSED)
+        checker = get_availability_checker(self._build_available_result, on_stage=on_stage)
+        # One cache write for the whole batch rather than one per answer
+        with get_whois_cache().batch():
+            async with checker:
+                async for domain, result in checker.stream(candidates):
+                    if isinstance(result, CheckFailed):
+                        # Not checked, so neither journaled as rejected nor cached as a verdict
+                        if journal is not None:
+                            journal.record(domain, 'final', ERROR, {'domain': domain, 'error': str(result.error)})
+                        continue
+                    if journal is not None:
+                        journal.record(domain, 'final', AVAILABLE if result else REJECTED, result)
+                    if result:
+                        print(f"{domain} appears to be available for ~${result['price']:.2f}")
+                        yield result
+        
+        by_source = {}
+        for domain, (available, source, checked_at) in checker.verdicts.items():
+            # The checker only records registry and registrar answers, so every verdict is verified.
+            # An answer served from the WHOIS cache keeps its original time, so it cannot outlive its TTL
+            by_source.setdefault(source, []).append((domain, available, True, checked_at))
+        for source, answers in by_source.items():
+            verdicts.put_many(answers, source)
+        for stage, checked, eliminated, latencies in checker.stage_report():
+            stats.record(stage, checked, eliminated, sum(latencies), latencies)
+        self.last_backend_limits = checker.limits()
+    
+    def _record_rejected(self, before, after, stage):
+        """Store the names a filter stage removed as taken, in the verdict cache and the journal"""
+        if len(after) < len(before):
+            kept = set(after)
+            rejected = [domain for domain in before if domain not in kept]
+            get_verdict_cache().put_many([(domain, False, True) for domain in rejected], stage)
+            if self.journal is not None:
+                self.journal.record_many(rejected, stage, REJECTED)
+    
+    def _run_async(self, factory):
+        """Run a coroutine to completion, on a worker thread if this thread already runs a loop"""
         try:
-            # First, use Python's whois library to check availability
-            # This performs a real WHOIS lookup
-            print(f"Checking availability of {domain}...")
-            w = whois.whois(domain)
-            
-            # If the domain has registration info, it's taken
-            if (w.creation_date or w.expiration_date or w.registrar or 
-                isinstance(w.status, list) and len(w.status) > 0):
-                print(f"{domain} appears to be taken (has WHOIS data)")
-                return None
-                
-            # If no registration info from WHOIS, do a secondary check using an availability API
-            # We'll use a free API to check domain availability
-            try:
-                # Try using a public API to double-check availability
-                api_url = f"https://domain-availability.whoisxmlapi.com/api/v1?apiKey=at_demo&domainName={domain}"
-                response = requests.get(api_url, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'DomainInfo' in data and 'domainAvailability' in data['DomainInfo']:
-                        if data['DomainInfo']['domainAvailability'] != 'AVAILABLE':
-                            print(f"{domain} is not available according to API check")
-                            return None
-                    else:
-                        # If API doesn't confirm availability, try an additional check
-                        pass
-            except Exception as api_error:
-                print(f"API check failed for {domain}: {api_error}")
-                # Continue with other checks if API fails
-            
-            # If we get here, the domain might be available
-            # Let's also try to check a registrar website as final verification
-            try:
-                # Try checking with Namecheap's availability page
-                namecheap_url = f"https://www.namecheap.com/domains/registration/results/?domain={domain}"
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                
-                response = requests.get(namecheap_url, headers=headers, timeout=10)
-                
-                # If "Domain is taken" appears in the response, it's not available
-                if "Domain is taken" in response.text:
-                    print(f"{domain} is taken according to Namecheap")
-                    return None
-                    
-                # If we find price information, the domain is likely available
-                if "Add to cart" in response.text:
-                    # Try to extract the price (this is a simplified approach)
-                    price = None
-                    
-                    # In a real implementation, you'd parse the HTML to extract the price
-                    # For now, use our mock price function
-                    price = self._get_domain_price(domain)
-                    
-                    if price and price < 10.0:
-                        print(f"{domain} appears to be available for ~${price:.2f}")
-                        score = self._calculate_domain_value(domain)
-                        investment_potential = self._analyze_investment_potential(domain, score)
-                        
-                        return {
-                            'domain': domain,
-                            'price': price,
-                            'score': score,
-                            'reasons': self._get_value_reasons(domain, score),
-                            'investment_potential': investment_potential,
-                            'availability_verified': True
-                        }
-            except Exception as web_error:
-                print(f"Web check failed for {domain}: {web_error}")
-                
-            # If we've made it this far, we haven't conclusively determined availability
-            # For demo purposes, consider it potentially available but mark it as unverified
-            print(f"{domain} - availability uncertain, marking as potentially available")
-            price = self._get_domain_price(domain)
-            
-            if price and price < 10.0:
-                score = self._calculate_domain_value(domain)
-                investment_potential = self._analyze_investment_potential(domain, score)
-                
-                return {
-                    'domain': domain,
-                    'price': price,
-                    'score': score,
-                    'reasons': self._get_value_reasons(domain, score),
-                    'investment_potential': investment_potential,
-                    'availability_verified': False  # Flag as not fully verified
-                }
-            return None
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(factory())
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(lambda: asyncio.run(factory())).result()
+    
+    def _filter_by_zone(self, domain_list, stats):
+        """Drop names found in an ingested zone file; TLDs without a local zone pass through"""
+        zones = get_zone_filter()
+        if zones is None:
+            return list(domain_list)
+        
+        started = time.perf_counter()
+        candidates = [domain for domain in domain_list if not zones.is_registered(domain)]
+        stats.record('zone', len(domain_list), len(domain_list) - len(candidates),
+                     time.perf_counter() - started)
+        return candidates
+    
+    async def _filter_by_dns(self, domain_list, stats):
+        """Drop names the DNS shows as registered; NXDOMAIN and unanswered names go on"""
+        started = time.perf_counter()
+        results = await self._dns_prefilter.get().check_many(domain_list)
+        
+        # A resolver failure is not evidence either way, so only a positive answer eliminates a name
+        candidates = [domain for domain, result in zip(domain_list, results) if result.status != REGISTERED]
+        stats.record('dns', len(domain_list), len(domain_list) - len(candidates),
+                     time.perf_counter() - started, [result.seconds for result in results])
+        return candidates
+    
+    def _build_available_result(self, domain, verified, price=None):
+        """Price and score a domain that looks available, or None if it is over budget"""
+        price = price if price is not None else self._get_domain_price(domain)
+        
+        if price and price < 10.0:
+            matches = self._match_keywords(domain)
+            score = self._calculate_domain_value(domain, matches)
+            investment_potential = self._analyze_investment_potential(domain, score, matches)
             
-        except Exception as e:
-            if "No match for domain" in str(e) or "No match for" in str(e):
-                # This usually means the domain doesn't exist in WHOIS records,
-                # which is a good sign that it might be available
-                print(f"{domain} not found in WHOIS - potentially available")
-                price = self._get_domain_price(domain)
-                
-                if price and price < 10.0:
-                    score = self._calculate_domain_value(domain)
-                    investment_potential = self._analyze_investment_potential(domain, score)
-                    
-                    return {
-                        'domain': domain,
-                        'price': price,
-                        'score': score,
-                        'reasons': self._get_value_reasons(domain, score),
-                        'investment_potential': investment_potential,
-                        'availability_verified': True  # No WHOIS record is a good sign
-                    }
-            else:
-                print(f"Error checking {domain}: {e}")
-            return None
+            return {
+                'domain': domain,
+                'price': price,
+                'score': score,
+                'reasons': self._get_value_reasons(domain, score, matches),
+                'investment_potential': investment_potential,
+                'availability_verified': verified
+            }
+        return None
     
     def _get_domain_price(self, domain):
         """Get the approximate price of a domain by checking common registrars"""
@@ -416,12 +477,13 @@ class DomainResearchAgent:
             print(f"Error getting price for {domain}: {e}")
             return 9.99  # Default to $9.99 if we can't determine the price
     
-    def _calculate_domain_value(self, domain):
+    def _calculate_domain_value(self, domain, matches=None):
         """Calculate a score for the domain's potential value"""
         score = 50  # Base score
         
         # Remove TLD for analysis
         domain_name = domain.split('.')[0]
+        matches = matches or self._match_keywords(domain)
         
         # Factor 1: Domain length (shorter is better)
         if len(domain_name) <= 4:
@@ -432,10 +494,8 @@ class DomainResearchAgent:
             score += 10
             
         # Factor 2: Contains trending keyword
-        for keyword in self.trending_keywords:
-            if keyword in domain_name:
-                score += 15
-                break
+        if matches.trending_keyword is not None:
+            score += 15
                 
         # Factor 3: All letters (no numbers or hyphens)
         if domain_name.isalpha():
@@ -457,20 +517,25 @@ class DomainResearchAgent:
             
         # Factor 6: Industry association (higher value for in-demand industries)
         industry_score = 0
-        for industry, data in self.industry_trends.items():
-            for keyword in data["keywords"]:
-                if keyword in domain_name:
-                    industry_factor = data["growth_factor"] * 10
-                    industry_score = max(industry_score, industry_factor)
+        for industry in matches.industries:
+            industry_factor = self.industry_trends[industry]["growth_factor"] * 10
+            industry_score = max(industry_score, industry_factor)
         
         score += industry_score
             
         return score
     
-    def _analyze_investment_potential(self, domain, score):
+    def score_candidates(self, domains):
+        """Scores for many candidates at once, identical to calling _calculate_domain_value on each"""
+        # NumPy is only needed for batch scoring, so it is imported here rather than at module load
+        from agents.batch_scorer import BatchScorer
+        return BatchScorer(self._keyword_matcher.get(), self.industry_trends).score_domains(domains)
+    
+    def _analyze_investment_potential(self, domain, score, matches=None):
         """Analyze the investment potential of a domain"""
         domain_name = domain.split('.')[0]
         tld = '.' + domain.split('.')[-1]
+        matches = matches or self._match_keywords(domain)
         
         # Baseline potential based on score
         if score >= 120:
@@ -493,8 +558,7 @@ class DomainResearchAgent:
         primary_industry = None
         highest_match = 0
         
-        for industry, data in self.industry_trends.items():
-            keyword_matches = sum(1 for kw in data["keywords"] if kw in domain_name)
+        for industry, keyword_matches in matches.industry_matches:
             if keyword_matches > highest_match:
                 highest_match = keyword_matches
                 primary_industry = industry
@@ -548,21 +612,20 @@ class DomainResearchAgent:
             "future_outlook": future_outlook
         }
     
-    def _get_value_reasons(self, domain, score):
+    def _get_value_reasons(self, domain, score, matches=None):
         """Get reasons why a domain might be valuable"""
         reasons = []
         domain_name = domain.split('.')[0]
         tld = '.' + domain.split('.')[-1]
+        matches = matches or self._match_keywords(domain)
         
         if len(domain_name) <= 4:
             reasons.append("Very short name (premium)")
         elif len(domain_name) <= 6:
             reasons.append("Short name (desirable)")
             
-        for keyword in self.trending_keywords:
-            if keyword in domain_name:
-                reasons.append(f"Contains trending keyword '{keyword}'")
-                break
+        if matches.trending_keyword is not None:
+            reasons.append(f"Contains trending keyword '{matches.trending_keyword}'")
                 
         if domain_name.isalpha():
             reasons.append("All letters, no special characters")
@@ -573,28 +636,72 @@ class DomainResearchAgent:
             reasons.append(f"Trending {tld} TLD")
             
         # Add industry-specific reasons
-        for industry, data in self.industry_trends.items():
-            for keyword in data["keywords"]:
-                if keyword in domain_name:
-                    reasons.append(f"Associated with {industry} industry (growth factor: {data['growth_factor']})")
-                    break
+        for industry in matches.industries:
+            reasons.append(f"Associated with {industry} industry "
+                           f"(growth factor: {self.industry_trends[industry]['growth_factor']})")
             
         return reasons
     
-    def run(self, count=50):
-        """Run the domain research process and return results"""
-        print("Starting domain research...")
+    def run(self, count=50, wave_size=None, pool_size=None, max_checks=None):
+        """Run the domain research process and return results
         
-        # Generate domain ideas
-        domain_ideas = self.generate_domain_ideas(count * 10)  # Generate more ideas than needed
+        Candidates are generated lazily and scored cheaply; only the best-scoring ones are sent
+        to the network availability checks, in waves, until `count` verified names are found.
+        """
+        print("Starting domain research...")
         
-        # Check availability and pricing
-        available_domains = self.check_domain_availability(domain_ideas)
+        wave_size = wave_size or max(count, 10)
+        pool_size = pool_size or wave_size * 10
+        # Never spend more network checks than the old generate-then-check-everything run did
+        max_checks = max_checks or count * 10
+        
+        candidates = self.iter_domain_ideas(endless=True)
+        seen = set()
+        pool = []  # min-heap of (score, order, domain) holding the best unchecked candidates
+        order = 0
+        scored = 0
+        checked = 0
+        verified = []
+        unverified = []
+        
+        while len(verified) < count and checked < max_checks:
+            # Top the pool up with freshly scored candidates; a full pool only keeps the best
+            fresh = []
+            while len(fresh) < pool_size:
+                domain = next(candidates)
+                if domain not in seen:
+                    seen.add(domain)
+                    fresh.append(domain)
+            scored += len(fresh)
+            for domain, score in zip(fresh, self.score_candidates(fresh)):
+                order += 1
+                entry = (score, -order, domain)
+                if len(pool) < pool_size:
+                    heapq.heappush(pool, entry)
+                elif entry > pool[0]:
+                    heapq.heapreplace(pool, entry)
+            
+            # Send the best of the pool to DNS/WHOIS/RDAP
+            wave = heapq.nlargest(min(wave_size, max_checks - checked), pool)
+            wave_domains = {domain for _, _, domain in wave}
+            pool = [entry for entry in pool if entry[2] not in wave_domains]
+            heapq.heapify(pool)
+            checked += len(wave)
+            
+            for result in self.check_domain_availability([domain for _, _, domain in wave]):
+                if result.get('availability_verified', False):
+                    verified.append(result)
+                else:
+                    unverified.append(result)
+            print(f"Checked {checked} of {scored} scored candidates: {len(verified)} verified available")
         
-        # Limit to requested count
-        top_domains = available_domains[:count]
+        # Verified names first, topped up with unverified ones if the check budget ran out
+        verified.sort(key=lambda x: x['score'], reverse=True)
+        unverified.sort(key=lambda x: x['score'], reverse=True)
+        top_domains = (verified + unverified)[:count]
         
-        print(f"Found {len(top_domains)} potential valuable domains under $10")
+        print(f"Found {len(top_domains)} potential valuable domains under $10 "
+              f"({checked} availability checks for {scored} candidates)")
         
         return top_domains
     
@@ -632,7 +739,19 @@ class DomainResearchAgent:
 
 def main():
     """Run the domain research agent"""
+    parser = argparse.ArgumentParser(description="Find available, valuable domains")
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip domains the run journal already settled within the window')
+    parser.add_argument('--journal', default=DEFAULT_JOURNAL_PATH, help='Run journal database')
+    parser.add_argument('--window', type=float, default=24, help='Hours a journaled verdict stays valid')
+    args = parser.parse_args()
+    
     agent = DomainResearchAgent()
+    # Every check is journaled as it completes, so a killed run loses nothing and partial
+    # results can be read with: python -m agents.run_journal results
+    journal = RunJournal(args.journal, window=args.window * 3600)
+    journal.start_run({'resume': args.resume})
+    agent.use_journal(journal, resume=args.resume)
     
     print("\nFocusing on finding ACTUALLY AVAILABLE domains...")
     
@@ -749,6 +868,9 @@ def main():
     print("1. Visit a domain registrar like Namecheap.com or GoDaddy.com")
     print("2. Search for these domains to verify final availability and exact pricing")
     print("3. Register the domains that fit your investment criteria")
+    
+    journal.finish_run()
+    journal.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
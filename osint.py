@@ -1,16 +1,60 @@
 import os
-import aiohttp
-import whois
-import dns.resolver
-from typing import Dict, Optional
+import asyncio
+from typing import Dict, List, Optional
 from datetime import datetime
-import shodan
-from fullcontact import FullContact # type: ignore
-from truecallerpy import search_phonenumber
+from agents.lazy import Lazy
+from agents.whois_cache import get_whois_cache
+from agents.shodan_lookup import ShodanLookup
+from agents.tech_fingerprint import get_fingerprint_engine
+from agents.provider_orchestrator import ProviderOrchestrator
 
-# Initialize API clients
-shodan_api = shodan.Shodan(os.getenv("SHODAN_API_KEY"))
-fullcontact_api = FullContact(os.getenv("FULLCONTACT_API_KEY"))
+# API clients are built on first use so importing this module stays cheap for web workers
+def _build_shodan_api():
+    import shodan
+    return shodan.Shodan(os.getenv("SHODAN_API_KEY"))
+
+def _build_fullcontact_api():
+    from fullcontact import FullContact # type: ignore
+    return FullContact(os.getenv("FULLCONTACT_API_KEY"))
+
+shodan_api = Lazy(_build_shodan_api)
+fullcontact_api = Lazy(_build_fullcontact_api)
+shodan_lookup = Lazy(lambda: ShodanLookup(shodan_api.get()))
+
+async def _fullcontact_person(query: str) -> Dict:
+    return await fullcontact_api.get().person.enrich(query)
+
+async def _truecaller_phone(query: str) -> Dict:
+    from truecallerpy import search_phonenumber
+    return await search_phonenumber(query)
+
+async def _local_phone_info(query: str) -> Dict:
+    """Offline number details used as the hedge for a slow TrueCaller lookup"""
+    import phonenumbers
+    from phonenumbers import geocoder, carrier
+    parsed = phonenumbers.parse(query if query.startswith("+") else f"+{query}")
+    return {
+        "e164": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164),
+        "valid": phonenumbers.is_valid_number(parsed),
+        "country": geocoder.country_name_for_number(parsed, "en"),
+        "carrier": carrier.name_for_number(parsed, "en") or "Unknown"
+    }
+
+# Each source gets its own timeout; the orchestrator deadline bounds the whole search
+people_providers = ProviderOrchestrator(deadline=float(os.getenv("PEOPLE_SEARCH_DEADLINE", 8)))
+people_providers.register("fullcontact", _fullcontact_person, timeout=6.0)
+
+phone_providers = ProviderOrchestrator(deadline=float(os.getenv("PHONE_SEARCH_DEADLINE", 8)))
+phone_providers.register("truecaller", _truecaller_phone, timeout=6.0, backup=_local_phone_info)
+
+def _merge_provider_outcome(results: Dict, outcome: Dict, enabled: List[str]):
+    """Attach per-source status and report an error only when every enabled source failed"""
+    results["sources"] = outcome["sources"]
+    failed = [name for name, status in outcome["sources"].items() if status["status"] != "ok"]
+    if enabled and len(failed) == len(enabled):
+        results["error"] = "; ".join(
+            f"{name}: {outcome['sources'][name].get('error', outcome['sources'][name]['status'])}" for name in failed
+        )
 
 async def search_people(query: str, options: Optional[Dict] = None) -> Dict:
     """
@@ -24,12 +68,16 @@ async def search_people(query: str, options: Optional[Dict] = None) -> Dict:
     }
     
     try:
+        # All enabled sources run concurrently; slow ones are reported instead of blocking
+        enabled = [name for name in people_providers.providers if options and options.get(name)]
+        outcome = await people_providers.run(query, enabled)
+        
         # Basic information from FullContact
-        if options and options.get("fullcontact"):
-            person_data = await fullcontact_api.person.enrich(query)
-            results["basic_info"] = person_data
-            
-        # Additional sources can be added here
+        if "fullcontact" in outcome["results"]:
+            results["basic_info"] = outcome["results"]["fullcontact"]
+        _merge_provider_outcome(results, outcome, enabled)
+        
+        # Additional sources can be registered on people_providers
         
     except Exception as e:
         results["error"] = str(e)
@@ -48,12 +96,22 @@ async def search_phone(query: str, options: Optional[Dict] = None) -> Dict:
     }
     
     try:
+        # All enabled sources run concurrently; slow ones are reported instead of blocking
+        enabled = [name for name in phone_providers.providers if options and options.get(name)]
+        outcome = await phone_providers.run(query, enabled)
+        
         # Basic information from TrueCaller
-        if options and options.get("truecaller"):
-            phone_data = await search_phonenumber(query)
-            results["basic_info"] = phone_data
-            
-        # Additional sources can be added here
+        if "truecaller" in outcome["results"]:
+            results["basic_info"] = outcome["results"]["truecaller"]
+        
+        # The offline hedge answers when TrueCaller is slow; it only knows carrier and country
+        local_info = outcome["results"].get("truecaller:backup")
+        if local_info:
+            results["carrier"] = {"name": local_info["carrier"], "valid": local_info["valid"]}
+            results["location"] = {"country": local_info["country"], "e164": local_info["e164"]}
+        _merge_provider_outcome(results, outcome, enabled)
+        
+        # Additional sources can be registered on phone_providers
         
     except Exception as e:
         results["error"] = str(e)
@@ -74,16 +132,17 @@ async def search_domain(query: str, options: Optional[Dict] = None) -> Dict:
     try:
         # WHOIS information
         if options and options.get("whois"):
-            w = whois.whois(query)
+            w = get_whois_cache().lookup(query)["fields"]
             results["whois"] = {
-                "registrar": w.registrar,
-                "creation_date": w.creation_date,
-                "expiration_date": w.expiration_date,
-                "name_servers": w.name_servers
+                "registrar": w.get("registrar"),
+                "creation_date": w.get("creation_date"),
+                "expiration_date": w.get("expiration_date"),
+                "name_servers": w.get("name_servers")
             }
         
         # DNS information
         if options and options.get("dns"):
+            import dns.resolver
             dns_results = {}
             for record_type in ['A', 'MX', 'NS', 'TXT']:
                 try:
@@ -95,12 +154,9 @@ async def search_domain(query: str, options: Optional[Dict] = None) -> Dict:
             
         # Security information from Shodan
         if options and options.get("shodan"):
-            shodan_results = shodan_api.host(query)
-            results["security"] = {
-                "ports": shodan_results.get("ports", []),
-                "vulns": shodan_results.get("vulns", []),
-                "hostnames": shodan_results.get("hostnames", [])
-            }
+            # Resolved IPs are looked up in batches and cached, off the event loop
+            loop = asyncio.get_running_loop()
+            results["security"] = await loop.run_in_executor(None, shodan_lookup.get().lookup, query)
             
     except Exception as e:
         results["error"] = str(e)
@@ -119,6 +175,8 @@ async def enrich_domain(query: str, options: Optional[Dict] = None) -> Dict:
     }
     
     try:
+        import aiohttp
+        
         # SSL information
         if options and options.get("ssl"):
             async with aiohttp.ClientSession() as session:
@@ -134,10 +192,15 @@ async def enrich_domain(query: str, options: Optional[Dict] = None) -> Dict:
             async with aiohttp.ClientSession() as session:
                 async with session.get(f"https://{query}") as response:
                     headers = response.headers
+                    # Only the first max_body_bytes of the page are read and fingerprinted
+                    engine = get_fingerprint_engine()
+                    body = await response.content.read(engine.max_body_bytes)
+                    cookies = {name: morsel.value for name, morsel in response.cookies.items()}
                     results["technologies"] = {
                         "server": headers.get("Server"),
                         "powered_by": headers.get("X-Powered-By"),
-                        "framework": headers.get("X-Framework")
+                        "framework": headers.get("X-Framework"),
+                        "detected": engine.analyze(headers, body, cookies)
                     }
         
         # Subdomain enumeration
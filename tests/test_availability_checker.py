@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+AvailabilityChecker cascade when RDAP and the WHOIS server lookup cannot help
+"""
+import asyncio
+from agents import availability_checker
+from agents.adaptive_limiter import limiter_metrics
+from agents.availability_checker import AvailabilityChecker
+from agents.whois_cache import WhoisCache
+
+
+class _NoRDAP:
+    async def base_url_for(self, domain):
+        return None
+
+    async def check(self, domain):
+        raise AssertionError("RDAP must be skipped for a TLD without a server")
+
+
+class _UnreachableWhois:
+    async def server_for(self, domain):
+        raise OSError("IANA referral failed")
+
+    async def lookup(self, domain):
+        raise AssertionError("no port-43 lookup without a server")
+
+
+def test_missing_rdap_server_and_whois_referral_fall_through_to_python_whois(tmp_path, monkeypatch):
+    cache = WhoisCache(path=str(tmp_path / 'whois.sqlite3'))
+    monkeypatch.setattr(availability_checker, 'get_whois_cache', lambda: cache)
+    monkeypatch.setattr(availability_checker, 'python_whois_fetch',
+                        lambda domain: {'fields': {'registrar': 'Example Registrar'}, 'raw': ''})
+
+    async def main():
+        async with AvailabilityChecker(lambda domain, verified: {'domain': domain}) as checker:
+            checker._rdap = _NoRDAP()
+            checker._whois = _UnreachableWhois()
+            return await checker.check('taken.norad'), checker
+
+    result, checker = asyncio.run(main())
+    assert result is None
+    assert checker.verdicts['taken.norad'][:2] == (False, 'whois')
+    assert checker.stages['rdap']['checked'] == 0 and checker.stages['whois']['eliminated'] == 1
+    assert 'rdap' not in limiter_metrics()
+    cache.close()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+AsyncNumLookupClient against a local NumLookup stand-in (an aiohttp server on 127.0.0.1)
+"""
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from agents.numlookup_client import AsyncNumLookupClient, NumLookupError
+
+VALID = {'valid': True, 'number': '12015550123', 'carrier': 'Example Wireless', 'line_type': 'mobile'}
+
+
+async def _serve(hits):
+    async def validate(request):
+        number = request.match_info['number']
+        hits[number] = hits.get(number, 0) + 1
+        if number == 'badkey':
+            return web.Response(status=401)
+        if number == 'flaky' and hits[number] == 1:
+            return web.Response(status=503)
+        if number == 'slow':
+            await asyncio.sleep(0.2)
+        return web.json_response({**VALID, 'number': number})
+
+    app = web.Application()
+    app.router.add_get('/v1/validate/{number}', validate)
+    server = TestServer(app, host='127.0.0.1')
+    await server.start_server()
+    return server
+
+
+def _run(scenario):
+    async def main():
+        hits = {}
+        server = await _serve(hits)
+        client = AsyncNumLookupClient('test-key', base_url=str(server.make_url('/v1')), timeout=5, backoff=0.01)
+        try:
+            return await scenario(client), hits
+        finally:
+            await client.close()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_retries_after_a_503():
+    data, hits = _run(lambda client: client.validate('flaky'))
+    assert data['number'] == 'flaky'
+    assert hits == {'flaky': 2}
+
+
+def test_rejected_key_raises_without_retrying():
+    async def scenario(client):
+        with pytest.raises(NumLookupError):
+            await client.validate('badkey')
+
+    _, hits = _run(scenario)
+    assert hits == {'badkey': 1}
+
+
+def test_repeat_validation_is_served_from_the_cache():
+    async def scenario(client):
+        first = await client.validate('+12015550123')
+        return first, await client.validate('12015550123')
+
+    (first, second), hits = _run(scenario)
+    assert first == second == VALID
+    assert hits == {'12015550123': 1}
+
+
+def test_concurrent_validations_share_one_request():
+    async def scenario(client):
+        return await asyncio.gather(*(client.validate('slow') for _ in range(5)))
+
+    results, hits = _run(scenario)
+    assert len(results) == 5 and all(result['number'] == 'slow' for result in results)
+    assert hits == {'slow': 1}
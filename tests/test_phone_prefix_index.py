@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+PrefixIndex longest-prefix matching, one number at a time and in batches
+"""
+from agents.phone_prefix_index import FLAG_TOLL_FREE, PrefixIndex, build_prefix_index
+
+ENTRIES = [
+    ('1', {'region_code': 'US', 'country': 'United States'}),
+    ('1201', {'region': 'New Jersey'}),
+    ('1201555', {'carrier': 'Example Wireless', 'line_type': 'Mobile'}),
+    ('1800', {'line_type': 'Toll Free', 'flags': FLAG_TOLL_FREE}),
+    ('44', {'region_code': 'GB', 'country': 'United Kingdom'}),
+    ('447911', {'carrier': 'Example UK', 'line_type': 'Mobile'}),
+    ('0123', {'region': 'not an E.164 prefix'})
+]
+NUMBERS = ['+12015550123', '+1 201-444-0000', '+18005550100', '+447911123456', '+441234567890',
+           '+33123456789', '+0123456', '', 'abc', '+1']
+
+
+def _index(tmp_path):
+    path = str(tmp_path / 'prefixes.idx')
+    build_prefix_index(ENTRIES, path)
+    return PrefixIndex(path)
+
+
+def test_longest_prefix_carries_inherited_fields(tmp_path):
+    index = _index(tmp_path)
+    info = index.lookup('+12015550123')
+    assert (info.region_code, info.region, info.carrier, info.line_type) == \
+        ('US', 'New Jersey', 'Example Wireless', 'Mobile')
+    assert index.lookup('+1 201-444-0000').carrier == ''
+    assert index.lookup('+18005550100').toll_free
+    assert index.lookup('+441234567890').country == 'United Kingdom'
+    assert index.lookup('+33123456789') is None
+    assert index.lookup('+0123456') is None
+    index.close()
+
+
+def test_lookup_many_matches_lookup(tmp_path):
+    index = _index(tmp_path)
+    assert index.lookup_many(NUMBERS) == [index.lookup(number) for number in NUMBERS]
+    assert index.lookup_many(['+4479é']) == [index.lookup('+4479é')]
+    assert index.lookup_many([]) == []
+    index.close()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+RDAPClient against a local RDAP stand-in (an aiohttp server on 127.0.0.1)
+"""
+import json
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from agents.rdap_client import RDAPClient
+
+REGISTERED = {
+    'objectClassName': 'domain',
+    'ldhName': 'TAKEN.TEST',
+    'status': ['client transfer prohibited'],
+    'events': [
+        {'eventAction': 'registration', 'eventDate': '2001-02-03T04:05:06Z'},
+        {'eventAction': 'expiration', 'eventDate': '2031-02-03T04:05:06Z'},
+        {'eventAction': 'last changed', 'eventDate': '2024-01-01T00:00:00Z'}
+    ],
+    'entities': [{
+        'roles': ['registrar'],
+        'handle': '9999',
+        'vcardArray': ['vcard', [['version', {}, 'text', '4.0'], ['fn', {}, 'text', 'Example Registrar, Inc.']]]
+    }],
+    'nameservers': [{'ldhName': 'NS1.EXAMPLE.NET'}, {'ldhName': 'ns2.example.net'}]
+}
+
+
+async def _serve(hits):
+    async def bootstrap(request):
+        hits['bootstrap'] += 1
+        base = f"http://{request.host}/rdap/"
+        return web.json_response({'version': '1.0', 'services': [[['test'], [base]]]})
+
+    async def domain(request):
+        hits['domain'] += 1
+        if request.match_info['name'] == 'taken.test':
+            return web.Response(text=json.dumps(REGISTERED), content_type='application/rdap+json')
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get('/bootstrap/dns.json', bootstrap)
+    app.router.add_get('/rdap/domain/{name}', domain)
+    server = TestServer(app, host='127.0.0.1')
+    await server.start_server()
+    return server
+
+
+def _run(scenario, tmp_path):
+    async def main():
+        hits = {'bootstrap': 0, 'domain': 0}
+        server = await _serve(hits)
+        try:
+            make_client = lambda: RDAPClient(bootstrap_url=str(server.make_url('/bootstrap/dns.json')),
+                                             bootstrap_path=str(tmp_path / 'rdap_dns.json'), timeout=5)
+            return await scenario(make_client, hits)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_404_means_available(tmp_path):
+    async def scenario(make_client, hits):
+        async with make_client() as client:
+            return await client.check('Free-Name.test')
+
+    result = _run(scenario, tmp_path)
+    assert result['domain'] == 'free-name.test'
+    assert result['status'] == 404
+    assert result['available'] is True
+    assert result['fields'] == {}
+
+
+def test_200_means_registered_with_fields(tmp_path):
+    async def scenario(make_client, hits):
+        async with make_client() as client:
+            return await client.check('www.taken.test')
+
+    result = _run(scenario, tmp_path)
+    assert result['domain'] == 'taken.test'
+    assert result['status'] == 200
+    assert result['available'] is False
+    assert result['fields'] == {
+        'registrar': 'Example Registrar, Inc.',
+        'creation_date': '2001-02-03T04:05:06Z',
+        'expiration_date': '2031-02-03T04:05:06Z',
+        'updated_date': '2024-01-01T00:00:00Z',
+        'status': ['client transfer prohibited'],
+        'name_servers': ['ns1.example.net', 'ns2.example.net']
+    }
+    assert json.loads(result['raw'])['ldhName'] == 'TAKEN.TEST'
+
+
+def test_bootstrap_is_cached_and_reused(tmp_path):
+    async def scenario(make_client, hits):
+        async with make_client() as client:
+            results = await client.check_many(['a.test', 'b.test', 'taken.test', 'c.test'])
+        after_first = dict(hits)
+        # A fresh client (e.g. the next run) reads the cached file instead of downloading it again
+        async with make_client() as client:
+            results.append(await client.check('d.test'))
+        return results, after_first, hits
+
+    results, after_first, hits = _run(scenario, tmp_path)
+    assert [result['available'] for result in results] == [True, True, False, True, True]
+    assert after_first == {'bootstrap': 1, 'domain': 4}
+    assert hits == {'bootstrap': 1, 'domain': 5}
+    assert (tmp_path / 'rdap_dns.json').exists()
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+ReputationStore list ingestion
+"""
+from agents.reputation_store import ReputationStore
+
+
+def _write_list(path, rows):
+    path.write_text('phone,spam_reports,fraud_reports\n' + ''.join(f'{row}\n' for row in rows))
+    return str(path)
+
+
+def test_reingesting_a_list_replaces_its_counts(tmp_path):
+    store = ReputationStore(str(tmp_path / 'store'))
+    spam = _write_list(tmp_path / 'spam.csv', ['+12015550123,3,0'])
+    store.ingest([spam])
+    store.ingest([spam])
+    assert store.lookup('+12015550123').spam_reports == 3
+    store.close()
+
+
+def test_ingest_after_removing_every_list_keeps_only_the_new_list(tmp_path):
+    store = ReputationStore(str(tmp_path / 'store'))
+    store.ingest([_write_list(tmp_path / 'fraud.csv', ['+12015550199,0,2'])])
+    store.remove(['fraud'])
+    store.ingest([_write_list(tmp_path / 'spam.csv', ['+12015550123,1,0'])])
+    assert store.lists() == ['spam']
+    assert store.lookup('+12015550199') is None
+    assert store.lookup('+12015550123').spam_reports == 1
+    store.close()
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+RunJournal verdicts across resumed runs
+"""
+from agents.run_journal import RunJournal, AVAILABLE, REJECTED
+
+
+def test_results_drop_domains_rejected_later(tmp_path):
+    journal = RunJournal(str(tmp_path / 'journal.sqlite3'))
+    journal.record('getai.com', 'final', AVAILABLE, {'domain': 'getai.com', 'score': 80})
+    journal.record('getai.com', 'final', REJECTED)
+    journal.record('tryai.com', 'final', AVAILABLE, {'domain': 'tryai.com', 'score': 70})
+    assert [result['domain'] for result in journal.results()] == ['tryai.com']
+    journal.close()
+
+
+def test_adopted_verdicts_survive_a_second_resume(tmp_path):
+    path = str(tmp_path / 'journal.sqlite3')
+    first = RunJournal(path)
+    first.record('getai.com', 'final', AVAILABLE, {'domain': 'getai.com', 'score': 80})
+    first.record('tryai.com', 'final', REJECTED)
+    first.close()
+
+    second = RunJournal(path)
+    run_id = second.start_run()
+    settled = second.adopt(['getai.com', 'tryai.com', 'new.com'])
+    assert settled == {'getai.com': {'domain': 'getai.com', 'score': 80}, 'tryai.com': None}
+    assert [result['domain'] for result in second.results(run_id=run_id)] == ['getai.com']
+    second.close()
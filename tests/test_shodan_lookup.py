@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+ShodanLookup batching and caching
+"""
+import shodan
+from agents.shodan_lookup import ShodanLookup
+
+KNOWN = {'203.0.113.10': {'ip_str': '203.0.113.10', 'ports': [443, 80], 'vulns': {'CVE-2024-0001': {}},
+                          'hostnames': ['www.example.com']}}
+
+
+class _FakeAPI:
+    """Answers like shodan.Shodan.host: any unknown IP in a request fails the whole request"""
+
+    def __init__(self):
+        self.requests = []
+
+    def host(self, ips):
+        self.requests.append(ips)
+        batch = ips if isinstance(ips, list) else [ips]
+        if any(ip not in KNOWN for ip in batch):
+            raise shodan.APIError('No information available for that IP.')
+        return [KNOWN[ip] for ip in batch] if isinstance(ips, list) else KNOWN[ips]
+
+
+def test_unknown_ip_in_a_batch_does_not_blank_the_known_ones():
+    api = _FakeAPI()
+    lookup = ShodanLookup(api, batch_size=10)
+    lookup.resolve = lambda target: ['203.0.113.10', '203.0.113.99']
+    assert lookup.lookup('example.com') == {'ports': [80, 443], 'vulns': ['CVE-2024-0001'],
+                                            'hostnames': ['www.example.com']}
+    assert api.requests == [['203.0.113.10', '203.0.113.99'], '203.0.113.10', '203.0.113.99']
+    # Both answers are cached, including the empty one
+    lookup.lookup('example.com')
+    assert len(api.requests) == 3
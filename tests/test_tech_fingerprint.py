@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+FingerprintEngine body scanning
+"""
+from agents.tech_fingerprint import FingerprintEngine
+
+
+def _names(technologies):
+    return [tech['name'] for tech in technologies]
+
+
+def test_html_signature_inside_script_tag_is_found():
+    engine = FingerprintEngine()
+    body = '<script src="https://static1.squarespace.com/static/x.js"></script>'
+    assert _names(engine.analyze(body=body)) == ['Squarespace']
+
+
+def test_html_signature_inside_meta_tag_is_found():
+    engine = FingerprintEngine()
+    body = '<meta name="generator" content="Webflow"><meta property="og:image" content="https://static1.squarespace.com/a.png">'
+    assert _names(engine.analyze(body=body)) == ['Squarespace', 'Webflow']
+
+
+def test_overlapping_html_signatures_are_all_found():
+    engine = FingerprintEngine(signatures=[
+        {'name': 'Outer', 'html': [r'<div class="app-shell[^"]*">']},
+        {'name': 'Inner', 'html': [r'app-shell--v(\d+)']}
+    ])
+    technologies = engine.analyze(body='<div class="app-shell app-shell--v3">')
+    assert [(tech['name'], tech['version']) for tech in technologies] == [('Inner', '3'), ('Outer', None)]
+
+
+def test_script_and_meta_tokens_still_match_with_versions():
+    engine = FingerprintEngine()
+    body = ('<meta name="generator" content="WordPress 6.4.2">'
+            '<script src="/wp-includes/js/jquery/jquery-3.7.1.min.js"></script>')
+    technologies = {tech['name']: tech['version'] for tech in engine.analyze(body=body)}
+    assert technologies == {'WordPress': '6.4.2', 'jQuery': '3.7.1'}
+
+
+def test_custom_signatures_with_optional_or_alternative_first_character_match():
+    engine = FingerprintEngine(signatures=[
+        {'name': 'Optional', 'html': [r'x?yz-widget']},
+        {'name': 'Alternative', 'html': [r'foo-cms|bar-cms']},
+        {'name': 'Literal', 'html': [r'acme-shop']}
+    ])
+    body = '<div class="yz-widget"></div><footer>Powered by bar-cms and acme-shop</footer>'
+    assert sorted(_names(engine.analyze(body=body))) == ['Alternative', 'Literal', 'Optional']
+
+
+def test_optional_first_character_is_not_gated():
+    engine = FingerprintEngine(signatures=[
+        {'name': 'Optional', 'html': [r'x?yz-widget']},
+        {'name': 'Literal', 'html': [r'acme-shop']}
+    ])
+    assert _names(engine.analyze(body='<div class="yz-widget"></div>')) == ['Optional']
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+VerdictCache storage shared by both domain research agents
+"""
+import time
+
+from agents.verdict_cache import VerdictCache
+
+
+def test_verified_flag_round_trips(tmp_path):
+    cache = VerdictCache(str(tmp_path / 'verdicts.sqlite3'))
+    cache.put('reported.com', True, 'whoisxmlapi', verified=False)
+    cache.put('confirmed.com', True, 'rdap', verified=True)
+    verdicts = cache.get_many(['reported.com', 'confirmed.com'])
+    assert verdicts['reported.com'].verified is False
+    assert verdicts['confirmed.com'].verified is True
+    cache.close()
+
+
+def test_older_answer_does_not_replace_newer_one(tmp_path):
+    cache = VerdictCache(str(tmp_path / 'verdicts.sqlite3'))
+    now = time.time()
+    cache.put('example.com', False, 'rdap', verified=True, checked_at=now - 60)
+    cache.put('example.com', True, 'namecheap', verified=True, checked_at=now - 3600)
+    verdict = cache.get('example.com')
+    assert (verdict.available, verdict.source) == (False, 'rdap')
+    cache.close()
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+WhoisCache lookups for the OSINT domain search
+"""
+from agents.whois_cache import WhoisCache
+
+RECORD = {'fields': {'registrar': 'Example Registrar', 'creation_date': '2001-05-01T00:00:00'},
+          'raw': 'Registrar: Example Registrar'}
+
+
+def test_lookup_refetches_entries_without_whois_fields(tmp_path):
+    cache = WhoisCache(path=str(tmp_path / 'whois.sqlite3'))
+    cache.put('example.com', {}, registered=True, source='whoisxmlapi')
+    fetched = []
+
+    def fetch(domain):
+        fetched.append(domain)
+        return RECORD
+
+    entry = cache.lookup('www.example.com', fetch=fetch)
+    assert fetched == ['example.com']
+    assert entry['fields']['registrar'] == 'Example Registrar'
+    # The stored record now answers without another query
+    assert cache.lookup('example.com', fetch=fetch)['source'] == 'whois'
+    assert fetched == ['example.com']
+    cache.close()
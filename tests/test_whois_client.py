@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+AsyncWhoisClient against local port-43 stand-ins (asyncio servers on 127.0.0.1)
+"""
+import asyncio
+from agents.whois_client import AsyncWhoisClient, parse_whois_text
+
+REGISTRY_RECORD = """Domain Name: TAKEN.TEST
+Registrar WHOIS Server: {referral}
+Registrar:
+Creation Date: 2001-02-03T04:05:06Z
+Registry Expiry Date: 2031-02-03T04:05:06Z
+Domain Status: clientTransferProhibited
+"""
+REGISTRAR_RECORD = """Domain Name: taken.test
+Registrar: Example Registrar, Inc.
+Name Server: NS1.EXAMPLE.NET
+"""
+NO_MATCH = 'No match for "FREE.TEST".\r\n'
+
+
+async def _serve(answer, queries):
+    async def handle(reader, writer):
+        query = (await reader.readline()).decode().strip()
+        queries.append(query)
+        writer.write(answer(query).encode())
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    return server, f"127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+def _run(scenario):
+    async def main():
+        registry_queries, registrar_queries = [], []
+        registrar, registrar_address = await _serve(lambda query: REGISTRAR_RECORD, registrar_queries)
+        registry, registry_address = await _serve(
+            lambda query: REGISTRY_RECORD.format(referral=registrar_address) if query == 'taken.test' else NO_MATCH,
+            registry_queries)
+        client = AsyncWhoisClient(servers={'test': registry_address}, timeout=5, min_interval=0)
+        try:
+            return await scenario(client), registry_queries, registrar_queries
+        finally:
+            registry.close()
+            registrar.close()
+            await registry.wait_closed()
+            await registrar.wait_closed()
+
+    return asyncio.run(main())
+
+
+def test_registered_domain_follows_the_registrar_referral():
+    record, registry_queries, registrar_queries = _run(lambda client: client.lookup('www.taken.test'))
+    assert registry_queries == ['taken.test'] and registrar_queries == ['taken.test']
+    assert record['registered'] and not record['no_match']
+    fields = record['fields']
+    # The registry's empty "Registrar:" line does not swallow the next line
+    assert fields['registrar'] == 'Example Registrar, Inc.'
+    assert fields['creation_date'].year == 2001
+    assert fields['status'] == ['clientTransferProhibited']
+    assert fields['name_servers'] == ['ns1.example.net']
+
+
+def test_no_match_reply_means_available():
+    record, _, registrar_queries = _run(lambda client: client.lookup('free.test'))
+    assert record['no_match'] and not record['registered']
+    assert registrar_queries == []
+
+
+def test_empty_field_line_does_not_capture_the_next_line():
+    fields = parse_whois_text(REGISTRY_RECORD.format(referral='whois.example.net'))
+    assert fields['registrar'] is None
+    assert fields['creation_date'].year == 2001
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+ZoneFilter ingest and delta updates
+"""
+import os
+
+import pytest
+
+from agents import zone_filter
+from agents.zone_filter import ZoneFilter
+
+ZONE = """$ORIGIN com.
+example NS ns1.example.net.
+taken NS ns1.example.net.
+      NS ns2.example.net.
+"""
+
+
+def _zone(tmp_path, text):
+    path = tmp_path / 'com.zone'
+    path.write_text(text)
+    return str(path)
+
+
+def test_ingest_and_delta(tmp_path):
+    zones = ZoneFilter(str(tmp_path / 'zones'))
+    assert zones.ingest('com', _zone(tmp_path, ZONE))['labels'] == 2
+    assert zones.is_registered('www.taken.com') is True
+    assert zones.is_registered('free-name-4821.com') is False
+
+    delta = tmp_path / 'com.delta'
+    delta.write_text('+fresh.com\n-taken.com\n')
+    assert zones.apply_delta('com', str(delta))['labels'] == 2
+    assert zones.is_registered('fresh.com') is True
+    assert zones.is_registered('taken.com') is False
+    assert zones.tlds() == ['com']
+    zones.close()
+
+
+def test_failed_ingest_leaves_previous_set_in_place(tmp_path, monkeypatch):
+    directory = str(tmp_path / 'zones')
+    zones = ZoneFilter(directory)
+    zones.ingest('com', _zone(tmp_path, ZONE))
+    before = sorted(os.listdir(directory))
+
+    def failing_save(self, path):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(zone_filter.BloomFilter, 'save', failing_save)
+    with pytest.raises(OSError):
+        zones.ingest('com', _zone(tmp_path, '$ORIGIN com.\nother NS ns1.example.net.\n'))
+    # The new table was written, but only in the staging directory that is now gone
+    assert sorted(os.listdir(directory)) == before
+    assert zones.is_registered('taken.com') is True
+    assert zones.is_registered('other.com') is False
+    zones.close()